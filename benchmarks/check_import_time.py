@@ -0,0 +1,53 @@
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FORBIDDEN = ("tkinter", "_tkinter", "azure_theme", "src.gui", "requests", "tqdm", "urllib3", "numpy")
+
+def measure(module: str):
+    """Imports the module in a fresh interpreter with -X importtime and parses the per-module report."""
+    statement = f"import {module}" if module else "pass"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{proc.stderr}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative_us)
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks that the headless engine imports fast and without GUI modules.")
+    parser.add_argument("--module", default="src.engine")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Fail if the cumulative import takes longer.")
+    args = parser.parse_args()
+
+    startup = measure("")
+    modules = {name: us for name, us in measure(args.module).items() if name not in startup}
+    total_ms = modules.get(args.module, 0) / 1000
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+
+    print(f"import {args.module}: {total_ms:.1f} ms cumulative, {len(modules)} modules")
+    for name, cumulative_us in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    leaked = sorted(name for name in modules if name.split(".")[0] in FORBIDDEN or name in FORBIDDEN)
+    failed = False
+    if leaked:
+        print(f"FAIL: GUI/optional modules imported on the engine path: {', '.join(leaked)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import took {total_ms:.1f} ms, budget is {args.budget_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.analysis_logic import AnalysisLogic
+from src.data_manager import DataManager
+from src.engine import DEFAULT_FACTORS
+from src.result_cache import ResultCache
+
+SIZES = (120, 500, 2000)
+# Bump when make_dataset changes, so cached dataset files are regenerated.
+DATASET_VERSION = 1
+TEAM_SIZE = 5
+BULK_DRAFTS = 200
+
+def make_dataset(n_heroes: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    A deterministic dataset shaped like hero_matchups.json: roughly antisymmetric matchups, symmetric
+    synergy and winrates around 50, rounded like the scraped data.
+    """
+    rng = random.Random(seed * 100003 + n_heroes)
+    names = [f"Hero {i:04d}" for i in range(n_heroes)]
+    strength = [rng.gauss(0.0, 1.5) for _ in names]
+    matchup = {hero: {} for hero in names}
+    synergy = {hero: {} for hero in names}
+    for i, hero in enumerate(names):
+        for j in range(i + 1, n_heroes):
+            other = names[j]
+            advantage = strength[i] - strength[j] + rng.gauss(0.0, 2.0)
+            matchup[hero][other] = round(advantage + rng.gauss(0.0, 0.3), 3)
+            matchup[other][hero] = round(-advantage + rng.gauss(0.0, 0.3), 3)
+            synergy[hero][other] = synergy[other][hero] = round(rng.gauss(0.0, 1.5), 3)
+    return {
+        "heroes": [{"id": i + 1, "name": hero} for i, hero in enumerate(names)],
+        "matchup_data": matchup,
+        "synergy_data": synergy,
+        "winrate_data": {hero: round(50.0 + s + rng.gauss(0.0, 1.0), 2) for hero, s in zip(names, strength)},
+    }
+
+def dataset_file(n_heroes: int, seed: int, folder: Path) -> Path:
+    """Writes the dataset once per size, seed and generator version and reuses the file afterwards."""
+    path = folder / f"synthetic_v{DATASET_VERSION}_{n_heroes}_{seed}.json"
+    if not path.exists():
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(make_dataset(n_heroes, seed), f)
+        tmp_path.replace(path)
+    return path
+
+def _timings(run: Callable[[], Any], setup: Optional[Callable[[], Any]], repeat: int) -> Dict[str, float]:
+    """Wall time of run() over `repeat` rounds; setup() runs before each round, outside the timing."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "repeat": repeat,
+    }
+
+def _memory(run: Callable[[], Any], setup: Optional[Callable[[], Any]]) -> Dict[str, float]:
+    """Peak and retained traced allocations of one run() (tracemalloc runs separately from the timings)."""
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = run()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_kib": (peak - before) / 1024, "retained_kib": (after - before) / 1024}
+
+class Suite:
+    """The benchmark cases for one dataset."""
+    def __init__(self, data_file: Path, seed: int):
+        self.data_file = data_file
+        self.dm = DataManager(data_file)
+        self.logic = AnalysisLogic(self.dm, cache=ResultCache(), **DEFAULT_FACTORS)
+        self.heroes = self.dm.get_hero_list()
+        rng = random.Random(seed)
+        self.drafts = [rng.sample(self.heroes, 2 * TEAM_SIZE) for _ in range(BULK_DRAFTS)]
+        self.draft = self.drafts[0]
+        self.counter_list = self.logic.get_counter_picks(self.draft[:1], True)
+
+    def _cold(self) -> None:
+        self.logic.cache = ResultCache()
+
+    def _warm_4v5(self) -> None:
+        """GUI-like state: the draft minus team 1's last pick was already analyzed."""
+        self._cold()
+        self.logic.analyze_teams(self.draft[:TEAM_SIZE - 1], self.draft[TEAM_SIZE:], True, True)
+
+    def _draft_flow(self) -> None:
+        """A draft picked hero by hero, re-analyzed and rendered (normalized) after every pick, as the GUI does."""
+        logic = self.logic
+        team1, team2 = [], []
+        for i, hero in enumerate(self.draft):
+            (team1 if i % 2 == 0 else team2).append(hero)
+            logic.normalize_scores(logic.get_counter_picks(team2, True))
+            if team1 and team2:
+                analysis = logic.analyze_teams(team1, team2, True, True)
+                for table in ("team1_hero_scores", "team2_hero_scores", "team1_suggestions", "team2_suggestions"):
+                    logic.normalize_scores(analysis[table])
+
+    def _bulk_flow(self) -> None:
+        """Many unrelated 5v5 drafts sharing one cache, as the service and bulk scorer see them."""
+        for draft in self.drafts:
+            self.logic.analyze_teams(draft[:TEAM_SIZE], draft[TEAM_SIZE:], True, True)
+
+    def _bulk_flow_compact(self) -> None:
+        """The bulk drafts as score_drafts.py writes them: compact results, top-5 suggestions as JSON."""
+        for draft in self.drafts:
+            self.logic.analyze(draft[:TEAM_SIZE], draft[TEAM_SIZE:], True, True).to_json_dict(5)
+
+    def cases(self) -> List[Tuple[str, Callable[[], Any], Optional[Callable[[], Any]]]]:
+        """(name, run, setup) for every case; setup resets the state a case needs before each round."""
+        logic, draft = self.logic, self.draft
+        return [
+            ("load_data", lambda: DataManager(self.data_file), None),
+            ("counter_picks_1_enemy", lambda: logic.get_counter_picks(draft[:1], True), self._cold),
+            ("counter_picks_2_enemies", lambda: logic.get_counter_picks(draft[:2], True), self._cold),
+            ("counter_picks_5_enemies", lambda: logic.get_counter_picks(draft[:5], True), self._cold),
+            ("counter_picks_cached", lambda: logic.get_counter_picks(draft[:2], True),
+             lambda: logic.get_counter_picks(draft[:2], True)),
+            ("analyze_teams_5v5", lambda: logic.analyze_teams(draft[:5], draft[5:], True, True), self._cold),
+            ("analyze_teams_one_more_pick", lambda: logic.analyze_teams(draft[:5], draft[5:], True, True),
+             self._warm_4v5),
+            ("normalize_scores", lambda: logic.normalize_scores(self.counter_list), None),
+            ("flow_draft_pick_by_pick", self._draft_flow, self._cold),
+            ("flow_bulk_drafts", self._bulk_flow, self._cold),
+            ("flow_bulk_drafts_compact", self._bulk_flow_compact, self._cold),
+        ]
+
+def run_suite(sizes: List[int], seed: int, folder: Path, repeat: int, memory: bool) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for n_heroes in sizes:
+        data_file = dataset_file(n_heroes, seed, folder)
+        suite = Suite(data_file, seed)
+        size_results = {}
+        for name, run, setup in suite.cases():
+            # Loading the large datasets takes seconds; a few rounds are enough there.
+            rounds = max(1, min(repeat, 3)) if name == "load_data" else repeat
+            entry = _timings(run, setup, rounds)
+            if memory:
+                entry.update(_memory(run, setup))
+            size_results[name] = entry
+            print(f"{n_heroes:>5} heroes  {name:<28} {entry['median_ms']:>10.3f} ms"
+                  + (f"  peak {entry['peak_kib']:>10.1f} KiB" if memory else ""))
+        results[str(n_heroes)] = size_results
+    return results
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Prints the change of every case against the baseline and returns the regressions beyond tolerance."""
+    regressions = []
+    print(f"{'case':<40}{'baseline ms':>13}{'now ms':>11}{'ratio':>8}{'peak ratio':>12}")
+    for size, cases in results.items():
+        for name, entry in cases.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if old is None:
+                continue
+            label = f"{size}/{name}"
+            # min is the least noisy estimate of a case's cost.
+            ratio = entry["min_ms"] / old["min_ms"] if old["min_ms"] > 0 else 1.0
+            peak_ratio = None
+            if "peak_kib" in entry and "peak_kib" in old and old["peak_kib"] > 0:
+                peak_ratio = entry["peak_kib"] / old["peak_kib"]
+            flag = ""
+            if ratio > 1 + tolerance:
+                regressions.append(f"{label}: {ratio:.2f}x slower")
+                flag = "  SLOWER"
+            if peak_ratio is not None and peak_ratio > 1 + tolerance:
+                regressions.append(f"{label}: {peak_ratio:.2f}x peak memory")
+                flag += "  MORE MEMORY"
+            peak = f"{peak_ratio:12.2f}" if peak_ratio is not None else f"{'-':>12}"
+            print(f"{label:<40}{old['min_ms']:>13.3f}{entry['min_ms']:>11.3f}{ratio:>8.2f}{peak}{flag}")
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Times the scoring engine (and its allocations) on deterministic synthetic datasets.",
+        epilog="Save a run with -o, then pass it as --baseline to a later run to catch regressions.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Hero counts of the datasets.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=7, help="Timed rounds per case.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass.")
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "dota2picker-benchmarks",
+                        help="Where the generated datasets are kept between runs.")
+    parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", type=Path, help="Earlier results to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown or memory growth against the baseline (0.25 = 25%%).")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    results = run_suite(args.sizes, args.seed, args.data_dir, args.repeat, memory=not args.no_memory)
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset_version": DATASET_VERSION,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions beyond tolerance:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
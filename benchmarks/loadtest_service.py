@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List, Tuple
+
+async def _request(reader, writer, method: str, path: str, payload=None) -> Tuple[int, dict]:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+def _random_request(heroes: List[str], endpoint: str, rng: random.Random, distinct: int):
+    # A small pool of distinct drafts makes coalescing and caching visible; raise --distinct to defeat them.
+    draft_rng = random.Random(rng.randrange(distinct))
+    picked = draft_rng.sample(heroes, 10)
+    if endpoint == "counter":
+        return "/counter-picks", {"enemies": picked[:draft_rng.randint(1, 5)], "top": 10}
+    if endpoint == "suggestions":
+        return "/suggestions", {"allies": picked[:draft_rng.randint(0, 4)], "enemies": picked[5:5 + draft_rng.randint(1, 5)], "top": 10}
+    return "/analyze", {"team1": picked[:5], "team2": picked[5:]}
+
+async def _client(host, port, heroes, args, deadline, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            path, payload = _random_request(heroes, rng.choice(args.endpoints), rng, args.distinct)
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", path, payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def run(args):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, heroes = await _request(reader, writer, "GET", "/heroes")
+    writer.close()
+
+    latencies: List[float] = []
+    errors: List[int] = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        _client(args.host, args.port, heroes["heroes"], args, deadline, latencies, errors, seed)
+        for seed in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print("No requests completed.")
+        return
+    print(f"requests:    {len(latencies)} in {elapsed:.2f} s ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"errors:      {len(errors)}")
+    print(f"latency p50: {_percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"latency p99: {_percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"latency max: {max(latencies) * 1000:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for serve.py: reports p50/p99 latency and requests/s.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent keep-alive connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument("--distinct", type=int, default=1000, help="Number of distinct drafts to draw from.")
+    parser.add_argument("--endpoints", nargs="+", default=["counter", "analyze", "suggestions"],
+                        choices=["counter", "analyze", "suggestions"])
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
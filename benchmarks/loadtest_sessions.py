@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.loadtest_service import _percentile, _request
+from src.websocket import WebSocketClosed, connect
+
+def _draft_events(heroes: List[str], rng: random.Random) -> List[dict]:
+    """A captains-mode-like sequence: a few bans, then alternating picks until both teams have five."""
+    order = rng.sample(heroes, 14)
+    events = [{"type": "ban", "hero": hero} for hero in order[:4]]
+    events += [{"type": "pick", "team": 1 + i % 2, "hero": hero} for i, hero in enumerate(order[4:])]
+    return events
+
+async def _session(host, port, heroes, args, deadline, latencies, bytes_received, errors, seed):
+    rng = random.Random(seed)
+    try:
+        ws = await connect(host, port, "/sessions")
+    except (OSError, WebSocketClosed) as e:
+        errors.append(str(e))
+        return
+    try:
+        await ws.receive()  # initial full state
+        while time.perf_counter() < deadline:
+            events = _draft_events(heroes, rng)
+            for event in events:
+                start = time.perf_counter()
+                await ws.send(json.dumps(event))
+                reply = await ws.receive()
+                latencies.append(time.perf_counter() - start)
+                bytes_received.append(len(reply))
+                if json.loads(reply).get("type") == "error":
+                    errors.append(reply)
+                await asyncio.sleep(args.think_time * rng.random())
+            for event in reversed(events):
+                await ws.send(json.dumps({"type": "remove", "hero": event["hero"]}))
+                await ws.receive()
+    except WebSocketClosed as e:
+        errors.append(str(e))
+    finally:
+        await ws.close()
+
+async def run(args):
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, heroes = await _request(reader, writer, "GET", "/heroes")
+    writer.close()
+
+    latencies: List[float] = []
+    bytes_received: List[int] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        _session(args.host, args.port, heroes["heroes"], args, deadline, latencies, bytes_received, errors, seed)
+        for seed in range(args.sessions)
+    ))
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print("No events completed.")
+        return
+    print(f"sessions:    {args.sessions}")
+    print(f"events:      {len(latencies)} in {elapsed:.2f} s ({len(latencies) / elapsed:.1f} events/s)")
+    print(f"errors:      {len(errors)}")
+    print(f"delta size:  {sum(bytes_received) / len(bytes_received):.0f} bytes on average")
+    print(f"latency p50: {_percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"latency p99: {_percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"latency max: {max(latencies) * 1000:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for live draft sessions: p50/p99 event latency and events/s.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=200, help="Concurrent WebSocket sessions.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument("--think-time", type=float, default=0.05, help="Maximum random pause between events, in seconds.")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
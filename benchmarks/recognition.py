@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+UPDATE_DIR = Path(__file__).resolve().parent.parent / "update"
+sys.path.insert(0, str(UPDATE_DIR))
+
+import numpy as np
+
+from capture import FrameRecognizer, bounding_box
+from icon_index import IconIndex, THRESHOLD
+from synthetic import TRUTH_FILE, Distortion, ScreenGenerator, SyntheticScreen, load_icons
+
+EMPTY = "(empty)"
+NOT_FOUND = "(none)"
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks hero icon recognition offline: accuracy, confusions and speed on synthetic "
+                    "draft screens (or saved screens with a truth.json)."
+    )
+    parser.add_argument("--icons", default=str(UPDATE_DIR / "icons"), help="Icon folder.")
+    parser.add_argument("--screens", help="Folder written by update/synthetic.py (or real captures with a "
+                                          "truth.json) instead of generating screens.")
+    parser.add_argument("--count", type=int, default=100, help="Number of generated screens.")
+    parser.add_argument("--scale", type=float, default=0.3, help="Slot size relative to the icon files.")
+    parser.add_argument("--blur", type=float, default=0.5, help="Gaussian blur sigma in pixels.")
+    parser.add_argument("--brightness", type=float, default=0.9, help="Brightness multiplier.")
+    parser.add_argument("--noise", type=float, default=0.02, help="Standard deviation of pixel noise (0..1 scale).")
+    parser.add_argument("--jitter", type=int, default=2, help="Maximum error of the regions' edges in pixels.")
+    parser.add_argument("--empty", type=float, default=0.1, help="Chance that a slot is empty.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Matching threads per frame, as in cap.py.")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.4, 0.5, 0.6, 0.7, 0.8],
+                        help="Confidence thresholds to report accuracy for.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Threshold the confusion list is reported for.")
+    parser.add_argument("--report", help="Also write the full report as JSON to this file.")
+    return parser.parse_args()
+
+def _load_screens(folder: str):
+    from PIL import Image
+
+    with open(os.path.join(folder, TRUTH_FILE), "r", encoding="utf-8") as f:
+        truth = json.load(f)
+    regions = [tuple(r) for r in truth["regions"]["team1"]], [tuple(r) for r in truth["regions"]["team2"]]
+    # Frames are cropped to the regions' bounding box, as the capture loop grabs them.
+    left, top, width, height = bounding_box(regions[0] + regions[1])
+    screens = []
+    for entry in truth["screens"]:
+        with Image.open(os.path.join(folder, entry["file"])) as image:
+            frame = np.array(image.convert("RGB"))[top:top + height, left:left + width]
+        screens.append(SyntheticScreen(frame, entry["team1"], entry["team2"]))
+    return regions, screens
+
+def _generate_screens(args):
+    names, icons = load_icons(args.icons)
+    generator = ScreenGenerator(names, icons, Distortion(args.scale, args.blur, args.brightness, args.noise),
+                                jitter=args.jitter, empty=args.empty, seed=args.seed)
+    layout = generator.layout
+    regions = layout.regions_team1, layout.regions_team2
+    left, top, width, height = bounding_box(regions[0] + regions[1])
+    screens = []
+    for _ in range(args.count):
+        screen = generator.screen()
+        screens.append(screen._replace(frame=screen.frame[top:top + height, left:left + width]))
+    return regions, screens
+
+def _predicted(match, threshold: float) -> str:
+    return match.name if match is not None and match.confidence >= threshold else NOT_FOUND
+
+def _accuracy(samples: List[tuple], threshold: float) -> Dict[str, float]:
+    correct = sum(_predicted(match, threshold) == (truth or NOT_FOUND) for truth, match in samples)
+    picked = [(truth, match) for truth, match in samples if truth is not None]
+    empty = [match for truth, match in samples if truth is None]
+    return {
+        "threshold": threshold,
+        "accuracy": correct / len(samples),
+        "recall": sum(_predicted(m, threshold) == t for t, m in picked) / len(picked) if picked else None,
+        "false_positives_on_empty": sum(_predicted(m, threshold) != NOT_FOUND for m in empty),
+    }
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+def main():
+    args = parse_args()
+    index = IconIndex.load(args.icons)
+    regions, screens = _load_screens(args.screens) if args.screens else _generate_screens(args)
+    print(f"{len(screens)} screens, {len(regions[0]) + len(regions[1])} regions each, {len(index)} icons")
+
+    # The threshold is applied afterwards, so every region keeps its best match and confidence.
+    recognizer = FrameRecognizer(index, regions[0], regions[1], workers=args.workers, threshold=-1.0,
+                                 change_threshold=-1.0)
+    samples: List[tuple] = []
+    frame_ms, region_ms = [], []
+    try:
+        recognizer.recognize(screens[0].frame)  # warm-up: thread pool and resize matrices
+        for screen in screens:
+            start = time.perf_counter()
+            results, _ = recognizer.recognize(screen.frame)
+            frame_ms.append((time.perf_counter() - start) * 1000)
+            truth = screen.truth_team1 + screen.truth_team2
+            samples.extend((truth[i], result.match) for i, result in enumerate(results))
+
+            # Single-threaded per-region timing, independent of the thread pool.
+            for _, _, region in recognizer.slots:
+                view = recognizer.crop(screen.frame, region)
+                start = time.perf_counter()
+                index.match(view, -1.0)
+                region_ms.append((time.perf_counter() - start) * 1000)
+    finally:
+        recognizer.close()
+
+    sweep = [_accuracy(samples, t) for t in sorted(set(args.thresholds) | {args.threshold})]
+    confusions = Counter(
+        (truth or EMPTY, _predicted(match, args.threshold))
+        for truth, match in samples
+        if _predicted(match, args.threshold) != (truth or NOT_FOUND)
+    )
+    confidences_correct = [m.confidence for t, m in samples if m is not None and m.name == t]
+    confidences_wrong = [m.confidence for t, m in samples if m is not None and m.name != t]
+    report = {
+        "screens": len(screens),
+        "regions": len(samples),
+        "icons": len(index),
+        "distortion": None if args.screens else Distortion(args.scale, args.blur, args.brightness, args.noise)._asdict(),
+        "workers": args.workers,
+        "ms_per_frame": {"mean": float(np.mean(frame_ms)), "p50": _percentile(frame_ms, 50), "p95": _percentile(frame_ms, 95)},
+        "ms_per_region": {"mean": float(np.mean(region_ms)), "p50": _percentile(region_ms, 50), "p95": _percentile(region_ms, 95)},
+        "confidence": {
+            "correct_min": min(confidences_correct, default=None),
+            "correct_p5": _percentile(confidences_correct, 5) if confidences_correct else None,
+            "wrong_max": max(confidences_wrong, default=None),
+        },
+        "thresholds": sweep,
+        "confusions": [{"truth": t, "predicted": p, "count": n} for (t, p), n in confusions.most_common()],
+    }
+
+    print(f"Per frame:  {report['ms_per_frame']['mean']:.2f} ms mean, {report['ms_per_frame']['p95']:.2f} ms p95 "
+          f"({args.workers} worker(s))")
+    print(f"Per region: {report['ms_per_region']['mean']:.2f} ms mean, {report['ms_per_region']['p95']:.2f} ms p95")
+    confidence = report["confidence"]
+    if confidence["correct_min"] is not None:
+        print(f"Confidence of correct matches: min {confidence['correct_min']:.3f}, p5 {confidence['correct_p5']:.3f}"
+              + (f"; best wrong match {confidence['wrong_max']:.3f}" if confidence["wrong_max"] is not None else ""))
+    print("threshold  accuracy  recall  false positives on empty slots")
+    for row in sweep:
+        recall = f"{row['recall'] * 100:6.2f}%" if row["recall"] is not None else "     -"
+        print(f"{row['threshold']:9.2f}  {row['accuracy'] * 100:7.2f}%  {recall}  {row['false_positives_on_empty']}")
+    if confusions:
+        print(f"Confusions at threshold {args.threshold:.2f}:")
+        for (truth, predicted), count in confusions.most_common(20):
+            print(f"  {truth} -> {predicted}: {count}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
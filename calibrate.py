@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from src.bulk import read_records
+from src.engine import DEFAULT_CONFIG_FILE, DEFAULT_DATA_FILE, load_engine
+from src.query_tables import query_tables_file, write_query_tables
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Fits adv/synergy/winrate k-factors (and optionally per-hero biases) to an archive of finished "
+                    "matches by logistic regression and writes them to the engine config file.",
+        epilog="The archive format is the same as for evaluate.py.",
+    )
+    parser.add_argument("archive", nargs="?", default="-", help="Match archive (JSONL or CSV), or - for stdin (default).")
+    parser.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto",
+                        help="Input format. 'auto' uses the file extension and falls back to JSONL.")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_FILE, help="Path to hero_matchups.json.")
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_CONFIG_FILE,
+                        help=f"Config file to write (default: {DEFAULT_CONFIG_FILE}, which the engine loads).")
+    parser.add_argument("--hero-bias", action="store_true", help="Also fit a bias term for every hero.")
+    parser.add_argument("--l2", type=float, default=1e-3, help="L2 penalty on the hero biases.")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Share of matches held out to check the fit.")
+    parser.add_argument("--max-iterations", type=int, default=25, help="Maximum Newton iterations.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for feature extraction (0 runs in this process).")
+    parser.add_argument("--batch-size", type=int, default=8192, help="Matches per feature extraction batch.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the fit without writing the config file.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "csv" if args.archive.lower().endswith(".csv") else "jsonl"
+
+    from src.calibration import calibrate, load_features, save_config
+
+    # Start from the built-in defaults rather than a previous fit, so refits are reproducible.
+    logic = load_engine(args.data, config_file=None)
+
+    started = time.perf_counter()
+    source = sys.stdin if args.archive == "-" else open(args.archive, "r", encoding="utf-8", newline="")
+    try:
+        features, errors = load_features(logic, read_records(source, fmt), workers=args.workers,
+                                         batch_size=args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    extracted = time.perf_counter()
+    print(f"Extracted features for {len(features)} matches in {extracted - started:.1f} s"
+          + (f" ({errors} invalid records skipped)" if errors else "") + ".")
+
+    try:
+        config = calibrate(logic, features, hero_bias=args.hero_bias, l2=args.l2, holdout=args.holdout,
+                           max_iterations=args.max_iterations)
+    except ValueError as e:
+        print(f"Calibration failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    stats = config["calibration"]
+    print(f"Fitted in {time.perf_counter() - extracted:.1f} s ({stats['iterations']} iterations).")
+    print(f"  adv_k_factor     {config['adv_k_factor']:.5f}")
+    print(f"  synergy_k_factor {config['synergy_k_factor']:.5f}")
+    print(f"  winrate_k_factor {config['winrate_k_factor']:.5f}")
+    for subset in ("train", "holdout"):
+        before, after = stats["log_loss_before"][subset], stats["log_loss_after"][subset]
+        if before is not None:
+            print(f"  {subset} log-loss {before:.5f} -> {after:.5f}")
+
+    if not args.dry_run:
+        save_config(config, args.output)
+        print(f"Wrote {args.output}")
+        # Tables scored with the old factors would no longer be used; rebuild them for the new ones.
+        if args.output == DEFAULT_CONFIG_FILE and query_tables_file(args.data).exists():
+            path = write_query_tables(load_engine(args.data, config_file=args.output, query_tables=False), args.data)
+            print(f"Rebuilt {path}")
+
+if __name__ == "__main__":
+    main()
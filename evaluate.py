@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from src.bulk import read_records
+from src.engine import DEFAULT_CONFIG_FILE, DEFAULT_DATA_FILE, load_engine
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Evaluates the win-probability model on an archive of finished matches: "
+                    "log-loss, Brier score, accuracy and calibration.",
+        epilog="Records are drafts as accepted by score_drafts.py plus the winner, as 'winner' (1/2, radiant/dire) "
+               "or 'radiant_win' (true/false). Fields named with --split (e.g. patch, bracket) group the report.",
+    )
+    parser.add_argument("archive", nargs="?", default="-", help="Match archive (JSONL or CSV), or - for stdin (default).")
+    parser.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto",
+                        help="Input format. 'auto' uses the file extension and falls back to JSONL.")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_FILE, help="Path to hero_matchups.json.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (0 evaluates in this process).")
+    parser.add_argument("--batch-size", type=int, default=4096, help="Matches scored per vectorized batch.")
+    parser.add_argument("--split", action="append", default=[], metavar="FIELD",
+                        help="Also report metrics per value of this record field. May be repeated.")
+    parser.add_argument("--buckets", type=int, default=10, help="Number of calibration buckets.")
+    parser.add_argument("--no-winrate", action="store_true", help="Do not factor in hero winrates.")
+    parser.add_argument("--no-synergy", action="store_true", help="Do not consider hero synergy.")
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG_FILE,
+                        help="Engine config with fitted factors, used if it exists (see calibrate.py).")
+    parser.add_argument("--adv-k", type=float, help="Override adv_k_factor.")
+    parser.add_argument("--synergy-k", type=float, help="Override synergy_k_factor.")
+    parser.add_argument("--winrate-k", type=float, help="Override winrate_k_factor.")
+    parser.add_argument("--report", type=Path, help="Also write the full report as JSON to this file.")
+    return parser.parse_args()
+
+def print_summary(title: str, summary: dict, with_calibration: bool):
+    if not summary["matches"]:
+        print(f"{title}: no matches")
+        return
+    print(f"{title}: {summary['matches']} matches, log-loss {summary['log_loss']:.4f}, "
+          f"Brier {summary['brier']:.4f}, accuracy {summary['accuracy'] * 100:.2f}%")
+    if with_calibration:
+        print("  predicted     matches  mean pred  observed")
+        for bucket in summary["calibration"]:
+            low, high = bucket["range"]
+            if bucket["matches"]:
+                print(f"  {low:.2f}-{high:.2f}  {bucket['matches']:>10}  {bucket['mean_predicted']:>9.3f}  "
+                      f"{bucket['observed_win_rate']:>8.3f}")
+
+def main():
+    args = parse_args()
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "csv" if args.archive.lower().endswith(".csv") else "jsonl"
+
+    # Imported here so that --help works without numpy.
+    from src.evaluation import Evaluator
+
+    overrides = {"adv_k_factor": args.adv_k, "synergy_k_factor": args.synergy_k, "winrate_k_factor": args.winrate_k}
+    logic = load_engine(args.data, config_file=args.config,
+                        **{name: value for name, value in overrides.items() if value is not None})
+    evaluator = Evaluator(logic, workers=args.workers, batch_size=args.batch_size, use_winrate=not args.no_winrate,
+                          use_synergy=not args.no_synergy, splits=args.split, buckets=args.buckets)
+
+    source = sys.stdin if args.archive == "-" else open(args.archive, "r", encoding="utf-8", newline="")
+    try:
+        report = evaluator.run(read_records(source, fmt))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print_summary("Overall", report["overall"], with_calibration=True)
+    for field in args.split:
+        for value, summary in report[f"by_{field}"].items():
+            print_summary(f"{field}={value or '(none)'}", summary, with_calibration=False)
+    if report["invalid_records"]:
+        print(f"Skipped {report['invalid_records']} invalid record(s).")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from src.engine import DEFAULT_DATA_FILE, load_engine
+from src.instrumentation import enable_engine_stats, profile_call
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dota 2 Picker without the GUI. Prints results as JSON.")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_FILE, help="Path to hero_matchups.json.")
+    parser.add_argument("--no-winrate", action="store_true", help="Do not factor in hero winrates.")
+    parser.add_argument("--stats", action="store_true", help="Print per-stage engine timings to stderr.")
+    parser.add_argument("--profile", action="store_true", help="Run the command under cProfile and print the profile to stderr.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    counter = sub.add_parser("counter", help="Best counter-picks against the given enemy heroes.")
+    counter.add_argument("enemies", nargs="+", help="Enemy hero names.")
+    counter.add_argument("--top", type=int, default=10, help="Number of picks to print (0 for all).")
+
+    analyze = sub.add_parser("analyze", help="Full analysis of two teams.")
+    analyze.add_argument("--team1", nargs="+", required=True, help="Team 1 (Radiant) hero names.")
+    analyze.add_argument("--team2", nargs="+", required=True, help="Team 2 (Dire) hero names.")
+    analyze.add_argument("--no-synergy", action="store_true", help="Do not consider hero synergy.")
+
+    sweep = sub.add_parser("sweep", help="Win probability and top suggestions of two teams over a grid of k-factors.",
+                           description="Factor values are a list (0.05 0.1) or a range START:STOP:COUNT (0.05:0.2:16). "
+                                       "Factors left out keep the engine's value. Needs numpy.")
+    sweep.add_argument("--team1", nargs="+", required=True, help="Team 1 (Radiant) hero names.")
+    sweep.add_argument("--team2", nargs="+", required=True, help="Team 2 (Dire) hero names.")
+    sweep.add_argument("--adv-k", nargs="+", help="adv_k_factor values.")
+    sweep.add_argument("--synergy-k", nargs="+", help="synergy_k_factor values.")
+    sweep.add_argument("--winrate-k", nargs="+", help="winrate_k_factor values.")
+    sweep.add_argument("--top", type=int, default=3, help="Suggestions per team and grid point.")
+    sweep.add_argument("--no-synergy", action="store_true", help="Do not consider hero synergy.")
+    args = parser.parse_args()
+
+    if args.command == "sweep":
+        for option in ("adv_k", "synergy_k", "winrate_k"):
+            try:
+                setattr(args, option, parse_values(getattr(args, option)))
+            except ValueError as e:
+                parser.error(f"argument --{option.replace('_', '-')}: {e}")
+    return args
+
+def parse_values(values: Optional[List[str]]) -> Optional[List[float]]:
+    """Factor values from a list of numbers or a single START:STOP:COUNT range; None when not given."""
+    if not values:
+        return None
+    if len(values) == 1 and values[0].count(":") == 2:
+        start, stop, count = values[0].split(":")
+        try:
+            start, stop, count = float(start), float(stop), int(count)
+        except ValueError:
+            raise ValueError(f"invalid range {values[0]!r}, expected START:STOP:COUNT") from None
+        if count < 1:
+            raise ValueError(f"invalid range {values[0]!r}, COUNT must be at least 1")
+        step = (stop - start) / (count - 1) if count > 1 else 0.0
+        return [start + i * step for i in range(count)]
+    try:
+        return [float(v) for v in values]
+    except ValueError:
+        raise ValueError(f"invalid values {' '.join(values)!r}, expected numbers or START:STOP:COUNT") from None
+
+def run_sweep(logic, args) -> dict:
+    import numpy as np
+    from src.sweep import DraftSweep, factor_grid
+
+    axes = {
+        "adv_k_factor": args.adv_k or [logic.adv_k],
+        "synergy_k_factor": args.synergy_k or [logic.synergy_k],
+        "winrate_k_factor": args.winrate_k or [logic.winrate_k],
+    }
+    shape = tuple(len(v) for v in axes.values())
+    grid = factor_grid(*axes.values())
+    use_synergy = not args.no_synergy and logic.dm.has_synergy_data()
+    sweep = DraftSweep(logic, args.team1, args.team2, not args.no_winrate, use_synergy)
+
+    result = {"axes": axes, "win_probability_team1": sweep.win_probability(grid).reshape(shape).tolist()}
+    for team in (1, 2):
+        candidates = np.array(sweep.teams[team - 1].candidates, dtype=object)
+        indices, _ = sweep.rankings(grid, team, args.top)
+        result[f"team{team}_suggestions"] = candidates[indices].reshape(shape + (-1,)).tolist()
+    return result
+
+def run_command(logic, args):
+    if args.command == "counter":
+        return logic.counter_table(args.enemies, not args.no_winrate, args.top if args.top > 0 else None).pairs()
+    if args.command == "sweep":
+        return run_sweep(logic, args)
+    use_synergy = not args.no_synergy and logic.dm.has_synergy_data()
+    return logic.analyze_teams(args.team1, args.team2, not args.no_winrate, use_synergy)
+
+def main():
+    args = parse_args()
+    stats = enable_engine_stats() if args.stats else None
+    logic = load_engine(args.data)
+    known = set(logic.all_heroes)
+
+    if args.command == "counter":
+        heroes = args.enemies
+    else:
+        heroes = args.team1 + args.team2
+    unknown = [h for h in heroes if h not in known]
+    if unknown:
+        print(f"Unknown hero(es): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.profile:
+        result, profile = profile_call(run_command, logic, args)
+        print(profile, file=sys.stderr)
+    else:
+        result = run_command(logic, args)
+
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    if stats is not None:
+        print(stats.format_report(logic.cache), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
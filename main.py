@@ -1,42 +1,107 @@
+import argparse
+import threading
 import tkinter as tk
 from tkinter import messagebox, ttk
 from pathlib import Path
-import tempfile
 
-from src.gui import Application
-from src.data_manager import DataManager
-from src.analysis_logic import AnalysisLogic
-from azure_theme import THEME_DATA
+from src.instrumentation import PhaseTimer, enable_engine_stats
+
+DATA_FILE = Path("data/hero_matchups.json")
+DATA_POLL_MS = 20
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dota 2 Picker")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print a per-phase timing breakdown once the first frame is painted.")
+    parser.add_argument("--engine-stats", action="store_true",
+                        help="Time the engine's stages, count calls and print the report (with cache hit rate) on exit.")
+    parser.add_argument("--recognize", action="store_true",
+                        help="Fill the hero selectors from the draft on screen (regions selected with update/cap.py).")
+    parser.add_argument("--my-team", type=int, choices=[1, 2], default=1,
+                        help="Your team when recognizing; the other team's heroes go to the Counter-Picker.")
+    parser.add_argument("--recognize-fps", type=float, default=4.0, help="Screen captures per second when recognizing.")
+    parser.add_argument("--stable-frames", type=int, default=3,
+                        help="Frames a recognized hero must stay the same before the selectors are updated.")
+    return parser.parse_args()
+
+def load_theme(root: tk.Tk) -> None:
+    """Evaluates the Azure theme script straight from memory, no temporary file needed."""
+    from azure_theme import THEME_DATA
+    root.tk.eval(THEME_DATA)
+    root.tk.call("ttk::theme::azure::LoadTheme")
+    root.tk.call("ttk::theme::azure-dark::LoadTheme")
+    ttk.Style().theme_use("azure-dark")
+
+def load_engine(data_file: Path):
+    """Runs off the Tk thread: reads the data file and builds the headless analysis engine."""
+    from src import engine
+
+    analysis_logic = engine.load_engine(data_file)
+    return analysis_logic.dm, analysis_logic
 
 def main():
     """Main application entry point with safe theme loading."""
+    args = parse_args()
+    timer = PhaseTimer()
+    stats = enable_engine_stats() if args.engine_stats else None
     try:
-        root = tk.Tk()
-        root.title("Dota 2 Picker")
-        root.geometry("900x800")
-        
-        with tempfile.NamedTemporaryFile("w", suffix=".tcl", delete=False) as f:
-            f.write(THEME_DATA)
-            f.flush()
-            root.tk.call("source", f.name)
-        
-        root.tk.call("ttk::theme::azure::LoadTheme")
-        root.tk.call("ttk::theme::azure-dark::LoadTheme")
-        ttk.Style().theme_use("azure-dark")
-
-        data_file = Path("data/hero_matchups.json")
-        data_manager = DataManager(data_file)
-        analysis_logic = AnalysisLogic(
-            data_manager, 
-            adv_k_factor=0.1, 
-            synergy_k_factor=1.0, 
-            winrate_k_factor=0.08
-        )
-        
-        app = Application(root, data_manager, analysis_logic)
-        app.pack(fill="both", expand=True)
+        with timer.phase("create root"):
+            root = tk.Tk()
+            root.title("Dota 2 Picker")
+            root.geometry("900x800")
+
+        with timer.phase("theme"):
+            load_theme(root)
+
+        splash = ttk.Label(root, text="Loading hero data...", anchor="center")
+        splash.pack(fill="both", expand=True)
+
+        loaded = {}
+        def load_in_background():
+            result = {}
+            with timer.phase("data load (background)"):
+                try:
+                    result["engine"] = load_engine(DATA_FILE)
+                except Exception as e:
+                    result["error"] = e
+            loaded.update(result)
+
+        threading.Thread(target=load_in_background, daemon=True).start()
+
+        with timer.phase("import gui"):
+            from src.gui import Application
+
+        def on_first_paint():
+            timer.mark("first paint")
+            if args.profile_startup:
+                print(timer.format_report())
+
+        def wait_for_data():
+            if not loaded:
+                root.after(DATA_POLL_MS, wait_for_data)
+                return
+            if "error" in loaded:
+                messagebox.showerror("Fatal Error", f"Application failed to start:\n{str(loaded['error'])}")
+                root.destroy()
+                return
+
+            data_manager, analysis_logic = loaded["engine"]
+            with timer.phase("build ui"):
+                splash.destroy()
+                app = Application(root, data_manager, analysis_logic)
+                app.pack(fill="both", expand=True)
+            if args.recognize:
+                from src.recognition_feed import RecognitionFeed
+
+                feed = RecognitionFeed(data_manager, fps=args.recognize_fps, stable_frames=args.stable_frames)
+                feed.start()
+                app.attach_recognition(feed, my_team=args.my_team)
+            root.after_idle(on_first_paint)
 
+        root.after(0, wait_for_data)
         root.mainloop()
+        if stats is not None:
+            print(stats.format_report(loaded["engine"][1].cache if "engine" in loaded else None))
 
     except Exception as e:
         error_root = tk.Tk()
@@ -45,4 +110,4 @@ def main():
         error_root.destroy()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from src.bulk import BulkScorer, read_records
+from src.engine import DEFAULT_DATA_FILE, load_engine
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Scores drafts in bulk. Reads JSONL or CSV and writes one analyze_teams result per line (JSONL), "
+                    "in input order.",
+        epilog="JSONL records look like {\"team1\": [...], \"team2\": [...]} with hero names or hero IDs. CSV files "
+               "need 'team1' and 'team2' columns with heroes separated by ';'. Both may add use_winrate, "
+               "use_synergy and match_id fields.",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="Input file, or - for stdin (default).")
+    parser.add_argument("-o", "--output", default="-", help="Output file, or - for stdout (default).")
+    parser.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto",
+                        help="Input format. 'auto' uses the file extension and falls back to JSONL.")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_FILE, help="Path to hero_matchups.json.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (0 scores in this process).")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Drafts per task sent to a worker.")
+    parser.add_argument("--suggestions", type=int, default=None,
+                        help="Keep only this many suggestions per team (default: all).")
+    parser.add_argument("--no-winrate", action="store_true", help="Default to not factoring in hero winrates.")
+    parser.add_argument("--no-synergy", action="store_true", help="Default to not considering hero synergy.")
+    args = parser.parse_args()
+    if args.suggestions is not None and args.suggestions < 0:
+        parser.error("argument --suggestions: must be a non-negative integer")
+    return args
+
+def main():
+    args = parse_args()
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "csv" if args.input.lower().endswith(".csv") else "jsonl"
+
+    logic = load_engine(args.data)
+    scorer = BulkScorer(logic, workers=args.workers, chunk_size=args.chunk_size, use_winrate=not args.no_winrate,
+                        use_synergy=not args.no_synergy, suggestions=args.suggestions)
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for line in scorer.score(read_records(source, fmt)):
+            target.write(line)
+            target.write("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    report = scorer.report()
+    print(f"Scored {report['drafts']} drafts ({report['errors']} invalid) in {report['seconds']:.2f} s, "
+          f"{report['drafts_per_second']:.0f} drafts/s with {report['workers']} worker(s).", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
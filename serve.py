@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from src.engine import DEFAULT_DATA_FILE
+from src.service import DraftService
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON draft-analysis service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_FILE, help="Path to hero_matchups.json.")
+    parser.add_argument("--process-workers", type=int, default=0,
+                        help="Worker processes for bulk endpoints (0 runs them on threads).")
+    parser.add_argument("--thread-workers", type=int, default=4, help="Threads for single-draft requests.")
+    parser.add_argument("--cache-entries", type=int, default=8192, help="Size of the shared result cache.")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="Limit on concurrent live draft sessions.")
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+    service = DraftService(args.data, process_workers=args.process_workers, thread_workers=args.thread_workers,
+                           cache_entries=args.cache_entries, max_sessions=args.max_sessions)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
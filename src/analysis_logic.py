@@ -1,22 +1,117 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Iterable
 from math import exp
-from functools import lru_cache
 from itertools import combinations
 
+from src.instrumentation import count, stage, timed
+from src.query_tables import QueryTables
+from src.result_cache import ResultCache
+from src.results import DraftAnalysis, ScoreTable, TeamAnalysis
+
 class AnalysisLogic:
-    """Core logic for calculating hero scores and team analysis."""
-    def __init__(self, data_manager, adv_k_factor: float, synergy_k_factor: float, winrate_k_factor: float):
+    """
+    Core logic for calculating hero scores and team analysis.
+    Rankings are computed as ScoreTables (hero indices and scores in flat arrays); the list and dict
+    returning methods are adapters over them.
+    Results and per-team partial sums are kept in a ResultCache keyed by data generation and k-factors;
+    pass the same cache to several instances to share it.
+    An optional hero_bias (e.g. fitted by calibrate.py) adds a fixed amount to every score of that hero.
+    With query_tables attached (see src.query_tables), top-k queries for one or two enemies and single-hero
+    synergy partners are read from the precomputed tables when those match the loaded data and factors.
+    """
+    def __init__(self, data_manager, adv_k_factor: float, synergy_k_factor: float, winrate_k_factor: float,
+                 cache: Optional[ResultCache] = None, hero_bias: Optional[Dict[str, float]] = None,
+                 query_tables: Optional[QueryTables] = None):
         self.dm = data_manager
-        self.all_heroes = self.dm.get_hero_list()
         self.adv_k = adv_k_factor
         self.synergy_k = synergy_k_factor
         self.winrate_k = winrate_k_factor
+        self.hero_bias: Dict[str, float] = dict(hero_bias or {})
+        # frozenset caches its hash, so the bias costs nothing extra per cache lookup.
+        self._bias_key = frozenset(self.hero_bias.items()) if self.hero_bias else None
+        self.cache = cache if cache is not None else ResultCache()
+        self._hero_index: Optional[Tuple[int, Dict[str, int]]] = None
+        self.query_tables = query_tables
+        # (generation, tables, whether they match) of the last compatibility check.
+        self._checked_tables: Optional[Tuple[int, QueryTables, bool]] = None
+
+    def parameters(self) -> Dict[str, object]:
+        """Keyword arguments that recreate this engine's scoring on another DataManager (e.g. in a worker)."""
+        return {
+            "adv_k_factor": self.adv_k,
+            "synergy_k_factor": self.synergy_k,
+            "winrate_k_factor": self.winrate_k,
+            "hero_bias": self.hero_bias,
+        }
+
+    @property
+    def all_heroes(self) -> List[str]:
+        return self.dm.get_hero_list()
+
+    def _hero_table(self, heroes: Iterable[str] = ()) -> Tuple[List[str], Dict[str, int]]:
+        """
+        The hero list result tables index into, and each hero's index in it. Any of `heroes` that are not
+        in the data set are appended, so tables can still name them.
+        """
+        all_heroes, generation = self.all_heroes, self.dm.generation
+        cached = self._hero_index
+        if cached is None or cached[0] != generation:
+            cached = self._hero_index = (generation, {hero: i for i, hero in enumerate(all_heroes)})
+        index = cached[1]
+        extra = [hero for hero in dict.fromkeys(heroes) if hero not in index] if heroes else None
+        if not extra:
+            return all_heroes, index
+        table = list(all_heroes) + extra
+        return table, {hero: i for i, hero in enumerate(table)}
+
+    def _tables(self) -> Optional[QueryTables]:
+        """The attached query tables if they fit the loaded data and this engine's factors, else None."""
+        tables = self.query_tables
+        if tables is None:
+            return None
+        checked = self._checked_tables
+        if checked is None or checked[0] != self.dm.generation or checked[1] is not tables:
+            checked = self._checked_tables = (self.dm.generation, tables, tables.compatible(self))
+        return tables if checked[2] else None
+
+    def _cache_key(self, kind: str, *parts) -> Tuple:
+        return (self.dm.generation, self.adv_k, self.synergy_k, self.winrate_k, self._bias_key, kind) + parts
 
-    @lru_cache(maxsize=8192)
     def _calculate_base_score(self, hero_for: str, hero_against: str) -> float:
         """Calculates advantage score based on direct matchup data (hero_for vs hero_against)."""
         return self.dm.get_advantage_score(hero_for, hero_against)
 
+    def _team_accumulator(self, kind: str, team: Iterable[str]) -> Dict[str, float]:
+        """
+        Per-hero sums of matchup ('matchup') or synergy ('synergy') scores against every member of a team.
+        Members are always added in sorted order, on top of the (cached) accumulator of the team minus its
+        last member, so the sums depend only on the team, never on what happens to be cached. A draft that
+        grows pick by pick reuses the longest cached sorted prefix instead of recomputing every column.
+        """
+        members = frozenset(team)
+        key = (self.dm.generation, "accumulator", kind, members)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        lookup = self._calculate_base_score if kind == "matchup" else self.dm.get_synergy_score
+        last = max(members) if members else None
+        base = self._team_accumulator(kind, members - {last}) if len(members) > 1 else None
+
+        with stage("accumulator"):
+            sums = dict(base) if base is not None else {hero: 0.0 for hero in self.all_heroes}
+            if last is not None:
+                for hero in sums:
+                    sums[hero] += lookup(hero, last)
+        self.cache.set(key, sums)
+        return sums
+
+    def _hero_prior(self, hero: str, use_winrate: bool) -> float:
+        """Score a hero brings regardless of the draft: its winrate bonus (if enabled) plus its bias."""
+        prior = self.hero_bias.get(hero, 0.0)
+        if use_winrate:
+            prior += (self.dm.get_hero_winrate(hero) - 50.0) * self.winrate_k
+        return prior
+
     def _calculate_win_probability(self, team1_score: float, team2_score: float) -> float:
         """Calculates estimated win probability using a logistic function."""
         net_advantage = team1_score - team2_score
@@ -24,103 +119,167 @@ class AnalysisLogic:
         return probability * 100
 
     def get_counter_picks(self, enemy_heroes: List[str], use_winrate: bool) -> List[Tuple[str, float]]:
-        """Calculates best counter-picks against a list of enemy heroes."""
+        """Calculates best counter-picks against a list of enemy heroes. The list is the caller's own."""
         if not enemy_heroes:
             return []
-            
-        potential_picks = [h for h in self.all_heroes if h not in enemy_heroes]
-        scores = {}
-
-        for pick in potential_picks:
-            counter_score = sum(self._calculate_base_score(pick, enemy) for enemy in enemy_heroes)
-            
-            winrate_bonus = 0.0
-            if use_winrate:
-                winrate_bonus = (self.dm.get_hero_winrate(pick) - 50.0) * self.winrate_k
-            
-            scores[pick] = counter_score + winrate_bonus
-
-        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
-        
-    def _get_draft_suggestions(self, allies: List[str], enemies: List[str], use_winrate: bool, use_synergy: bool) -> List[Tuple[str, float]]:
+        return list(self.counter_table(enemy_heroes, use_winrate).pairs())
+
+    def counter_table(self, enemy_heroes: List[str], use_winrate: bool, top: Optional[int] = None) -> ScoreTable:
+        """get_counter_picks as a ScoreTable, limited to the best `top` picks if given."""
+        count("counter_table")
+        tables = self._tables() if top is not None else None
+        if tables is not None:
+            heroes, index = self._hero_table()
+            enemies = [index.get(hero) for hero in set(enemy_heroes)]
+            if None not in enemies:
+                found = tables.counters(heroes, enemies, use_winrate, top)
+                if found is not None:
+                    count("query_tables")
+                    return found
+
+        key = self._cache_key("counter", frozenset(enemy_heroes), use_winrate)
+        table = self.cache.get_or_compute(key, lambda: self._compute_counter_picks(enemy_heroes, use_winrate))
+        return table.top(top) if top is not None else table
+
+    def _compute_counter_picks(self, enemy_heroes: List[str], use_winrate: bool) -> ScoreTable:
+        heroes = self.all_heroes
+        if not enemy_heroes:
+            return ScoreTable.ranked(heroes, [], [])
+        enemies = set(enemy_heroes)
+        counter_sums = self._team_accumulator("matchup", enemy_heroes)
+        indices, scores = [], []
+
+        with stage("counter picks"):
+            for i, pick in enumerate(heroes):
+                if pick not in enemies:
+                    indices.append(i)
+                    scores.append(counter_sums[pick] + self._hero_prior(pick, use_winrate))
+
+        with stage("sort"):
+            return ScoreTable.ranked(heroes, indices, scores)
+
+    def get_draft_suggestions(self, allies: List[str], enemies: List[str], use_winrate: bool, use_synergy: bool) -> List[Tuple[str, float]]:
+        """Cached public entry point for draft suggestions of the team that already picked `allies`; returns a new list."""
+        return list(self.suggestion_table(allies, enemies, use_winrate, use_synergy).pairs())
+
+    def suggestion_table(self, allies: List[str], enemies: List[str], use_winrate: bool, use_synergy: bool,
+                         top: Optional[int] = None) -> ScoreTable:
+        """get_draft_suggestions as a ScoreTable, limited to the best `top` heroes if given."""
+        count("suggestion_table")
+        tables = self._tables() if top is not None and use_synergy and not enemies else None
+        if tables is not None and len(set(allies)) == 1:
+            heroes, index = self._hero_table()
+            hero = index.get(allies[0])
+            if hero is not None:
+                found = tables.partners(heroes, hero, use_winrate, top)
+                if found is not None:
+                    count("query_tables")
+                    return found
+
+        key = self._cache_key("suggestions", frozenset(allies), frozenset(enemies), use_winrate, use_synergy)
+        table = self.cache.get_or_compute(
+            key, lambda: self._get_draft_suggestions(list(allies), list(enemies), use_winrate, use_synergy)
+        )
+        return table.top(top) if top is not None else table
+
+    def _get_draft_suggestions(self, allies: List[str], enemies: List[str], use_winrate: bool, use_synergy: bool) -> ScoreTable:
         """Recommends heroes based on countering enemies and synergizing with allies."""
+        heroes = self.all_heroes
         picked_heroes = set(allies + enemies)
-        potential_picks = [h for h in self.all_heroes if h not in picked_heroes]
-        scores = {}
-
-        for pick in potential_picks:
-            counter_score = sum(self._calculate_base_score(pick, e) for e in enemies)
-            
-            synergy_score = 0.0
-            if use_synergy and allies:
-                synergy_score = sum(self.dm.get_synergy_score(pick, a) for a in allies)
-            
-            winrate_bonus = 0.0
-            if use_winrate:
-                winrate_bonus = (self.dm.get_hero_winrate(pick) - 50.0) * self.winrate_k
-            
-            scores[pick] = counter_score + (self.synergy_k * synergy_score) + winrate_bonus
-        
-        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        counter_sums = self._team_accumulator("matchup", enemies) if enemies else None
+        synergy_sums = self._team_accumulator("synergy", allies) if use_synergy and allies else None
+        indices, scores = [], []
 
-    def analyze_teams(self, team1_heroes: List[str], team2_heroes: List[str], use_winrate: bool, use_synergy: bool) -> Dict:
-        """Performs a full analysis of two teams."""
-        t1_matchup_scores = {h1: sum(self._calculate_base_score(h1, h2) for h2 in team2_heroes) for h1 in team1_heroes}
-        t2_matchup_scores = {h2: sum(self._calculate_base_score(h2, h1) for h1 in team1_heroes) for h2 in team2_heroes}
+        with stage("suggestions"):
+            for i, pick in enumerate(heroes):
+                if pick in picked_heroes:
+                    continue
+                counter_score = counter_sums[pick] if counter_sums is not None else 0.0
 
-        t1_total_matchup_score = sum(t1_matchup_scores.values())
-        t2_total_matchup_score = sum(t2_matchup_scores.values())
-        
-        t1_winrate_bonus = sum((self.dm.get_hero_winrate(h) - 50.0) * self.winrate_k for h in team1_heroes) if use_winrate else 0.0
-        t2_winrate_bonus = sum((self.dm.get_hero_winrate(h) - 50.0) * self.winrate_k for h in team2_heroes) if use_winrate else 0.0
+                synergy_score = 0.0
+                if synergy_sums is not None:
+                    synergy_score = synergy_sums[pick]
+
+                indices.append(i)
+                scores.append(counter_score + (self.synergy_k * synergy_score) + self._hero_prior(pick, use_winrate))
+
+        with stage("sort"):
+            return ScoreTable.ranked(heroes, indices, scores)
+
+    def analyze_teams(self, team1_heroes: List[str], team2_heroes: List[str], use_winrate: bool, use_synergy: bool) -> TeamAnalysis:
+        """Performs a full analysis of two teams. The dict and its lists are the caller's own."""
+        analysis = self.analyze(team1_heroes, team2_heroes, use_winrate, use_synergy).as_dict()
+        return {**analysis, **{table: list(analysis[table]) for table in DraftAnalysis.TABLES}}
+
+    def analyze(self, team1_heroes: List[str], team2_heroes: List[str], use_winrate: bool, use_synergy: bool) -> DraftAnalysis:
+        """analyze_teams as a DraftAnalysis, for callers that serialize or only need part of it."""
+        count("analyze")
+        key = self._cache_key("analysis", frozenset(team1_heroes), frozenset(team2_heroes), use_winrate, use_synergy)
+        return self.cache.get_or_compute(
+            key, lambda: self._compute_team_analysis(team1_heroes, team2_heroes, use_winrate, use_synergy)
+        )
+
+    def _compute_team_analysis(self, team1_heroes: List[str], team2_heroes: List[str], use_winrate: bool, use_synergy: bool) -> DraftAnalysis:
+        with stage("matchup sums"):
+            t1_matchup_scores = {h1: sum(self._calculate_base_score(h1, h2) for h2 in team2_heroes) for h1 in team1_heroes}
+            t2_matchup_scores = {h2: sum(self._calculate_base_score(h2, h1) for h1 in team1_heroes) for h2 in team2_heroes}
+
+            t1_total_matchup_score = sum(t1_matchup_scores.values())
+            t2_total_matchup_score = sum(t2_matchup_scores.values())
+
+        with stage("winrate"):
+            t1_winrate_bonus = sum(self._hero_prior(h, use_winrate) for h in team1_heroes)
+            t2_winrate_bonus = sum(self._hero_prior(h, use_winrate) for h in team2_heroes)
 
         t1_synergy_score = 0.0
         t2_synergy_score = 0.0
         if use_synergy:
-            if len(team1_heroes) > 1:
-                t1_synergy_score = sum(self.dm.get_synergy_score(h1, h2) for h1, h2 in combinations(team1_heroes, 2))
-            if len(team2_heroes) > 1:
-                t2_synergy_score = sum(self.dm.get_synergy_score(h1, h2) for h1, h2 in combinations(team2_heroes, 2))
+            with stage("synergy pairs"):
+                if len(team1_heroes) > 1:
+                    t1_synergy_score = sum(self.dm.get_synergy_score(h1, h2) for h1, h2 in combinations(team1_heroes, 2))
+                if len(team2_heroes) > 1:
+                    t2_synergy_score = sum(self.dm.get_synergy_score(h1, h2) for h1, h2 in combinations(team2_heroes, 2))
 
         t1_total = t1_total_matchup_score + t1_winrate_bonus + (self.synergy_k * t1_synergy_score)
         t2_total = t2_total_matchup_score + t2_winrate_bonus + (self.synergy_k * t2_synergy_score)
 
         win_prob = self._calculate_win_probability(t1_total, t2_total)
-        
-        t1_hero_scores = {}
-        for h1 in team1_heroes:
-            matchup_score = t1_matchup_scores[h1]
-            winrate_b = (self.dm.get_hero_winrate(h1) - 50.0) * self.winrate_k if use_winrate else 0.0
-            synergy_b = 0.0
-            if use_synergy and len(team1_heroes) > 1:
-                synergy_b = self.synergy_k * sum(self.dm.get_synergy_score(h1, ally) for ally in team1_heroes if ally != h1)
-            t1_hero_scores[h1] = matchup_score + winrate_b + synergy_b
-
-        t2_hero_scores = {}
-        for h2 in team2_heroes:
-            matchup_score = t2_matchup_scores[h2]
-            winrate_b = (self.dm.get_hero_winrate(h2) - 50.0) * self.winrate_k if use_winrate else 0.0
-            synergy_b = 0.0
-            if use_synergy and len(team2_heroes) > 1:
-                synergy_b = self.synergy_k * sum(self.dm.get_synergy_score(h2, ally) for ally in team2_heroes if ally != h2)
-            t2_hero_scores[h2] = matchup_score + winrate_b + synergy_b
+
+        with stage("hero scores"):
+            t1_hero_scores = {}
+            for h1 in team1_heroes:
+                matchup_score = t1_matchup_scores[h1]
+                winrate_b = self._hero_prior(h1, use_winrate)
+                synergy_b = 0.0
+                if use_synergy and len(team1_heroes) > 1:
+                    synergy_b = self.synergy_k * sum(self.dm.get_synergy_score(h1, ally) for ally in team1_heroes if ally != h1)
+                t1_hero_scores[h1] = matchup_score + winrate_b + synergy_b
+
+            t2_hero_scores = {}
+            for h2 in team2_heroes:
+                matchup_score = t2_matchup_scores[h2]
+                winrate_b = self._hero_prior(h2, use_winrate)
+                synergy_b = 0.0
+                if use_synergy and len(team2_heroes) > 1:
+                    synergy_b = self.synergy_k * sum(self.dm.get_synergy_score(h2, ally) for ally in team2_heroes if ally != h2)
+                t2_hero_scores[h2] = matchup_score + winrate_b + synergy_b
 
         t1_suggestions = self._get_draft_suggestions(team1_heroes, team2_heroes, use_winrate, use_synergy)
         t2_suggestions = self._get_draft_suggestions(team2_heroes, team1_heroes, use_winrate, use_synergy)
 
-        return {
-            "win_probability_team1": win_prob,
-            "team1_total_score": t1_total,
-            "team2_total_score": t2_total,
-            "team1_hero_scores": sorted(t1_hero_scores.items(), key=lambda x: x[1], reverse=True),
-            "team2_hero_scores": sorted(t2_hero_scores.items(), key=lambda x: x[1], reverse=True),
-            "team1_suggestions": t1_suggestions,
-            "team2_suggestions": t2_suggestions
-        }
+        heroes, index = self._hero_table(team1_heroes + team2_heroes)
+        with stage("sort"):
+            t1_sorted = ScoreTable.ranked(heroes, [index[h] for h in t1_hero_scores], list(t1_hero_scores.values()))
+            t2_sorted = ScoreTable.ranked(heroes, [index[h] for h in t2_hero_scores], list(t2_hero_scores.values()))
+
+        return DraftAnalysis(heroes, win_prob, t1_total, t2_total, t1_sorted, t2_sorted, t1_suggestions, t2_suggestions)
 
     @staticmethod
+    @timed("normalize")
     def normalize_scores(scores: List[Tuple[str, float]]) -> List[Tuple[str, float, float]]:
         """Normalizes scores to a 0-100 scale for visualization."""
+        if isinstance(scores, ScoreTable):
+            return scores.rated()
         if not scores:
             return []
         
@@ -0,0 +1,216 @@
+"""
+Streaming bulk scoring of drafts, used by score_drafts.py.
+
+Input is read one record at a time (JSONL lines or CSV rows) and handed out in chunks to worker
+processes, which parse, validate and score the drafts and return ready JSON lines. At most a few chunks
+per worker are in flight, so memory stays bounded regardless of input size. Output keeps the input order.
+"""
+import csv
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from src.analysis_logic import AnalysisLogic
+from src.shared_data import SharedDataManager, SnapshotHandle
+
+CSV_HERO_SEPARATOR = ";"
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"0", "false", "no", "n"}
+PENDING_CHUNKS_PER_WORKER = 2
+
+Record = Union[str, Dict[str, Any]]
+
+
+class DraftFormatError(ValueError):
+    """Raised for an input record that is not a valid draft."""
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Record]]:
+    """
+    Yields (line number, record) pairs. JSONL lines are passed on unparsed so that decoding happens
+    in the workers; CSV rows become dicts keyed by the header row.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            if line.strip():
+                yield line_no, line
+    else:
+        raise ValueError(f"Unknown input format: {fmt}")
+
+
+def _parse_flag(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise DraftFormatError(f"Invalid flag value: {value!r}")
+
+
+def _resolve_team(logic: AnalysisLogic, known: Dict[str, int], value: Any, field: str) -> List[str]:
+    """Accepts a list of hero names or Dota 2 hero IDs, or a ';'-separated string of them (CSV)."""
+    if isinstance(value, str):
+        value = [part.strip() for part in value.split(CSV_HERO_SEPARATOR) if part.strip()]
+    if not isinstance(value, list):
+        raise DraftFormatError(f"'{field}' must be a list of heroes")
+
+    team = []
+    for hero in value:
+        if isinstance(hero, bool) or not isinstance(hero, (str, int)):
+            raise DraftFormatError(f"Invalid hero in '{field}': {hero!r}")
+        name = hero
+        if isinstance(hero, int) or hero.isdecimal():
+            name = logic.dm.get_hero_by_id(int(hero))
+        if name not in known:
+            raise DraftFormatError(f"Unknown hero in '{field}': {hero!r}")
+        team.append(name)
+    if len(team) > 5:
+        raise DraftFormatError(f"'{field}' has more than 5 heroes")
+    return team
+
+
+def decode_record(record: Record) -> Dict[str, Any]:
+    """Decodes a raw JSONL line; CSV rows are already dicts."""
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except ValueError as e:
+            raise DraftFormatError(f"Invalid JSON: {e}")
+        if not isinstance(record, dict):
+            raise DraftFormatError("Each line must be a JSON object")
+    return record
+
+
+def parse_draft(logic: AnalysisLogic, known: Dict[str, int], record: Record,
+                use_winrate: bool = True, use_synergy: bool = True) -> Dict[str, Any]:
+    """Turns one input record into validated analyze_teams arguments. Per-record flags override the defaults."""
+    record = decode_record(record)
+    team1 = _resolve_team(logic, known, record.get("team1"), "team1")
+    team2 = _resolve_team(logic, known, record.get("team2"), "team2")
+    if len(set(team1) | set(team2)) != len(team1) + len(team2):
+        raise DraftFormatError("A hero appears more than once in the draft")
+    draft = {
+        "team1": team1,
+        "team2": team2,
+        "use_winrate": _parse_flag(record.get("use_winrate"), use_winrate),
+        "use_synergy": _parse_flag(record.get("use_synergy"), use_synergy) and logic.dm.has_synergy_data(),
+    }
+    if record.get("match_id") not in (None, ""):
+        draft["match_id"] = record["match_id"]
+    return draft
+
+
+def score_chunk(logic: AnalysisLogic, chunk: List[Tuple[int, Record]], options: Dict[str, Any]) -> Tuple[List[str], int]:
+    """Scores a chunk of records and returns their output lines and the number of invalid records."""
+    known = {hero: i for i, hero in enumerate(logic.all_heroes)}
+    suggestions = options.get("suggestions")
+    lines, errors = [], 0
+    for line_no, record in chunk:
+        try:
+            draft = parse_draft(logic, known, record, options["use_winrate"], options["use_synergy"])
+        except DraftFormatError as e:
+            errors += 1
+            lines.append(json.dumps({"line": line_no, "error": str(e)}))
+            continue
+
+        analysis = logic.analyze(draft["team1"], draft["team2"], draft["use_winrate"], draft["use_synergy"])
+        result = analysis.to_json_dict(suggestions)
+        if "match_id" in draft:
+            result = {"match_id": draft["match_id"], **result}
+        lines.append(json.dumps(result))
+    return lines, errors
+
+
+# Worker state, set up once per process by the pool initializer.
+_worker_logic: Optional[AnalysisLogic] = None
+_worker_options: Dict[str, Any] = {}
+
+
+def _init_worker(handle: SnapshotHandle, parameters: Dict[str, Any], options: Dict[str, Any]) -> None:
+    global _worker_logic, _worker_options
+    _worker_logic = AnalysisLogic(SharedDataManager(handle), **parameters)
+    _worker_options = options
+
+
+def _score_chunk_in_worker(chunk: List[Tuple[int, Record]]) -> Tuple[List[str], int]:
+    return score_chunk(_worker_logic, chunk, _worker_options)
+
+
+def chunked(records: Iterable[Tuple[int, Record]], size: int) -> Iterator[List[Tuple[int, Record]]]:
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_chunks_in_pool(logic: AnalysisLogic, func: Callable[[Any], Any], chunks: Iterable[Any], workers: int,
+                       initializer: Callable[..., None], *initargs: Any) -> Iterator[Any]:
+    """
+    Applies func to every chunk on a process pool and yields the results in input order, with at most
+    a few chunks per worker in flight. The data is shared with the workers through a shared-memory
+    snapshot; initializer receives its handle and logic.parameters() ahead of initargs.
+    """
+    snapshot = logic.dm.publish_shared()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                 initargs=(snapshot.handle, logic.parameters(), *initargs)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(func, chunk))
+                if len(pending) >= workers * PENDING_CHUNKS_PER_WORKER:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        snapshot.unlink()
+
+
+class BulkScorer:
+    """Scores a stream of draft records in order, in-process (workers=0) or across a process pool."""
+    def __init__(self, logic: AnalysisLogic, workers: int = 0, chunk_size: int = 256,
+                 use_winrate: bool = True, use_synergy: bool = True, suggestions: Optional[int] = None):
+        self.logic = logic
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.options = {"use_winrate": use_winrate, "use_synergy": use_synergy, "suggestions": suggestions}
+        self.drafts = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def score(self, records: Iterable[Tuple[int, Record]]) -> Iterator[str]:
+        """Yields one JSON line per input record, in input order."""
+        start = time.perf_counter()
+        try:
+            if self.workers > 0:
+                batches = map_chunks_in_pool(self.logic, _score_chunk_in_worker, chunked(records, self.chunk_size),
+                                             self.workers, _init_worker, self.options)
+            else:
+                batches = (score_chunk(self.logic, chunk, self.options) for chunk in chunked(records, self.chunk_size))
+            for lines, errors in batches:
+                self.drafts += len(lines)
+                self.errors += errors
+                yield from lines
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "drafts": self.drafts,
+            "errors": self.errors,
+            "seconds": round(self.elapsed, 3),
+            "drafts_per_second": round(self.drafts / self.elapsed, 1) if self.elapsed else 0.0,
+            "workers": self.workers,
+        }
@@ -0,0 +1,258 @@
+"""
+Fitting of the engine's k-factors, and optionally per-hero biases, to finished matches. Used by calibrate.py.
+
+The win probability is sigmoid(adv_k * (t1 - t2)), where each team total is
+matchup + winrate_k * sum(winrate - 50) + synergy_k * pair synergy + sum(bias). That is a logistic
+regression on the three component differences: with weights a, b and c, adv_k = a, winrate_k = b / a
+and synergy_k = c / a. A bias beta per hero adds a +1/-1 column for each hero on team 1 or team 2,
+and the engine bias is beta / a. A hero's winrate term is itself a per-hero constant, so with biases
+enabled only the L2 penalty separates it from them. Features are extracted in vectorized batches (BatchScorer.components),
+and the fit uses Newton's method with a line search. The Hessian is accumulated chunk by chunk, so the
+fit converges in a few full passes even with a bias for every hero.
+"""
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.analysis_logic import AnalysisLogic
+from src.bulk import DraftFormatError, Record, chunked, decode_record, map_chunks_in_pool, parse_draft
+from src.evaluation import BatchScorer, parse_winner
+from src.shared_data import SharedDataManager, SnapshotHandle
+
+COMPONENTS = ("matchup", "winrate", "synergy")
+HESSIAN_CHUNK_ROWS = 32768
+PROBABILITY_EPSILON = 1e-15
+
+
+class MatchFeatures:
+    """Compact per-match training data: component differences, hero indices of both teams and the outcome."""
+    def __init__(self, components: np.ndarray, team1: np.ndarray, team2: np.ndarray, team1_won: np.ndarray):
+        self.components = components
+        self.team1 = team1
+        self.team2 = team2
+        self.team1_won = team1_won
+
+    def __len__(self) -> int:
+        return len(self.team1_won)
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["MatchFeatures"]) -> "MatchFeatures":
+        return cls(
+            np.concatenate([p.components for p in parts]),
+            np.concatenate([p.team1 for p in parts]),
+            np.concatenate([p.team2 for p in parts]),
+            np.concatenate([p.team1_won for p in parts]),
+        )
+
+    def subset(self, mask: np.ndarray) -> "MatchFeatures":
+        return MatchFeatures(self.components[mask], self.team1[mask], self.team2[mask], self.team1_won[mask])
+
+
+def extract_features(scorer: BatchScorer, batch: List[Tuple[int, Record]]) -> Tuple[MatchFeatures, int]:
+    """Parses a batch of archive records into MatchFeatures; returns them with the number of invalid records."""
+    team1, team2, outcomes, errors = [], [], [], 0
+    for _, record in batch:
+        try:
+            record = decode_record(record)
+            draft = parse_draft(scorer.logic, scorer.index, record)
+            outcomes.append(parse_winner(record))
+        except DraftFormatError:
+            errors += 1
+            continue
+        team1.append(draft["team1"])
+        team2.append(draft["team2"])
+
+    t1, t2 = scorer.team_indices(team1), scorer.team_indices(team2)
+    # int16 keeps ten hero indices per match at 20 bytes.
+    features = MatchFeatures(scorer.components(t1, t2), t1.astype(np.int16), t2.astype(np.int16),
+                             np.asarray(outcomes, dtype=np.float64))
+    return features, errors
+
+
+_worker_scorer: Optional[BatchScorer] = None
+
+
+def _init_worker(handle: SnapshotHandle, parameters: Dict[str, Any]) -> None:
+    global _worker_scorer
+    _worker_scorer = BatchScorer(AnalysisLogic(SharedDataManager(handle), **parameters))
+
+
+def _extract_in_worker(batch: List[Tuple[int, Record]]) -> Tuple[MatchFeatures, int]:
+    return extract_features(_worker_scorer, batch)
+
+
+def load_features(logic: AnalysisLogic, records: Iterable[Tuple[int, Record]], workers: int = 0,
+                  batch_size: int = 8192) -> Tuple[MatchFeatures, int]:
+    """Extracts features for a whole archive, in-process (workers=0) or across a process pool."""
+    batches = chunked(records, batch_size)
+    if workers > 0:
+        results = map_chunks_in_pool(logic, _extract_in_worker, batches, workers, _init_worker)
+    else:
+        scorer = BatchScorer(logic)
+        results = (extract_features(scorer, batch) for batch in batches)
+
+    parts, errors = [], 0
+    for features, batch_errors in results:
+        if len(features):
+            parts.append(features)
+        errors += batch_errors
+    if not parts:
+        raise ValueError("The archive contains no valid matches")
+    return MatchFeatures.concatenate(parts), errors
+
+
+class LogisticModel:
+    """
+    Weights for the active components plus optional hero biases, with the objective and its
+    derivatives: mean log-loss plus l2 / 2 * |biases|^2. Padded team slots (index n_heroes) have no bias.
+    """
+    def __init__(self, columns: Sequence[int], n_heroes: int, hero_bias: bool, l2: float):
+        self.columns = list(columns)
+        self.n_heroes = n_heroes
+        self.hero_bias = hero_bias
+        self.l2 = l2
+        self.size = len(self.columns) + (n_heroes if hero_bias else 0)
+
+    def _split(self, theta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        k = len(self.columns)
+        bias = np.zeros(self.n_heroes + 1)
+        if self.hero_bias:
+            bias[:self.n_heroes] = theta[k:]
+        return theta[:k], bias
+
+    def logits(self, theta: np.ndarray, data: MatchFeatures) -> np.ndarray:
+        weights, bias = self._split(theta)
+        z = data.components[:, self.columns] @ weights
+        if self.hero_bias:
+            z += bias[data.team1].sum(axis=1) - bias[data.team2].sum(axis=1)
+        return z
+
+    def loss(self, theta: np.ndarray, data: MatchFeatures) -> float:
+        z = self.logits(theta, data)
+        # log(1 + exp(-z)) for wins and log(1 + exp(z)) for losses, computed stably.
+        signed = np.where(data.team1_won > 0.5, -z, z)
+        value = float(np.logaddexp(0.0, signed).mean())
+        if self.hero_bias:
+            value += 0.5 * self.l2 * float(theta[len(self.columns):] @ theta[len(self.columns):])
+        return value
+
+    def gradient_and_hessian(self, theta: np.ndarray, data: MatchFeatures) -> Tuple[np.ndarray, np.ndarray]:
+        n, k = len(data), len(self.columns)
+        p = 1.0 / (1.0 + np.exp(-self.logits(theta, data)))
+        residual, weight = p - data.team1_won, p * (1.0 - p)
+        gradient = np.zeros(self.size)
+        hessian = np.zeros((self.size, self.size))
+        for start in range(0, n, HESSIAN_CHUNK_ROWS):
+            rows = slice(start, start + HESSIAN_CHUNK_ROWS)
+            design = self._design(data, rows)
+            gradient += design.T @ residual[rows]
+            hessian += design.T @ (design * weight[rows, None])
+        gradient /= n
+        hessian /= n
+        if self.hero_bias:
+            gradient[k:] += self.l2 * theta[k:]
+            hessian[k:, k:] += self.l2 * np.eye(self.n_heroes)
+        return gradient, hessian
+
+    def _design(self, data: MatchFeatures, rows: slice) -> np.ndarray:
+        components = data.components[rows][:, self.columns]
+        if not self.hero_bias:
+            return components
+        count = len(components)
+        heroes = np.zeros((count, self.n_heroes + 1))
+        index = np.arange(count)[:, None]
+        # A hero appears at most once per match, so plain fancy-index updates are safe; only the padding
+        # column can repeat, and it is dropped.
+        heroes[index, data.team1[rows]] += 1.0
+        heroes[index, data.team2[rows]] -= 1.0
+        return np.hstack([components, heroes[:, :self.n_heroes]])
+
+
+def fit(model: LogisticModel, data: MatchFeatures, theta: np.ndarray, max_iterations: int = 25,
+        tolerance: float = 1e-9) -> Tuple[np.ndarray, int]:
+    """Newton's method with a backtracking line search. Returns the parameters and the iterations used."""
+    loss = model.loss(theta, data)
+    for iteration in range(1, max_iterations + 1):
+        gradient, hessian = model.gradient_and_hessian(theta, data)
+        # A tiny ridge keeps the step defined when a component has no variance.
+        step = np.linalg.solve(hessian + 1e-10 * np.eye(model.size), gradient)
+        t = 1.0
+        while True:
+            candidate = theta - t * step
+            candidate_loss = model.loss(candidate, data)
+            if candidate_loss <= loss or t < 1e-6:
+                break
+            t /= 2
+        if not candidate_loss <= loss:
+            # The line search found no step that lowers the loss; theta is as good as it gets.
+            return theta, iteration
+        improvement = loss - candidate_loss
+        theta, loss = candidate, candidate_loss
+        if improvement < tolerance:
+            return theta, iteration
+    return theta, max_iterations
+
+
+def log_loss(probability: np.ndarray, team1_won: np.ndarray) -> float:
+    p = np.clip(probability, PROBABILITY_EPSILON, 1 - PROBABILITY_EPSILON)
+    return float(-(team1_won * np.log(p) + (1 - team1_won) * np.log(1 - p)).mean())
+
+
+def calibrate(logic: AnalysisLogic, data: MatchFeatures, hero_bias: bool = False, l2: float = 1e-3,
+              holdout: float = 0.1, seed: int = 0, max_iterations: int = 25) -> Dict[str, Any]:
+    """
+    Fits the k-factors (and biases) on the data minus a random holdout share, starting from the
+    engine's current factors. Returns a config dict for data/picker_config.json with fit statistics.
+    """
+    heroes = logic.all_heroes
+    holdout_mask = np.random.default_rng(seed).random(len(data)) < holdout
+    train, test = data.subset(~holdout_mask), data.subset(holdout_mask)
+    if not len(train):
+        raise ValueError("No matches left for training after the holdout split")
+
+    # Components without variance (e.g. no synergy data) cannot be fitted and keep their current factor.
+    columns = [c for c in range(len(COMPONENTS)) if np.any(train.components[:, c] != train.components[0, c])]
+    if 0 not in columns:
+        raise ValueError("Matchup scores do not vary across the archive; adv_k_factor cannot be fitted")
+    model = LogisticModel(columns, len(heroes), hero_bias, l2)
+
+    current = {"matchup": logic.adv_k, "winrate": logic.adv_k * logic.winrate_k, "synergy": logic.adv_k * logic.synergy_k}
+    start = np.zeros(model.size)
+    start[:len(columns)] = [current[COMPONENTS[c]] for c in columns]
+    theta, iterations = fit(model, train, start, max_iterations=max_iterations)
+
+    weights, bias = model._split(theta)
+    fitted = dict(zip((COMPONENTS[c] for c in columns), weights))
+    adv_k = fitted["matchup"]
+    if adv_k <= 0:
+        raise ValueError(f"Fitted matchup weight is {adv_k:.4g}; matchup scores do not predict wins in this archive")
+
+    def evaluate(theta_: np.ndarray, subset: MatchFeatures) -> Optional[float]:
+        return log_loss(1.0 / (1.0 + np.exp(-model.logits(theta_, subset))), subset.team1_won) if len(subset) else None
+
+    config: Dict[str, Any] = {
+        "adv_k_factor": adv_k,
+        "synergy_k_factor": fitted["synergy"] / adv_k if "synergy" in fitted else logic.synergy_k,
+        "winrate_k_factor": fitted["winrate"] / adv_k if "winrate" in fitted else logic.winrate_k,
+    }
+    if hero_bias:
+        config["hero_bias"] = {hero: float(bias[i] / adv_k) for i, hero in enumerate(heroes)}
+    config["calibration"] = {
+        "fitted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "matches": len(train),
+        "holdout_matches": len(test),
+        "iterations": iterations,
+        "hero_bias": hero_bias,
+        "l2": l2 if hero_bias else None,
+        "log_loss_before": {"train": evaluate(start, train), "holdout": evaluate(start, test)},
+        "log_loss_after": {"train": evaluate(theta, train), "holdout": evaluate(theta, test)},
+    }
+    return config
+
+
+def save_config(config: Dict[str, Any], path: Path) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4)
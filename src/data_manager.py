@@ -1,7 +1,14 @@
 import json
+import zlib
+from itertools import count
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from src.instrumentation import timed
+
+# Process-wide, so a generation number identifies one loaded snapshot even across DataManager instances.
+_generations = count(1)
+
 class DataManager:
     """Handles loading and accessing hero data from the JSON file."""
     def __init__(self, data_path: Path):
@@ -10,8 +17,13 @@ class DataManager:
         self._matchup_data: Dict[str, Dict[str, float]] = {}
         self._synergy_data: Dict[str, Dict[str, float]] = {}
         self._winrate_data: Dict[str, float] = {}
+        self._hero_ids: Dict[int, str] = {}
+        self.generation = 0
+        # crc32 of the data file's bytes; identifies the data that precomputed query tables were built from.
+        self.fingerprint: Optional[int] = None
         self.load_data()
 
+    @timed("data load")
     def load_data(self) -> None:
         """Loads and validates hero data from the JSON file."""
         if not self.data_path.exists():
@@ -20,8 +32,9 @@ class DataManager:
                 f"Please run update_data.py first."
             )
         
-        with open(self.data_path, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
+        with open(self.data_path, 'rb') as f:
+            raw_bytes = f.read()
+        raw_data = json.loads(raw_bytes)
         
         required_keys = ["heroes", "matchup_data", "synergy_data", "winrate_data"]
         if not all(key in raw_data for key in required_keys):
@@ -31,11 +44,22 @@ class DataManager:
         self._matchup_data = raw_data["matchup_data"]
         self._synergy_data = raw_data.get("synergy_data", {})
         self._winrate_data = raw_data.get("winrate_data", {})
+        self._hero_ids = {h['id']: h['name'] for h in raw_data["heroes"] if 'id' in h}
+        self.fingerprint = zlib.crc32(raw_bytes)
+        self.generation = next(_generations)
 
     def get_hero_list(self) -> List[str]:
         """Returns a sorted list of all hero names."""
         return self._heroes
     
+    def get_hero_by_id(self, hero_id: int) -> Optional[str]:
+        """Returns the name of the hero with the given Dota 2 hero ID, or None if unknown."""
+        return self._hero_ids.get(hero_id)
+
+    def get_hero_ids(self) -> Dict[int, str]:
+        """Returns the mapping of Dota 2 hero IDs to hero names."""
+        return self._hero_ids
+
     def get_advantage_score(self, hero1: str, hero2: str) -> float:
         """
         Retrieves the advantage score of hero1 VS hero2.
@@ -61,4 +85,12 @@ class DataManager:
 
     def get_hero_winrate(self, hero: str) -> float:
         """Retrieves the overall winrate for a single hero."""
-        return self._winrate_data.get(hero, 50.0)
\ No newline at end of file
+        return self._winrate_data.get(hero, 50.0)
+
+    def publish_shared(self):
+        """
+        Copies the loaded data into a shared memory snapshot (see src.shared_data) that worker
+        processes can attach to via its handle. The caller owns it and must unlink() it.
+        """
+        from src.shared_data import SharedSnapshot
+        return SharedSnapshot(self)
\ No newline at end of file
@@ -0,0 +1,217 @@
+import math
+from heapq import nlargest
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.analysis_logic import AnalysisLogic
+
+TEAMS = (1, 2)
+SCORE_EPSILON = 1e-9
+
+
+class DraftError(ValueError):
+    """Raised for events that are invalid in the current draft state."""
+
+
+class DraftSession:
+    """
+    Server-side state of one live draft, updated pick by pick.
+
+    For both teams the session keeps, over the whole hero pool, the running sum of matchup scores
+    against that team and of synergy scores with it. A pick adds one column to these sums, so each
+    event costs O(heroes) instead of a full analyze_teams call. After every event, delta() returns only
+    what changed since the previous delta.
+    """
+    def __init__(self, logic: AnalysisLogic, use_winrate: bool = True, use_synergy: bool = True, top_k: int = 10):
+        self.logic = logic
+        self.use_winrate = use_winrate
+        self.use_synergy = use_synergy and logic.dm.has_synergy_data()
+        self.top_k = top_k
+        self.teams: Dict[int, List[str]] = {1: [], 2: []}
+        self.bans: Set[str] = set()
+        self.seq = 0
+        self._last_state: Dict[str, Any] = {}
+        self._load_pool()
+
+    def _load_pool(self) -> None:
+        """(Re)builds everything derived from the loaded data, e.g. after the service reloads it."""
+        self.generation = self.logic.dm.generation
+        self.heroes: List[str] = list(self.logic.all_heroes)
+        self.index: Dict[str, int] = {hero: i for i, hero in enumerate(self.heroes)}
+        # Per-hero winrate bonus plus bias, indexed by use_winrate.
+        self._prior = {
+            use_winrate: [self.logic._hero_prior(h, use_winrate) for h in self.heroes] for use_winrate in (False, True)
+        }
+        for team in TEAMS:
+            self.teams[team] = [h for h in self.teams[team] if h in self.index]
+        self.bans &= set(self.heroes)
+        self._reset_sums()
+
+    def _reset_sums(self) -> None:
+        n = len(self.heroes)
+        self._vs = {team: [0.0] * n for team in TEAMS}
+        self._with = {team: [0.0] * n for team in TEAMS}
+        self._pair_synergy = {team: 0.0 for team in TEAMS}
+        for team in TEAMS:
+            members, self.teams[team] = self.teams[team], []
+            for hero in members:
+                self._add_to_sums(team, hero)
+
+    def _add_to_sums(self, team: int, hero: str) -> None:
+        dm = self.logic.dm
+        vs, with_ = self._vs[team], self._with[team]
+        for i, candidate in enumerate(self.heroes):
+            vs[i] += self.logic._calculate_base_score(candidate, hero)
+            with_[i] += dm.get_synergy_score(candidate, hero)
+        self._pair_synergy[team] += sum(dm.get_synergy_score(ally, hero) for ally in self.teams[team])
+        self.teams[team].append(hero)
+
+    # --- events -----------------------------------------------------------
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Applies one client event: pick, ban, remove or options."""
+        if self.generation != self.logic.dm.generation:
+            self._load_pool()
+        kind = event.get("type")
+        if kind == "pick":
+            self.pick(self._team(event), self._hero(event))
+        elif kind == "ban":
+            self.ban(self._hero(event))
+        elif kind == "remove":
+            self.remove(self._hero(event))
+        elif kind == "options":
+            self.set_options(event.get("use_winrate"), event.get("use_synergy"), event.get("top_k"))
+        else:
+            raise DraftError(f"Unknown event type: {kind!r}")
+
+    def pick(self, team: int, hero: str) -> None:
+        if self._is_taken(hero):
+            raise DraftError(f"{hero} is already picked or banned")
+        if len(self.teams[team]) >= 5:
+            raise DraftError(f"Team {team} already has 5 heroes")
+        self._add_to_sums(team, hero)
+
+    def ban(self, hero: str) -> None:
+        if self._is_taken(hero):
+            raise DraftError(f"{hero} is already picked or banned")
+        self.bans.add(hero)
+
+    def remove(self, hero: str) -> None:
+        """Undoes a pick or a ban. Removing a pick rebuilds the sums so no rounding error accumulates."""
+        if hero in self.bans:
+            self.bans.discard(hero)
+            return
+        for team in TEAMS:
+            if hero in self.teams[team]:
+                self.teams[team].remove(hero)
+                self._reset_sums()
+                return
+        raise DraftError(f"{hero} is not in the draft")
+
+    def set_options(self, use_winrate: Optional[bool] = None, use_synergy: Optional[bool] = None,
+                    top_k: Optional[int] = None) -> None:
+        for name, value in (("use_winrate", use_winrate), ("use_synergy", use_synergy)):
+            if value is not None and not isinstance(value, bool):
+                raise DraftError(f"'{name}' must be true or false")
+        if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, (int, float))
+                                  or isinstance(top_k, float) and not math.isfinite(top_k)):
+            raise DraftError("'top_k' must be a finite number")
+        if use_winrate is not None:
+            self.use_winrate = use_winrate
+        if use_synergy is not None:
+            self.use_synergy = use_synergy and self.logic.dm.has_synergy_data()
+        if top_k is not None:
+            self.top_k = max(1, int(top_k))
+
+    def _team(self, event: Dict[str, Any]) -> int:
+        team = event.get("team")
+        if isinstance(team, bool) or team not in TEAMS:
+            raise DraftError("'team' must be 1 or 2")
+        return team
+
+    def _hero(self, event: Dict[str, Any]) -> str:
+        hero = event.get("hero")
+        if not isinstance(hero, str) or hero not in self.index:
+            raise DraftError(f"Unknown hero: {hero!r}")
+        return hero
+
+    def _is_taken(self, hero: str) -> bool:
+        return hero in self.bans or hero in self.teams[1] or hero in self.teams[2]
+
+    # --- scoring ----------------------------------------------------------
+
+    def _hero_scores(self, team: int) -> Dict[str, float]:
+        enemy = 3 - team
+        members = self.teams[team]
+        result = {}
+        for hero in members:
+            i = self.index[hero]
+            score = self._vs[enemy][i] + self._prior[self.use_winrate][i]
+            if self.use_synergy and len(members) > 1:
+                own = self.logic.dm.get_synergy_score(hero, hero)
+                score += self.logic.synergy_k * (self._with[team][i] - own)
+            result[hero] = score
+        return result
+
+    def _suggestions(self, team: int) -> List[Tuple[str, float]]:
+        enemy = 3 - team
+        vs, with_ = self._vs[enemy], self._with[team]
+        synergy_k = self.logic.synergy_k if self.use_synergy and self.teams[team] else 0.0
+        prior = self._prior[self.use_winrate]
+        candidates = (
+            (hero, vs[i] + synergy_k * with_[i] + prior[i])
+            for i, hero in enumerate(self.heroes) if not self._is_taken(hero)
+        )
+        return nlargest(self.top_k, candidates, key=lambda item: item[1])
+
+    def state(self) -> Dict[str, Any]:
+        """Full current analysis in the same terms as analyze_teams, limited to the top-k suggestions."""
+        totals = {}
+        hero_scores = {team: self._hero_scores(team) for team in TEAMS}
+        for team in TEAMS:
+            total = sum(self._vs[3 - team][self.index[h]] for h in self.teams[team])
+            total += sum(self._prior[self.use_winrate][self.index[h]] for h in self.teams[team])
+            if self.use_synergy:
+                total += self.logic.synergy_k * self._pair_synergy[team]
+            totals[team] = total
+        return {
+            "team1": list(self.teams[1]),
+            "team2": list(self.teams[2]),
+            "bans": sorted(self.bans),
+            "win_probability_team1": self.logic._calculate_win_probability(totals[1], totals[2]),
+            "team1_total_score": totals[1],
+            "team2_total_score": totals[2],
+            "team1_hero_scores": hero_scores[1],
+            "team2_hero_scores": hero_scores[2],
+            "team1_suggestions": self._suggestions(1),
+            "team2_suggestions": self._suggestions(2),
+        }
+
+    def delta(self) -> Dict[str, Any]:
+        """Returns the changes since the previous delta (everything on the first call)."""
+        current = self.state()
+        previous = self._last_state
+        changes: Dict[str, Any] = {}
+        for key, value in current.items():
+            old = previous.get(key)
+            if key.endswith("_hero_scores"):
+                old = old or {}
+                changed = {h: s for h, s in value.items() if h not in old or abs(old[h] - s) > SCORE_EPSILON}
+                removed = [h for h in old if h not in value]
+                if changed or removed:
+                    changes[key] = {"set": changed, "removed": removed}
+            elif key.endswith("_suggestions"):
+                old = old or []
+                changed = {
+                    rank: [hero, score] for rank, (hero, score) in enumerate(value)
+                    if rank >= len(old) or old[rank][0] != hero or abs(old[rank][1] - score) > SCORE_EPSILON
+                }
+                if changed or len(old) != len(value):
+                    changes[key] = {"set": changed, "size": len(value)}
+            elif isinstance(value, float):
+                if old is None or abs(old - value) > SCORE_EPSILON:
+                    changes[key] = value
+            elif value != old:
+                changes[key] = value
+        self._last_state = current
+        self.seq += 1
+        return {"type": "delta", "seq": self.seq, "changes": changes}
@@ -0,0 +1,69 @@
+"""
+Headless entry point to the picker engine.
+
+Importing this module pulls in only the data loader, the scoring engine and its result types;
+nothing on this path may import tkinter, the theme, or the scraper's HTTP stack
+(benchmarks/check_import_time.py enforces it).
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.analysis_logic import AnalysisLogic
+from src.data_manager import DataManager
+from src.query_tables import QueryTables, query_tables_file
+from src.result_cache import ResultCache
+from src.results import DraftAnalysis, ScoreTable, ScoredHero, RatedHero, TeamAnalysis
+
+DEFAULT_DATA_FILE = Path("data/hero_matchups.json")
+# Written by calibrate.py; when present, its fitted factors replace DEFAULT_FACTORS.
+DEFAULT_CONFIG_FILE = Path("data/picker_config.json")
+DEFAULT_FACTORS = {
+    "adv_k_factor": 0.1,
+    "synergy_k_factor": 1.0,
+    "winrate_k_factor": 0.08,
+}
+
+__all__ = [
+    "AnalysisLogic", "DataManager", "ResultCache", "ScoredHero", "RatedHero", "TeamAnalysis", "DraftAnalysis", "ScoreTable",
+    "DEFAULT_DATA_FILE", "DEFAULT_CONFIG_FILE", "DEFAULT_FACTORS", "load_config", "load_engine",
+    "QueryTables", "load_query_tables",
+]
+
+ENGINE_PARAMETERS = set(DEFAULT_FACTORS) | {"hero_bias"}
+
+
+def load_config(config_file: Path = DEFAULT_CONFIG_FILE) -> Dict[str, Any]:
+    """Reads the engine parameters (k-factors and hero_bias) from a config file; other keys are ignored."""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return {key: value for key, value in config.items() if key in ENGINE_PARAMETERS}
+
+
+def load_query_tables(data_file: Path = DEFAULT_DATA_FILE) -> Optional[QueryTables]:
+    """The precomputed query tables stored next to data_file, or None if there are none (or unreadable ones)."""
+    path = query_tables_file(data_file)
+    if not path.exists():
+        return None
+    try:
+        return QueryTables.load(path)
+    except (OSError, ValueError):
+        return None
+
+
+def load_engine(data_file: Path = DEFAULT_DATA_FILE, cache: Optional[ResultCache] = None,
+                config_file: Optional[Path] = DEFAULT_CONFIG_FILE, query_tables: bool = True,
+                **factors) -> AnalysisLogic:
+    """
+    Loads hero data and returns a ready AnalysisLogic. Parameters come from DEFAULT_FACTORS, then the
+    config file if it exists (pass config_file=None to skip it), then the keyword arguments. The query
+    tables next to the data file are attached unless query_tables is False; the engine only uses them
+    if they were built from the same data and factors.
+    """
+    unknown = set(factors) - ENGINE_PARAMETERS
+    if unknown:
+        raise TypeError(f"Unknown engine factor(s): {', '.join(sorted(unknown))}")
+    config = load_config(config_file) if config_file is not None and Path(config_file).exists() else {}
+    data_manager = DataManager(Path(data_file))
+    tables = load_query_tables(data_file) if query_tables else None
+    return AnalysisLogic(data_manager, cache=cache, query_tables=tables, **{**DEFAULT_FACTORS, **config, **factors})
@@ -0,0 +1,261 @@
+"""
+Evaluation of the win-probability model against finished matches, used by evaluate.py.
+
+Archive records are drafts plus the winner (see parse_winner). Workers parse them in batches, score a
+whole batch at once with numpy using the same formula as AnalysisLogic.analyze_teams, and return
+mergeable per-group metric sums, so memory stays flat however long the archive is.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.analysis_logic import AnalysisLogic
+from src.bulk import DraftFormatError, Record, chunked, decode_record, map_chunks_in_pool, parse_draft
+from src.shared_data import SharedDataManager, SnapshotHandle
+
+TEAM_SIZE = 5
+PROBABILITY_EPSILON = 1e-15
+TEAM1_WIN_VALUES = {"1", "team1", "radiant", "true"}
+TEAM2_WIN_VALUES = {"2", "team2", "dire", "false"}
+
+GroupKey = Tuple[str, str]
+OVERALL: GroupKey = ("overall", "")
+
+
+class EvaluationStats:
+    """Running sums for log-loss, Brier score, accuracy and calibration buckets; merge() combines partial results."""
+    def __init__(self, buckets: int = 10):
+        self.buckets = buckets
+        self.count = 0
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+        self.correct = 0
+        self.bucket_count = np.zeros(buckets, dtype=np.int64)
+        self.bucket_predicted = np.zeros(buckets)
+        self.bucket_wins = np.zeros(buckets)
+
+    def add(self, probability: np.ndarray, team1_won: np.ndarray) -> None:
+        """Adds a batch of team 1 win probabilities (0..1) and outcomes (1.0 if team 1 won)."""
+        p = np.clip(probability, PROBABILITY_EPSILON, 1 - PROBABILITY_EPSILON)
+        self.count += len(p)
+        self.log_loss_sum += float(-(team1_won * np.log(p) + (1 - team1_won) * np.log(1 - p)).sum())
+        self.brier_sum += float(((probability - team1_won) ** 2).sum())
+        self.correct += int(((probability > 0.5) == (team1_won > 0.5)).sum())
+        bucket = np.minimum((probability * self.buckets).astype(np.int64), self.buckets - 1)
+        self.bucket_count += np.bincount(bucket, minlength=self.buckets)
+        self.bucket_predicted += np.bincount(bucket, weights=probability, minlength=self.buckets)
+        self.bucket_wins += np.bincount(bucket, weights=team1_won, minlength=self.buckets)
+
+    def merge(self, other: "EvaluationStats") -> None:
+        self.count += other.count
+        self.log_loss_sum += other.log_loss_sum
+        self.brier_sum += other.brier_sum
+        self.correct += other.correct
+        self.bucket_count += other.bucket_count
+        self.bucket_predicted += other.bucket_predicted
+        self.bucket_wins += other.bucket_wins
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"matches": 0}
+        calibration = []
+        for i in range(self.buckets):
+            n = int(self.bucket_count[i])
+            calibration.append({
+                "range": [i / self.buckets, (i + 1) / self.buckets],
+                "matches": n,
+                "mean_predicted": float(self.bucket_predicted[i] / n) if n else None,
+                "observed_win_rate": float(self.bucket_wins[i] / n) if n else None,
+            })
+        return {
+            "matches": self.count,
+            "log_loss": self.log_loss_sum / self.count,
+            "brier": self.brier_sum / self.count,
+            "accuracy": self.correct / self.count,
+            "calibration": calibration,
+        }
+
+
+class BatchScorer:
+    """
+    Vectorized analyze_teams win probability. The data matrices get one extra all-zero hero
+    (winrate 50, no bias) that pads teams with fewer than five heroes, so it contributes nothing.
+    """
+    def __init__(self, logic: AnalysisLogic, use_winrate: bool = True, use_synergy: bool = True):
+        self.logic = logic
+        self.use_winrate = use_winrate
+        self.use_synergy = use_synergy and logic.dm.has_synergy_data()
+        heroes = logic.all_heroes
+        n = len(heroes)
+        self.index = {hero: i for i, hero in enumerate(heroes)}
+        self.pad = n
+
+        self.matchup = np.zeros((n + 1, n + 1))
+        self.synergy = np.zeros((n + 1, n + 1))
+        self.winrate = np.full(n + 1, 50.0)
+        self.bias = np.zeros(n + 1)
+        self.bias[:n] = [logic.hero_bias.get(hero, 0.0) for hero in heroes]
+        if isinstance(logic.dm, SharedDataManager):
+            views = logic.dm.matrix_views()
+            self.matchup[:n, :n] = np.asarray(views[0]).reshape(n, n)
+            self.synergy[:n, :n] = np.asarray(views[1]).reshape(n, n)
+            self.winrate[:n] = np.asarray(views[2])
+            for view in views:
+                view.release()
+        else:
+            for i, hero in enumerate(heroes):
+                self.winrate[i] = logic.dm.get_hero_winrate(hero)
+                for j, other in enumerate(heroes):
+                    self.matchup[i, j] = logic.dm.get_advantage_score(hero, other)
+                    self.synergy[i, j] = logic.dm.get_synergy_score(hero, other)
+        self._pairs = np.triu(np.ones((TEAM_SIZE, TEAM_SIZE), dtype=bool), k=1)
+        self.prior = self.bias + ((self.winrate - 50.0) * logic.winrate_k if self.use_winrate else 0.0)
+
+    def team_indices(self, teams: Sequence[List[str]]) -> np.ndarray:
+        rows = np.full((len(teams), TEAM_SIZE), self.pad, dtype=np.int64)
+        for r, team in enumerate(teams):
+            rows[r, :len(team)] = [self.index[hero] for hero in team]
+        return rows
+
+    def _matchup_sum(self, team: np.ndarray, enemy: np.ndarray) -> np.ndarray:
+        return self.matchup[team[:, :, None], enemy[:, None, :]].sum(axis=(1, 2))
+
+    def _pair_synergy(self, team: np.ndarray) -> np.ndarray:
+        return self.synergy[team[:, :, None], team[:, None, :]][:, self._pairs].sum(axis=1)
+
+    def _team_totals(self, team: np.ndarray, enemy: np.ndarray) -> np.ndarray:
+        total = self._matchup_sum(team, enemy) + self.prior[team].sum(axis=1)
+        if self.use_synergy:
+            total += self.logic.synergy_k * self._pair_synergy(team)
+        return total
+
+    def components(self, team1: np.ndarray, team2: np.ndarray) -> np.ndarray:
+        """
+        Unweighted score components as team 1 minus team 2, shape (batch, 3): matchup sum,
+        sum of (winrate - 50) and pair synergy. The k-factors and hero bias are not applied.
+        """
+        return np.stack([
+            self._matchup_sum(team1, team2) - self._matchup_sum(team2, team1),
+            (self.winrate[team1] - 50.0).sum(axis=1) - (self.winrate[team2] - 50.0).sum(axis=1),
+            self._pair_synergy(team1) - self._pair_synergy(team2),
+        ], axis=1)
+
+    def win_probability(self, team1: np.ndarray, team2: np.ndarray) -> np.ndarray:
+        """Team 1 win probability as a fraction (analyze_teams reports the same value in percent)."""
+        advantage = self._team_totals(team1, team2) - self._team_totals(team2, team1)
+        return 1.0 / (1.0 + np.exp(-self.logic.adv_k * advantage))
+
+
+def parse_winner(record: Dict[str, Any]) -> float:
+    """1.0 if team 1 won, else 0.0. Accepts 'winner' (1/2, team1/team2, radiant/dire) or boolean 'radiant_win'."""
+    value = record.get("winner", record.get("radiant_win"))
+    text = str(value).strip().lower()
+    if text in TEAM1_WIN_VALUES:
+        return 1.0
+    if text in TEAM2_WIN_VALUES:
+        return 0.0
+    raise DraftFormatError(f"Missing or invalid winner: {value!r}")
+
+
+def evaluate_batch(scorer: BatchScorer, batch: List[Tuple[int, Record]], splits: Sequence[str],
+                   buckets: int) -> Tuple[Dict[GroupKey, EvaluationStats], int]:
+    """Scores one batch and returns metric sums per group (overall and one per split value) plus the error count."""
+    known = scorer.index
+    team1, team2, outcomes, labels, errors = [], [], [], [], 0
+    for _, record in batch:
+        try:
+            record = decode_record(record)
+            draft = parse_draft(scorer.logic, known, record)
+            outcomes.append(parse_winner(record))
+        except DraftFormatError:
+            errors += 1
+            continue
+        team1.append(draft["team1"])
+        team2.append(draft["team2"])
+        labels.append([str(record.get(field, "")) for field in splits])
+
+    stats: Dict[GroupKey, EvaluationStats] = {}
+    if not outcomes:
+        return stats, errors
+    probability = scorer.win_probability(scorer.team_indices(team1), scorer.team_indices(team2))
+    won = np.asarray(outcomes)
+    stats[OVERALL] = EvaluationStats(buckets)
+    stats[OVERALL].add(probability, won)
+    for s, field in enumerate(splits):
+        column = np.asarray([row[s] for row in labels])
+        for value in np.unique(column):
+            mask = column == value
+            group = stats.setdefault((field, str(value)), EvaluationStats(buckets))
+            group.add(probability[mask], won[mask])
+    return stats, errors
+
+
+# Worker state, set up once per process by the pool initializer.
+_worker_scorer: Optional[BatchScorer] = None
+_worker_options: Dict[str, Any] = {}
+
+
+def _init_worker(handle: SnapshotHandle, parameters: Dict[str, Any], options: Dict[str, Any]) -> None:
+    global _worker_scorer, _worker_options
+    logic = AnalysisLogic(SharedDataManager(handle), **parameters)
+    _worker_scorer = BatchScorer(logic, options["use_winrate"], options["use_synergy"])
+    _worker_options = options
+
+
+def _evaluate_batch_in_worker(batch: List[Tuple[int, Record]]) -> Tuple[Dict[GroupKey, EvaluationStats], int]:
+    return evaluate_batch(_worker_scorer, batch, _worker_options["splits"], _worker_options["buckets"])
+
+
+class Evaluator:
+    """Streams an archive through BatchScorer, in-process (workers=0) or across a process pool, and merges the metrics."""
+    def __init__(self, logic: AnalysisLogic, workers: int = 0, batch_size: int = 4096, use_winrate: bool = True,
+                 use_synergy: bool = True, splits: Sequence[str] = (), buckets: int = 10):
+        self.logic = logic
+        self.workers = workers
+        self.batch_size = batch_size
+        self.options = {
+            "use_winrate": use_winrate,
+            "use_synergy": use_synergy,
+            "splits": list(splits),
+            "buckets": buckets,
+        }
+        self.stats: Dict[GroupKey, EvaluationStats] = {}
+        self.errors = 0
+
+    def run(self, records: Iterable[Tuple[int, Record]]) -> Dict[str, Any]:
+        if self.workers > 0:
+            results = map_chunks_in_pool(self.logic, _evaluate_batch_in_worker, chunked(records, self.batch_size),
+                                         self.workers, _init_worker, self.options)
+        else:
+            scorer = BatchScorer(self.logic, self.options["use_winrate"], self.options["use_synergy"])
+            results = (
+                evaluate_batch(scorer, batch, self.options["splits"], self.options["buckets"])
+                for batch in chunked(records, self.batch_size)
+            )
+        for stats, errors in results:
+            self.errors += errors
+            for key, group in stats.items():
+                if key in self.stats:
+                    self.stats[key].merge(group)
+                else:
+                    self.stats[key] = group
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        overall = self.stats.get(OVERALL, EvaluationStats(self.options["buckets"]))
+        report = {
+            "factors": {
+                "adv_k_factor": self.logic.adv_k,
+                "synergy_k_factor": self.logic.synergy_k,
+                "winrate_k_factor": self.logic.winrate_k,
+            },
+            "hero_bias": bool(self.logic.hero_bias),
+            "use_winrate": self.options["use_winrate"],
+            "use_synergy": self.options["use_synergy"],
+            "invalid_records": self.errors,
+            "overall": overall.summary(),
+        }
+        for field in self.options["splits"]:
+            groups = {value: stats.summary() for (name, value), stats in self.stats.items() if name == field}
+            report[f"by_{field}"] = dict(sorted(groups.items()))
+        return report
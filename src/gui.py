@@ -1,15 +1,28 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import List, Tuple, Callable
-import threading
+from typing import List, Tuple, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import time
+
+from src.hero_search import HeroSearchIndex
+from src.instrumentation import engine_stats
+from src.results_view import VirtualResultsView
 
 class HeroSelector(ttk.Frame):
     """Widget for selecting heroes."""
     MAX_HEROES = 5
+    SEARCH_DEBOUNCE_MS = 120
     
-    def __init__(self, parent, title, all_heroes):
+    def __init__(self, parent, title, all_heroes, search_index: HeroSearchIndex = None,
+                 on_change: Optional[Callable[[], None]] = None):
         super().__init__(parent)
         self.all_heroes = all_heroes
+        self.on_change = on_change
+        self.search_index = search_index or HeroSearchIndex(all_heroes)
+        self._selected: List[str] = []
+        self._visible: List[str] = []
+        self._pending_search = None
         
         ttk.Label(self, text=title, style="Header.TLabel").pack(pady=(0, 5), anchor="w")
 
@@ -50,51 +63,111 @@ class HeroSelector(ttk.Frame):
 
         self.available_list.bind("<Double-Button-1>", lambda e: self._add_hero())
         self.selected_list.bind("<Double-Button-1>", lambda e: self._remove_hero())
-        self.search_var.trace_add("write", lambda *a: self._update_list())
+        self.search_var.trace_add("write", lambda *a: self._schedule_update())
         self._update_list()
 
+    def _schedule_update(self):
+        """Debounces keystrokes so the list is filtered once the user pauses typing."""
+        if self._pending_search is not None:
+            self.after_cancel(self._pending_search)
+        self._pending_search = self.after(self.SEARCH_DEBOUNCE_MS, self._update_list)
+
     def _update_list(self):
-        search_term = self.search_var.get().lower()
-        self.available_list.delete(0, "end")
-        selected_heroes = set(self.get_selected_heroes())
-        for hero in self.all_heroes:
-            if search_term in hero.lower() and hero not in selected_heroes:
-                self.available_list.insert("end", hero)
+        self._pending_search = None
+        selected_heroes = set(self._selected)
+        wanted = [h for h in self.search_index.search(self.search_var.get()) if h not in selected_heroes]
+        self._sync_available(wanted)
+
+    def _sync_available(self, wanted: List[str]):
+        """
+        Applies the difference between the shown and the wanted hero lists to the Listbox.
+        Both lists follow the index order, so a single merge pass finds the runs to delete and insert.
+        """
+        current, rank = self._visible, self.search_index.rank
+        pos = i = j = 0
+        while i < len(current) or j < len(wanted):
+            if i < len(current) and j < len(wanted) and current[i] == wanted[j]:
+                i, j, pos = i + 1, j + 1, pos + 1
+            elif j >= len(wanted) or (i < len(current) and rank[current[i]] < rank[wanted[j]]):
+                start = i
+                while i < len(current) and (j >= len(wanted) or rank[current[i]] < rank[wanted[j]]):
+                    i += 1
+                self.available_list.delete(pos, pos + (i - start) - 1)
+            else:
+                start = j
+                while j < len(wanted) and (i >= len(current) or rank[wanted[j]] < rank[current[i]]):
+                    j += 1
+                self.available_list.insert(pos, *wanted[start:j])
+                pos += j - start
+        self._visible = wanted
 
     def _add_hero(self):
         selected_indices = self.available_list.curselection()
         if not selected_indices: return
 
-        if len(self.selected_list.get(0, "end")) + len(selected_indices) > self.MAX_HEROES:
+        if len(self._selected) + len(selected_indices) > self.MAX_HEROES:
             messagebox.showwarning("Limit Reached", f"A team cannot have more than {self.MAX_HEROES} heroes.")
             return
             
-        heroes_to_add = [self.available_list.get(i) for i in selected_indices]
-        for hero in heroes_to_add:
-            self.selected_list.insert("end", hero)
+        heroes_to_add = [self._visible[i] for i in selected_indices]
+        self.selected_list.insert("end", *heroes_to_add)
+        self._selected.extend(heroes_to_add)
         self._update_list()
+        self._notify_change()
 
     def _remove_hero(self):
         selected_indices = self.selected_list.curselection()
         if not selected_indices: return
         for i in reversed(selected_indices):
             self.selected_list.delete(i)
+            del self._selected[i]
         self._update_list()
+        self._notify_change()
+
+    def _notify_change(self):
+        if self.on_change is not None:
+            self.on_change()
 
     def get_selected_heroes(self):
-        return list(self.selected_list.get(0, "end"))
+        return list(self._selected)
+
+    def set_selected_heroes(self, heroes: List[str]):
+        """Replaces the selection, e.g. with recognized heroes. Notifies only if it actually changed."""
+        heroes = [h for h in heroes if h in self.search_index.rank][:self.MAX_HEROES]
+        if heroes == self._selected:
+            return
+        self._selected = list(heroes)
+        self.selected_list.delete(0, "end")
+        if heroes:
+            self.selected_list.insert("end", *heroes)
+        self._update_list()
+        self._notify_change()
 
 class Application(ttk.Frame):
-    """Main application GUI with threading support."""
+    """
+    Main application GUI. Analyses re-run automatically whenever the draft changes;
+    they execute on one shared worker and their results come back through a queue polled by the Tk loop.
+    """
+    RESULT_POLL_MS = 30
+
     def __init__(self, parent, data_manager, logic):
         super().__init__(parent, padding="10")
         self.parent = parent
         self.dm = data_manager
         self.logic = logic
         self.all_heroes = sorted(self.dm.get_hero_list())
-        self._analysis_cache = {}
+        self.search_index = HeroSearchIndex(self.all_heroes)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        self._results = queue.Queue()
+        self._request_seq = {"counter": 0, "analysis": 0}
+        self._pending_jobs = {}
+        self._job_labels = {"counter": "counter-picks", "analysis": "team analysis"}
+        self._recognition = None
+        self._my_team = 1
         self._configure_styles()
         self._create_widgets()
+        self._poll_id = self.after(self.RESULT_POLL_MS, self._drain_results)
+        self.bind("<Destroy>", self._on_destroy)
 
     def _configure_styles(self):
         style = ttk.Style(self)
@@ -112,30 +185,50 @@ class Application(ttk.Frame):
         options_frame.pack(fill="x", pady=(0, 10))
         
         self.use_winrate_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(options_frame, text="Factor in hero winrates", variable=self.use_winrate_var).pack(side="left", padx=(0,10))
+        ttk.Checkbutton(options_frame, text="Factor in hero winrates", variable=self.use_winrate_var,
+                        command=self._on_options_changed).pack(side="left", padx=(0,10))
         
         self.use_synergy_var = tk.BooleanVar(value=True)
-        self.synergy_checkbutton = ttk.Checkbutton(options_frame, text="Consider hero synergy", variable=self.use_synergy_var)
+        self.synergy_checkbutton = ttk.Checkbutton(options_frame, text="Consider hero synergy", variable=self.use_synergy_var,
+                                                   command=self._on_options_changed)
         self.synergy_checkbutton.pack(side="left")
 
         if not self.dm.has_synergy_data():
             self.use_synergy_var.set(False)
             self.synergy_checkbutton.config(state="disabled")
 
-        notebook = ttk.Notebook(self)
-        notebook.pack(fill="both", expand=True)
+        # Packed before the notebook so it keeps its line when the window is small.
+        self.status_label = ttk.Label(self, text="", anchor="w")
+        self.status_label.pack(side="bottom", fill="x", pady=(5, 0))
+
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill="both", expand=True)
 
-        self.counter_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(self.counter_tab, text="Counter-Picker")
+        self.counter_tab = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.counter_tab, text="Counter-Picker")
         self._create_counter_picker_tab()
 
-        self.analysis_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(self.analysis_tab, text="Team Analysis")
-        self._create_team_analysis_tab()
+        # The Team Analysis tab is only built the first time it is shown, to keep startup short.
+        self.analysis_tab = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.analysis_tab, text="Team Analysis")
+        self._analysis_tab_built = False
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _on_tab_changed(self, event=None):
+        if self.notebook.select() == str(self.analysis_tab):
+            self._ensure_analysis_tab()
+
+    def _ensure_analysis_tab(self):
+        if not self._analysis_tab_built:
+            self._analysis_tab_built = True
+            self._create_team_analysis_tab()
 
     def _create_counter_picker_tab(self):
         self.counter_tab.columnconfigure(0, weight=1)
-        self.counter_selector = HeroSelector(self.counter_tab, "Select Enemy Heroes", self.all_heroes)
+        self.counter_selector = HeroSelector(
+            self.counter_tab, "Select Enemy Heroes", self.all_heroes, self.search_index,
+            on_change=lambda: self._on_find_counters(explicit=False)
+        )
         self.counter_selector.pack(fill="x", pady=(0, 10), ipady=50)
 
         button_frame = ttk.Frame(self.counter_tab)
@@ -148,45 +241,34 @@ class Application(ttk.Frame):
             button_frame, mode="indeterminate", length=100
         )
 
-        self.counter_results_frame, self.counter_results_tree = self._create_results_widget(self.counter_tab)
+        self.counter_results_view = VirtualResultsView(self.counter_tab)
 
-    def _on_find_counters(self):
+    def _on_find_counters(self, explicit: bool = True):
         enemy_heroes = self.counter_selector.get_selected_heroes()
         if not enemy_heroes:
-            messagebox.showwarning("Input Required", "Please select at least one enemy hero.")
+            self._supersede("counter")
+            if explicit:
+                messagebox.showwarning("Input Required", "Please select at least one enemy hero.")
             return
         
-        self.counter_button.pack_forget()
-        self.counter_progress.pack(side="left", padx=5)
-        self.counter_progress.start()
-        
-        threading.Thread(
-            target=self._run_counter_analysis,
-            args=(enemy_heroes, self.use_winrate_var.get()),
-            daemon=True
-        ).start()
-
-    def _run_counter_analysis(self, enemy_heroes, use_winrate):
-        """Threaded function for counter analysis."""
-        try:
-            cache_key = ("counter", tuple(sorted(enemy_heroes)), use_winrate)
-            if cache_key in self._analysis_cache:
-                recommendations = self._analysis_cache[cache_key]
-            else:
-                recommendations = self.logic.get_counter_picks(enemy_heroes, use_winrate)
-                self._analysis_cache[cache_key] = recommendations
-            
-            normalized = self.logic.normalize_scores(recommendations)
-            self._update_ui_after(lambda: self._show_counter_results(normalized))
-        except Exception as e:
-            self._update_ui_after(lambda: messagebox.showerror("Analysis Error", str(e)))
-        finally:
-            self._update_ui_after(self._reset_counter_button)
+        self._show_busy(self.counter_button, self.counter_progress)
+        self._submit_analysis("counter", self._compute_counter_results, enemy_heroes, self.use_winrate_var.get())
+
+    def _compute_counter_results(self, enemy_heroes, use_winrate):
+        """Runs on the analysis worker. Repeated drafts are served from the engine's result cache."""
+        return self.logic.normalize_scores(self.logic.get_counter_picks(enemy_heroes, use_winrate))
+
+    def _deliver_counter_results(self, results, error):
+        self._reset_counter_button()
+        if error is not None:
+            messagebox.showerror("Analysis Error", str(error))
+        else:
+            self._show_counter_results(results)
 
     def _show_counter_results(self, results):
-        if not self.counter_results_frame.winfo_ismapped():
-            self.counter_results_frame.pack(fill="both", expand=True, pady=(10, 0))
-        self._update_treeview(self.counter_results_tree, results, "Recommended Picks")
+        if not self.counter_results_view.winfo_ismapped():
+            self.counter_results_view.pack(fill="both", expand=True, pady=(10, 0))
+        self.counter_results_view.set_rows(results, "Recommended Picks")
 
     def _reset_counter_button(self):
         self.counter_progress.stop()
@@ -197,10 +279,16 @@ class Application(ttk.Frame):
         self.analysis_tab.columnconfigure(0, weight=1)
         self.analysis_tab.columnconfigure(1, weight=1)
         
-        self.team1_selector = HeroSelector(self.analysis_tab, "Team 1 (Radiant)", self.all_heroes)
+        self.team1_selector = HeroSelector(
+            self.analysis_tab, "Team 1 (Radiant)", self.all_heroes, self.search_index,
+            on_change=lambda: self._on_analyze_teams(explicit=False)
+        )
         self.team1_selector.grid(row=0, column=0, sticky="ew", padx=(0, 5))
         
-        self.team2_selector = HeroSelector(self.analysis_tab, "Team 2 (Dire)", self.all_heroes)
+        self.team2_selector = HeroSelector(
+            self.analysis_tab, "Team 2 (Dire)", self.all_heroes, self.search_index,
+            on_change=lambda: self._on_analyze_teams(explicit=False)
+        )
         self.team2_selector.grid(row=0, column=1, sticky="ew", padx=(5, 0))
 
         bottom_frame = ttk.Frame(self.analysis_tab)
@@ -219,43 +307,37 @@ class Application(ttk.Frame):
 
         self.analysis_results_frame = ttk.Frame(bottom_frame)
 
-    def _on_analyze_teams(self):
+    def _on_analyze_teams(self, explicit: bool = True):
         t1_heroes = self.team1_selector.get_selected_heroes()
         t2_heroes = self.team2_selector.get_selected_heroes()
 
         if not t1_heroes or not t2_heroes:
-            messagebox.showwarning("Input Required", "Please select at least one hero for each team.")
+            self._supersede("analysis")
+            if explicit:
+                messagebox.showwarning("Input Required", "Please select at least one hero for each team.")
             return
         
-        self.analyze_button.pack_forget()
-        self.analyze_progress.pack(side="left", padx=5)
-        self.analyze_progress.start()
-        
-        threading.Thread(
-            target=self._run_team_analysis,
-            args=(t1_heroes, t2_heroes, self.use_winrate_var.get(), self.use_synergy_var.get()),
-            daemon=True
-        ).start()
-
-    def _run_team_analysis(self, t1_heroes, t2_heroes, use_winrate, use_synergy):
-        """Threaded function for team analysis."""
-        try:
-            cache_key = ("analysis", tuple(sorted(t1_heroes)), tuple(sorted(t2_heroes)), use_winrate, use_synergy)
-            if cache_key in self._analysis_cache:
-                analysis = self._analysis_cache[cache_key]
-            else:
-                analysis = self.logic.analyze_teams(t1_heroes, t2_heroes, use_winrate, use_synergy)
-                self._analysis_cache[cache_key] = analysis
-            
-            self._update_ui_after(lambda: self._show_team_results(analysis))
-        except Exception as e:
-            self._update_ui_after(lambda: messagebox.showerror("Analysis Error", str(e)))
-        finally:
-            self._update_ui_after(self._reset_analyze_button)
+        self._show_busy(self.analyze_button, self.analyze_progress)
+        self._submit_analysis(
+            "analysis", self._compute_team_results,
+            t1_heroes, t2_heroes, self.use_winrate_var.get(), self.use_synergy_var.get()
+        )
+
+    def _compute_team_results(self, t1_heroes, t2_heroes, use_winrate, use_synergy):
+        """Runs on the analysis worker. Repeated drafts are served from the engine's result cache."""
+        return self.logic.analyze_teams(t1_heroes, t2_heroes, use_winrate, use_synergy)
+
+    def _deliver_team_results(self, analysis, error):
+        self._reset_analyze_button()
+        if error is not None:
+            messagebox.showerror("Analysis Error", str(error))
+        else:
+            self._show_team_results(analysis)
 
     def _show_team_results(self, analysis):
-        if not self.analysis_results_frame.winfo_ismapped():
+        if not hasattr(self, "win_prob_bar"):
             self._create_analysis_results_widgets()
+        if not self.analysis_results_frame.winfo_ismapped():
             self.analysis_results_frame.pack(fill="both", expand=True, pady=(10, 0))
 
         win_prob_t1 = analysis['win_probability_team1']
@@ -271,10 +353,10 @@ class Application(ttk.Frame):
             self.win_prob_label.config(text="Matchup is Even")
             self.win_prob_bar.configure(style="TProgressbar")
 
-        self._update_treeview(self.t1_contrib_tree, self.logic.normalize_scores(analysis['team1_hero_scores']))
-        self._update_treeview(self.t2_contrib_tree, self.logic.normalize_scores(analysis['team2_hero_scores']))
-        self._update_treeview(self.t1_suggest_tree, self.logic.normalize_scores(analysis['team1_suggestions']))
-        self._update_treeview(self.t2_suggest_tree, self.logic.normalize_scores(analysis['team2_suggestions']))
+        self.t1_contrib_view.set_rows(self.logic.normalize_scores(analysis['team1_hero_scores']))
+        self.t2_contrib_view.set_rows(self.logic.normalize_scores(analysis['team2_hero_scores']))
+        self.t1_suggest_view.set_rows(self.logic.normalize_scores(analysis['team1_suggestions']))
+        self.t2_suggest_view.set_rows(self.logic.normalize_scores(analysis['team2_suggestions']))
 
     def _reset_analyze_button(self):
         self.analyze_progress.stop()
@@ -302,48 +384,114 @@ class Application(ttk.Frame):
         
         t1_notebook = ttk.Notebook(t1_tab)
         t1_notebook.pack(fill="both", expand=True)
-        self.t1_contrib_tree, self.t1_suggest_tree = self._setup_analysis_sub_notebook(t1_notebook)
+        self.t1_contrib_view, self.t1_suggest_view = self._setup_analysis_sub_notebook(t1_notebook)
         
         t2_notebook = ttk.Notebook(t2_tab)
         t2_notebook.pack(fill="both", expand=True)
-        self.t2_contrib_tree, self.t2_suggest_tree = self._setup_analysis_sub_notebook(t2_notebook)
+        self.t2_contrib_view, self.t2_suggest_view = self._setup_analysis_sub_notebook(t2_notebook)
 
-    def _setup_analysis_sub_notebook(self, parent_notebook: ttk.Notebook) -> Tuple[ttk.Treeview, ttk.Treeview]:
+    def _setup_analysis_sub_notebook(self, parent_notebook: ttk.Notebook) -> Tuple[VirtualResultsView, VirtualResultsView]:
         """[REFACTORED] Creates and populates a sub-notebook for hero contributions and suggestions."""
-        contrib_frame, contrib_tree = self._create_results_widget(parent_notebook)
-        suggest_frame, suggest_tree = self._create_results_widget(parent_notebook)
-        parent_notebook.add(contrib_frame, text="Hero Contributions")
-        parent_notebook.add(suggest_frame, text="Draft Suggestions")
-        return contrib_tree, suggest_tree
-
-    def _create_results_widget(self, parent) -> Tuple[ttk.Frame, ttk.Treeview]:
-        """Creates a container frame with a Treeview and a scrollbar."""
-        container = ttk.Frame(parent)
-        tree = ttk.Treeview(container, columns=('Hero', 'Score', 'Rating'), show='headings')
-        tree.heading('Hero', text='Hero')
-        tree.heading('Score', text='Score')
-        tree.heading('Rating', text='Rating')
-        tree.column('Hero', width=150, anchor='w')
-        tree.column('Score', width=80, anchor='center')
-        tree.column('Rating', width=80, anchor='center')
-        
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        scrollbar.pack(side="right", fill="y")
-        tree.pack(side="left", fill="both", expand=True)
-        
-        return container, tree
-
-    def _update_treeview(self, tree: ttk.Treeview, data: List, placeholder: str = "No data"):
-        """Clears and populates a Treeview with normalized score data."""
-        tree.delete(*tree.get_children())
-        if not data:
-            tree.insert('', 'end', values=(placeholder, "", ""))
+        contrib_view = VirtualResultsView(parent_notebook)
+        suggest_view = VirtualResultsView(parent_notebook)
+        parent_notebook.add(contrib_view, text="Hero Contributions")
+        parent_notebook.add(suggest_view, text="Draft Suggestions")
+        return contrib_view, suggest_view
+
+    def _on_options_changed(self):
+        self._on_find_counters(explicit=False)
+        if self._analysis_tab_built:
+            self._on_analyze_teams(explicit=False)
+
+    def _show_busy(self, button: ttk.Button, progress: ttk.Progressbar):
+        if progress.winfo_manager():
+            return
+        button.pack_forget()
+        progress.pack(side="left", padx=5)
+        progress.start()
+
+    def _submit_analysis(self, kind: str, compute: Callable, *args):
+        """Queues a job on the shared worker. Any older job of the same kind is cancelled or its result dropped."""
+        self._request_seq[kind] += 1
+        previous = self._pending_jobs.get(kind)
+        if previous is not None:
+            previous.cancel()
+        self._pending_jobs[kind] = self._executor.submit(self._run_job, kind, self._request_seq[kind], compute, args)
+
+    def _supersede(self, kind: str):
+        """Invalidates any queued or running job of this kind without starting a new one."""
+        self._request_seq[kind] += 1
+        previous = self._pending_jobs.pop(kind, None)
+        if previous is not None:
+            previous.cancel()
+        # The draft no longer has results; hide the previous draft's instead of leaving them up as current.
+        if kind == "counter":
+            self._reset_counter_button()
+            self.counter_results_view.pack_forget()
         else:
-            for name, raw_score, norm_score in data:
-                tree.insert('', 'end', values=(name, f"{raw_score:.3f}", f"{norm_score:.1f}%"))
+            self._reset_analyze_button()
+            self.analysis_results_frame.pack_forget()
 
-    def _update_ui_after(self, func: Callable):
-        """Thread-safe UI update helper."""
-        self.parent.after(0, func)
\ No newline at end of file
+    def _run_job(self, kind: str, seq: int, compute: Callable, args: tuple):
+        """Worker-side wrapper. Skips jobs that were superseded while waiting in the queue."""
+        if seq != self._request_seq[kind]:
+            return
+        start = time.perf_counter()
+        try:
+            result, error = compute(*args), None
+        except Exception as e:
+            result, error = None, e
+        self._results.put((kind, seq, result, error, (time.perf_counter() - start) * 1000))
+
+    def attach_recognition(self, feed, my_team: int = 1):
+        """
+        Fills the selectors from a started RecognitionFeed: both teams in Team Analysis and the other
+        team as the enemies in Counter-Picker. Each change re-runs the analyses like a manual edit.
+        """
+        self._recognition = feed
+        self._my_team = my_team
+
+    def _apply_recognized_draft(self, draft):
+        self._ensure_analysis_tab()
+        self.team1_selector.set_selected_heroes(draft.team1)
+        self.team2_selector.set_selected_heroes(draft.team2)
+        self.counter_selector.set_selected_heroes(draft.team2 if self._my_team == 1 else draft.team1)
+
+    def _drain_results(self):
+        """Delivers finished jobs to the widgets, dropping results of superseded requests."""
+        handlers = {"counter": self._deliver_counter_results, "analysis": self._deliver_team_results}
+        try:
+            while True:
+                kind, seq, result, error, elapsed_ms = self._results.get_nowait()
+                if seq == self._request_seq[kind]:
+                    handlers[kind](result, error)
+                    self._show_latency(kind, elapsed_ms)
+        except queue.Empty:
+            pass
+        if self._recognition is not None:
+            try:
+                draft = self._recognition.drafts.get_nowait()
+            except queue.Empty:
+                draft = None
+            if isinstance(draft, Exception):
+                self._recognition = None
+                messagebox.showerror("Screen Recognition", f"Screen recognition stopped:\n{draft}")
+            elif draft is not None:
+                self._apply_recognized_draft(draft)
+        self._poll_id = self.after(self.RESULT_POLL_MS, self._drain_results)
+
+    def _show_latency(self, kind: str, elapsed_ms: float):
+        """Status bar readout of the last job; adds the cache hit rate while engine statistics are collected."""
+        text = f"Last {self._job_labels[kind]}: {elapsed_ms:.1f} ms"
+        if engine_stats() is not None:
+            cache = self.logic.cache.stats()
+            text += f"  |  cache hit rate {cache['hit_rate'] * 100:.0f}% ({cache['entries']} entries)"
+        self.status_label.config(text=text)
+
+    def _on_destroy(self, event):
+        if event.widget is not self:
+            return
+        self.after_cancel(self._poll_id)
+        if self._recognition is not None:
+            self._recognition.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Community nicknames that can't be derived from the hero's display name.
+COMMON_ALIASES: Dict[str, List[str]] = {
+    "Anti-Mage": ["am", "magina"],
+    "Queen of Pain": ["qop"],
+    "Nature's Prophet": ["np", "furion"],
+    "Io": ["wisp"],
+    "Outworld Destroyer": ["od", "obsidian"],
+    "Spirit Breaker": ["bara", "sb"],
+    "Faceless Void": ["void", "fv"],
+    "Windranger": ["wr", "windrunner"],
+    "Shadow Fiend": ["sf", "nevermore"],
+    "Wraith King": ["wk", "skeleton king"],
+    "Centaur Warrunner": ["cent", "centaur"],
+    "Clockwerk": ["clock", "cw"],
+    "Mirana": ["potm"],
+    "Necrophos": ["necro"],
+    "Lifestealer": ["ls", "naix"],
+    "Vengeful Spirit": ["vs", "venge"],
+    "Treant Protector": ["treant"],
+    "Doom": ["lucifer"],
+    "Magnus": ["mag"],
+    "Leshrac": ["lesh"],
+    "Venomancer": ["veno"],
+    "Brewmaster": ["brew", "panda"],
+    "Batrider": ["bat"],
+    "Storm Spirit": ["storm"],
+    "Ember Spirit": ["ember"],
+    "Earth Spirit": ["kaolin"],
+    "Templar Assassin": ["ta", "lanaya"],
+    "Phantom Assassin": ["pa", "mortred"],
+    "Phantom Lancer": ["pl"],
+    "Troll Warlord": ["troll"],
+    "Skywrath Mage": ["sky"],
+    "Ogre Magi": ["ogre"],
+    "Keeper of the Light": ["kotl"],
+    "Underlord": ["pitlord"],
+    "Abaddon": ["aba"],
+}
+
+_WORD_SPLIT = re.compile(r"[\s\-]+")
+
+
+def _acronym(name: str) -> str:
+    """Initials of a multi-word name, e.g. 'Queen of Pain' -> 'qop'."""
+    words = [w for w in _WORD_SPLIT.split(name.lower()) if w]
+    return "".join(w[0] for w in words) if len(words) > 1 else ""
+
+
+class HeroSearchIndex:
+    """
+    Precomputed substring/alias index over the hero list.
+    Built once and shared by every HeroSelector; results keep the order of the source list.
+    """
+    def __init__(self, heroes: Iterable[str], aliases: Dict[str, List[str]] = None):
+        self.heroes: List[str] = list(heroes)
+        self.rank: Dict[str, int] = {hero: i for i, hero in enumerate(self.heroes)}
+        self._lowered = [hero.lower() for hero in self.heroes]
+        self._grams: Dict[str, Set[int]] = {}
+        self._aliases: Dict[str, Set[int]] = {}
+        self._cache: Dict[str, Tuple[int, ...]] = {"": tuple(range(len(self.heroes)))}
+
+        for i, lowered in enumerate(self._lowered):
+            for size in (1, 2, 3):
+                for start in range(len(lowered) - size + 1):
+                    self._grams.setdefault(lowered[start:start + size], set()).add(i)
+
+        alias_table = COMMON_ALIASES if aliases is None else aliases
+        for hero, i in self.rank.items():
+            names = list(alias_table.get(hero, []))
+            acronym = _acronym(hero)
+            if acronym:
+                names.append(acronym)
+            for alias in names:
+                alias = alias.lower()
+                self._aliases.setdefault(alias, set()).add(i)
+                # Longer nicknames also match while they are being typed ("fur" -> "furion").
+                for end in range(3, len(alias)):
+                    self._aliases.setdefault(alias[:end], set()).add(i)
+
+    def _candidates(self, term: str) -> Set[int]:
+        if len(term) <= 3:
+            return self._grams.get(term, set())
+        sets = [self._grams.get(term[k:k + 3], set()) for k in range(len(term) - 2)]
+        return set.intersection(*sorted(sets, key=len))
+
+    def _search_indices(self, term: str) -> Tuple[int, ...]:
+        cached = self._cache.get(term)
+        if cached is not None:
+            return cached
+
+        # Typing usually extends the previous term, so narrow the previous result when we have it.
+        previous = self._cache.get(term[:-1])
+        pool = previous if previous is not None else self._candidates(term)
+        matches = {i for i in pool if term in self._lowered[i]}
+        matches.update(self._aliases.get(term, ()))
+
+        result = tuple(sorted(matches))
+        if len(self._cache) > 512:
+            self._cache = {"": self._cache[""]}
+        self._cache[term] = result
+        return result
+
+    def search(self, term: str) -> List[str]:
+        """Returns heroes whose name contains the term or who are known by it as an alias."""
+        return [self.heroes[i] for i in self._search_indices(term.strip().lower())]
@@ -0,0 +1,361 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATE_LIMIT_HEADER_PREFIX = "x-ratelimit-"
+
+
+class MetricsSink:
+    """Receives scraper events as they happen. Subclass and override what you need."""
+    def on_request(self, metrics: "ScrapeMetrics", sample: Dict[str, Any]) -> None:
+        pass
+
+    def on_phase(self, metrics: "ScrapeMetrics", name: str, seconds: float) -> None:
+        pass
+
+
+class PrometheusTextSink(MetricsSink):
+    """Rewrites a Prometheus text-format file after every event (node_exporter textfile style)."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def on_request(self, metrics, sample):
+        self._write(metrics)
+
+    def on_phase(self, metrics, name, seconds):
+        self._write(metrics)
+
+    def _write(self, metrics: "ScrapeMetrics") -> None:
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus())
+        os.replace(tmp_path, self.path)
+
+
+class _Histogram:
+    """Fixed-bucket cumulative histogram compatible with the Prometheus exposition format."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        running, result = 0, []
+        for c in self.counts:
+            running += c
+            result.append(running)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{b:g}": c for b, c in zip(self.buckets, self.cumulative())}
+        buckets["le_inf"] = self.count
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+        }
+
+
+class ScrapeMetrics:
+    """Aggregates request latency, transfer sizes, retries and rate-limit headroom for one scraper run."""
+    def __init__(self, sinks: Optional[List[MetricsSink]] = None):
+        self.sinks: List[MetricsSink] = list(sinks or [])
+        self.started_at = time.time()
+        self.latency: Dict[str, _Histogram] = {}
+        self.requests: Dict[str, Dict[str, int]] = {}
+        self.phases: Dict[str, float] = {}
+        self.rate_limits: Dict[str, Dict[str, int]] = {}
+
+    def add_sink(self, sink: MetricsSink) -> None:
+        self.sinks.append(sink)
+
+    def observe_request(self, operation: str, latency: float, status: str, bytes_sent: int = 0,
+                        bytes_received: int = 0, retries: int = 0, headers: Optional[Dict[str, str]] = None) -> None:
+        """Records a single GraphQL round trip, including one that failed."""
+        self.latency.setdefault(operation, _Histogram()).observe(latency)
+        counters = self.requests.setdefault(operation, {
+            "requests": 0, "errors": 0, "retries": 0, "bytes_sent": 0, "bytes_received": 0
+        })
+        counters["requests"] += 1
+        counters["errors"] += status != "ok"
+        counters["retries"] += retries
+        counters["bytes_sent"] += bytes_sent
+        counters["bytes_received"] += bytes_received
+        if headers:
+            self._record_rate_limits(headers)
+
+        sample = {"operation": operation, "latency": latency, "status": status, "bytes_sent": bytes_sent,
+                  "bytes_received": bytes_received, "retries": retries}
+        for sink in self.sinks:
+            sink.on_request(self, sample)
+
+    def _record_rate_limits(self, headers: Dict[str, str]) -> None:
+        """Tracks the latest and the lowest seen value of every X-RateLimit-* header."""
+        for key, value in headers.items():
+            lowered = key.lower()
+            if not lowered.startswith(RATE_LIMIT_HEADER_PREFIX):
+                continue
+            try:
+                number = int(value)
+            except (TypeError, ValueError):
+                continue
+            name = lowered[len(RATE_LIMIT_HEADER_PREFIX):]
+            entry = self.rate_limits.setdefault(name, {"last": number, "min": number})
+            entry["last"] = number
+            entry["min"] = min(entry["min"], number)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times a named phase of the scrape. Repeated phases accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+            for sink in self.sinks:
+                sink.on_phase(self, name, seconds)
+
+    def rate_limit_headroom(self) -> Dict[str, float]:
+        """Returns the lowest remaining/limit ratio observed for every rate-limit window."""
+        headroom = {}
+        for name, entry in self.rate_limits.items():
+            if not name.startswith("remaining"):
+                continue
+            window = name[len("remaining"):]
+            limit = self.rate_limits.get("limit" + window)
+            if limit and limit["last"] > 0:
+                headroom[window.strip("-") or "default"] = round(entry["min"] / limit["last"], 4)
+        return headroom
+
+    def report(self) -> Dict[str, Any]:
+        """Builds a JSON-serializable summary of the run."""
+        totals = {"requests": 0, "errors": 0, "retries": 0, "bytes_sent": 0, "bytes_received": 0}
+        for counters in self.requests.values():
+            for key in totals:
+                totals[key] += counters[key]
+        return {
+            "started_at": self.started_at,
+            "duration": round(time.time() - self.started_at, 3),
+            "totals": totals,
+            "operations": {
+                op: {**self.requests[op], "latency": self.latency[op].to_dict()} for op in self.requests
+            },
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "rate_limits": self.rate_limits,
+            "rate_limit_headroom": self.rate_limit_headroom(),
+        }
+
+    def save_report(self, file_path: Path) -> None:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4)
+
+    def to_prometheus(self) -> str:
+        """Renders the current state in the Prometheus text exposition format."""
+        lines = [
+            "# TYPE dota2picker_scrape_request_seconds histogram",
+        ]
+        for op, hist in self.latency.items():
+            for bound, count in zip(hist.buckets, hist.cumulative()):
+                lines.append(f'dota2picker_scrape_request_seconds_bucket{{operation="{op}",le="{bound:g}"}} {count}')
+            lines.append(f'dota2picker_scrape_request_seconds_bucket{{operation="{op}",le="+Inf"}} {hist.count}')
+            lines.append(f'dota2picker_scrape_request_seconds_sum{{operation="{op}"}} {hist.total:.6f}')
+            lines.append(f'dota2picker_scrape_request_seconds_count{{operation="{op}"}} {hist.count}')
+
+        for metric in ("errors", "retries", "bytes_sent", "bytes_received"):
+            lines.append(f"# TYPE dota2picker_scrape_{metric}_total counter")
+            for op, counters in self.requests.items():
+                lines.append(f'dota2picker_scrape_{metric}_total{{operation="{op}"}} {counters[metric]}')
+
+        lines.append("# TYPE dota2picker_scrape_phase_seconds gauge")
+        for name, seconds in self.phases.items():
+            lines.append(f'dota2picker_scrape_phase_seconds{{phase="{name}"}} {seconds:.6f}')
+
+        lines.append("# TYPE dota2picker_scrape_ratelimit gauge")
+        for name, entry in self.rate_limits.items():
+            lines.append(f'dota2picker_scrape_ratelimit{{header="{name}"}} {entry["last"]}')
+        return "\n".join(lines) + "\n"
+
+
+class PhaseTimer:
+    """Wall-clock timings for named phases of a one-off run, such as application startup."""
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases: List[tuple] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.origin, time.perf_counter() - start))
+
+    def mark(self, name: str) -> None:
+        """Records a point in time (zero-length phase), e.g. the first painted frame."""
+        self.phases.append((name, time.perf_counter() - self.origin, 0.0))
+
+    def format_report(self) -> str:
+        lines = [f"{'phase':<24}{'start ms':>10}{'took ms':>10}"]
+        for name, offset, seconds in self.phases:
+            lines.append(f"{name:<24}{offset * 1000:>10.1f}{seconds * 1000:>10.1f}")
+        lines.append(f"{'total':<24}{(time.perf_counter() - self.origin) * 1000:>10.1f}")
+        return "\n".join(lines)
+
+
+class EngineStats:
+    """
+    Per-stage timings and call counts of the scoring engine. Collected only while installed with
+    enable_engine_stats() (or collect_engine_stats()); otherwise the engine's hooks are no-ops.
+    """
+    def __init__(self):
+        self.started_at = time.time()
+        # name -> [calls, total seconds, max seconds, last seconds]
+        self.stages: Dict[str, List[float]] = {}
+        self.calls: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times one pass through a named stage. Stages should not nest, or time is counted twice."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            entry = self.stages.get(name)
+            if entry is None:
+                self.stages[name] = [1, seconds, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+                entry[3] = seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.calls[name] = self.calls.get(name, 0) + n
+
+    def last_ms(self, name: str) -> Optional[float]:
+        entry = self.stages.get(name)
+        return entry[3] * 1000 if entry is not None else None
+
+    def reset(self) -> None:
+        self.started_at = time.time()
+        self.stages.clear()
+        self.calls.clear()
+
+    def report(self, cache=None) -> Dict[str, Any]:
+        """JSON-serializable summary; pass the engine's ResultCache to include its hit rate."""
+        report = {
+            "started_at": self.started_at,
+            "stages": {
+                name: {
+                    "calls": int(calls),
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total * 1000 / calls, 4),
+                    "max_ms": round(longest * 1000, 3),
+                    "last_ms": round(last * 1000, 3),
+                }
+                for name, (calls, total, longest, last) in self.stages.items()
+            },
+            "calls": dict(self.calls),
+        }
+        if cache is not None:
+            report["cache"] = cache.stats()
+        return report
+
+    def format_report(self, cache=None) -> str:
+        lines = [f"{'stage':<24}{'calls':>8}{'total ms':>11}{'mean ms':>10}{'max ms':>10}"]
+        for name, (calls, total, longest, _) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<24}{int(calls):>8}{total * 1000:>11.2f}{total * 1000 / calls:>10.3f}{longest * 1000:>10.3f}")
+        if self.calls:
+            lines.append("calls: " + ", ".join(f"{name} {n}" for name, n in sorted(self.calls.items())))
+        if cache is not None:
+            stats = cache.stats()
+            lines.append(f"cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate'] * 100:.1f}% hit rate), "
+                         f"{stats['entries']} entries, {stats['evictions']} evictions")
+        return "\n".join(lines)
+
+
+# The installed EngineStats, or None. Read once per hook, so enabling and disabling is thread-safe.
+_engine_stats: Optional[EngineStats] = None
+_NOT_TIMED = nullcontext()
+
+
+def engine_stats() -> Optional[EngineStats]:
+    return _engine_stats
+
+
+def enable_engine_stats(stats: Optional[EngineStats] = None) -> EngineStats:
+    """Installs process-wide engine statistics (a new EngineStats unless one is given) and returns them."""
+    global _engine_stats
+    _engine_stats = stats if stats is not None else EngineStats()
+    return _engine_stats
+
+
+def disable_engine_stats() -> None:
+    global _engine_stats
+    _engine_stats = None
+
+
+@contextmanager
+def collect_engine_stats(stats: Optional[EngineStats] = None):
+    """Collects engine statistics for the duration of the block, then restores the previous state."""
+    global _engine_stats
+    previous = _engine_stats
+    try:
+        yield enable_engine_stats(stats)
+    finally:
+        _engine_stats = previous
+
+
+def stage(name: str):
+    """Engine hook: `with stage("..."):` times the block when statistics are enabled, else does nothing."""
+    stats = _engine_stats
+    return _NOT_TIMED if stats is None else stats.stage(name)
+
+
+def count(name: str) -> None:
+    """Engine hook: counts a call when statistics are enabled."""
+    stats = _engine_stats
+    if stats is not None:
+        stats.count(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of stage(): times every call of the function as the named stage."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = _engine_stats
+            if stats is None:
+                return func(*args, **kwargs)
+            with stats.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_call(func: Callable, *args, sort_by: str = "cumulative", limit: int = 30, **kwargs) -> Tuple[Any, str]:
+    """Runs func once under cProfile; returns its result and the formatted profile (top `limit` entries)."""
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort_by).print_stats(limit)
+    return result, out.getvalue()
@@ -0,0 +1,192 @@
+"""
+Precomputed top-k rankings for the queries most requests make, built at update time.
+
+For every single enemy and every pair of enemies the file holds the best counter-picks, and for every
+hero its best synergy partners (the suggestions for a team that has picked only that hero), each with
+and without the winrate bonus. Entries have a fixed size and a position computed from the hero
+indices, so a lookup is two array slices. Each entry also keeps the lowest and highest score of the
+full ranking it was cut from, so its ratings match live scoring. The header records the data fingerprint and the factors the
+tables were scored with; AnalysisLogic only answers from tables that match its own data and factors
+and scores everything else live.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from src.result_cache import ResultCache
+from src.results import ScoreTable
+
+MAGIC = b"D2QT"
+VERSION = 2
+DEFAULT_TOP_K = 20
+# magic, version, top k, hero count, hero list crc32, data fingerprint, bias crc32, winrate_k, synergy_k
+_HEADER = struct.Struct("<4sHHIIIIdd")
+_SWAP = sys.byteorder != "little"
+
+
+def query_tables_file(data_file: Path) -> Path:
+    """Where the tables of a data file are kept: next to it, e.g. data/hero_matchups.tables."""
+    return Path(data_file).with_suffix(".tables")
+
+
+def _heroes_crc(heroes: Sequence[str]) -> int:
+    return zlib.crc32("\n".join(heroes).encode("utf-8"))
+
+
+def _bias_crc(hero_bias: Dict[str, float]) -> int:
+    return zlib.crc32(json.dumps(sorted(hero_bias.items())).encode("utf-8"))
+
+
+def _index_typecode(n_heroes: int) -> str:
+    return "H" if n_heroes <= 0xFFFF else "I"
+
+
+class QueryTables:
+    """Counter and synergy-partner tables of one data snapshot; see the module docstring."""
+    def __init__(self, top_k: int, n_heroes: int, heroes_crc: int, fingerprint: int, bias_crc: int,
+                 winrate_k: float, synergy_k: float, indices: array, scores: array, ranges: array):
+        self.top_k = top_k
+        self.n_heroes = n_heroes
+        self.heroes_crc = heroes_crc
+        self.fingerprint = fingerprint
+        self.bias_crc = bias_crc
+        self.winrate_k = winrate_k
+        self.synergy_k = synergy_k
+        self.indices = indices
+        self.scores = scores
+        self.ranges = ranges
+        n = n_heroes
+        self._pairs = n * (n - 1) // 2
+        self._per_variant = 2 * n + self._pairs
+
+    # --- layout -----------------------------------------------------------
+
+    def _single(self, hero: int, use_winrate: bool) -> int:
+        return use_winrate * self._per_variant + hero
+
+    def _pair(self, first: int, second: int, use_winrate: bool) -> int:
+        i, j = min(first, second), max(first, second)
+        n = self.n_heroes
+        return use_winrate * self._per_variant + n + i * (2 * n - i - 1) // 2 + (j - i - 1)
+
+    def _partners(self, hero: int, use_winrate: bool) -> int:
+        return use_winrate * self._per_variant + self.n_heroes + self._pairs + hero
+
+    def _entry(self, heroes: Sequence[str], entry: int, top: int) -> ScoreTable:
+        start = entry * self.top_k
+        return ScoreTable(heroes, self.indices[start:start + top], self.scores[start:start + top],
+                          (self.ranges[2 * entry], self.ranges[2 * entry + 1]))
+
+    # --- queries ----------------------------------------------------------
+
+    def compatible(self, logic) -> bool:
+        """Whether the tables were built from the data and factors `logic` scores with."""
+        heroes = logic.all_heroes
+        return (
+            len(heroes) == self.n_heroes
+            and getattr(logic.dm, "fingerprint", None) == self.fingerprint
+            and _heroes_crc(heroes) == self.heroes_crc
+            and _bias_crc(logic.hero_bias) == self.bias_crc
+            and logic.winrate_k == self.winrate_k
+            and logic.synergy_k == self.synergy_k
+        )
+
+    def counters(self, heroes: Sequence[str], enemies: Sequence[int], use_winrate: bool, top: int) -> Optional[ScoreTable]:
+        """Top counter-picks against one or two enemies (hero indices), or None if not in the tables."""
+        if top > self.top_k:
+            return None
+        if len(enemies) == 1:
+            return self._entry(heroes, self._single(enemies[0], use_winrate), top)
+        if len(enemies) == 2:
+            return self._entry(heroes, self._pair(enemies[0], enemies[1], use_winrate), top)
+        return None
+
+    def partners(self, heroes: Sequence[str], hero: int, use_winrate: bool, top: int) -> Optional[ScoreTable]:
+        """Top suggestions (with synergy) for a team of just `hero`, or None if not in the tables."""
+        if top > self.top_k:
+            return None
+        return self._entry(heroes, self._partners(hero, use_winrate), top)
+
+    # --- building and storage ---------------------------------------------
+
+    @classmethod
+    def build(cls, logic, top_k: int = DEFAULT_TOP_K) -> "QueryTables":
+        """
+        Scores every table entry with the live engine, so lookups return exactly what live scoring would.
+        Uses its own cache, leaving the engine's untouched.
+        """
+        heroes = logic.all_heroes
+        n = len(heroes)
+        if n < 3:
+            raise ValueError("Query tables need at least 3 heroes")
+        top_k = min(top_k, n - 2)
+        builder = type(logic)(logic.dm, cache=ResultCache(max_entries=4 * n, ttl=None), **logic.parameters())
+        indices, scores, ranges = array(_index_typecode(n)), array("d"), array("d")
+
+        def add(table: ScoreTable) -> None:
+            indices.extend(table.indices[:top_k])
+            scores.extend(table.scores[:top_k])
+            ranges.extend((table.scores[-1], table.scores[0]))
+
+        for use_winrate in (False, True):
+            for hero in heroes:
+                add(builder._compute_counter_picks([hero], use_winrate))
+            for i, first in enumerate(heroes):
+                for second in heroes[i + 1:]:
+                    add(builder._compute_counter_picks([first, second], use_winrate))
+            for hero in heroes:
+                add(builder._get_draft_suggestions([hero], [], use_winrate, True))
+
+        return cls(top_k, n, _heroes_crc(heroes), getattr(logic.dm, "fingerprint", 0) or 0,
+                   _bias_crc(logic.hero_bias), float(logic.winrate_k), float(logic.synergy_k), indices, scores, ranges)
+
+    def save(self, path: Path) -> None:
+        indices, scores, ranges = self.indices, self.scores, self.ranges
+        if _SWAP:
+            indices, scores, ranges = array(indices.typecode, indices), array("d", scores), array("d", ranges)
+            indices.byteswap()
+            scores.byteswap()
+            ranges.byteswap()
+        header = _HEADER.pack(MAGIC, VERSION, self.top_k, self.n_heroes, self.heroes_crc, self.fingerprint,
+                              self.bias_crc, self.winrate_k, self.synergy_k)
+        tmp_path = Path(path).with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            indices.tofile(f)
+            scores.tofile(f)
+            ranges.tofile(f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "QueryTables":
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError(f"'{path}' is not a query table file")
+            magic, version, top_k, n, heroes_crc, fingerprint, bias_crc, winrate_k, synergy_k = _HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"'{path}' is not a version {VERSION} query table file")
+            entries = 2 * (2 * n + n * (n - 1) // 2)
+            indices, scores, ranges = array(_index_typecode(n)), array("d"), array("d")
+            try:
+                indices.fromfile(f, entries * top_k)
+                scores.fromfile(f, entries * top_k)
+                ranges.fromfile(f, 2 * entries)
+            except EOFError:
+                raise ValueError(f"'{path}' is truncated") from None
+        if _SWAP:
+            indices.byteswap()
+            scores.byteswap()
+            ranges.byteswap()
+        return cls(top_k, n, heroes_crc, fingerprint, bias_crc, winrate_k, synergy_k, indices, scores, ranges)
+
+
+def write_query_tables(logic, data_file: Path, top_k: int = DEFAULT_TOP_K) -> Path:
+    """Builds the tables for `logic` and stores them next to data_file."""
+    path = query_tables_file(data_file)
+    QueryTables.build(logic, top_k).save(path)
+    return path
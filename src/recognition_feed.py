@@ -0,0 +1,196 @@
+"""
+Feeds heroes recognized on screen (update/cap.py's capture pipeline) into the GUI.
+
+Three stages run independently. A capture thread recognizes frames at a fixed rate, maps icon names
+to hero names through an alias table built once at startup, and debounces every slot. Only a draft
+that stayed the same for a number of frames is published, into a mailbox that keeps just the latest
+draft. The Tk loop picks it up and fills the selectors, and the selectors' change callbacks queue
+the re-analysis on the application's analysis worker. A slow analysis or a busy UI therefore never
+holds up capture.
+"""
+import difflib
+import json
+import queue
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+from src.data_manager import DataManager
+
+UPDATE_DIR = Path(__file__).resolve().parent.parent / "update"
+DEFAULT_REGIONS_FILE = UPDATE_DIR / "regions.json"
+DEFAULT_ICONS_FOLDER = UPDATE_DIR / "icons"
+ALIASES_FILE = Path("data/icon_aliases.json")
+
+# Icons named after the game's internal hero names (as on the Dota CDN) where those differ from the display name.
+INTERNAL_NAMES = {
+    "abyssal_underlord": "Underlord",
+    "centaur": "Centaur Warrunner",
+    "doom_bringer": "Doom",
+    "furion": "Nature's Prophet",
+    "magnataur": "Magnus",
+    "necrolyte": "Necrophos",
+    "nevermore": "Shadow Fiend",
+    "obsidian_destroyer": "Outworld Destroyer",
+    "rattletrap": "Clockwerk",
+    "shredder": "Timbersaw",
+    "skeleton_king": "Wraith King",
+    "treant": "Treant Protector",
+    "windrunner": "Windranger",
+    "wisp": "Io",
+    "zuus": "Zeus",
+}
+FUZZY_CUTOFF = 0.85
+
+
+class RecognizedDraft(NamedTuple):
+    team1: List[str]
+    team2: List[str]
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def build_alias_table(icon_names: Iterable[str], heroes: Iterable[str],
+                      extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Maps every icon name to a hero of the data set: explicit aliases first, then the internal names,
+    then names that are equal ignoring case and punctuation, then close spellings. Icons without a
+    match are left out.
+    """
+    by_key = {_normalize(hero): hero for hero in heroes}
+    aliases = {_normalize(k): v for k, v in INTERNAL_NAMES.items()}
+    aliases.update({_normalize(k): v for k, v in (extra or {}).items()})
+    table = {}
+    for icon in icon_names:
+        key = _normalize(icon)
+        target = aliases.get(key)
+        if target is not None and _normalize(target) in by_key:
+            table[icon] = by_key[_normalize(target)]
+        elif key in by_key:
+            table[icon] = by_key[key]
+        else:
+            close = difflib.get_close_matches(key, by_key.keys(), n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                table[icon] = by_key[close[0]]
+    return table
+
+
+def load_aliases(path: Path = ALIASES_FILE) -> Dict[str, str]:
+    """Optional {"icon name": "Hero Name"} overrides."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class SlotDebouncer:
+    """Holds a slot's published hero until a different value was seen in `frames` consecutive frames."""
+    def __init__(self, frames: int):
+        self.frames = max(1, frames)
+        self.stable: Optional[str] = None
+        self._candidate: Optional[str] = None
+        self._count = 0
+
+    def update(self, value: Optional[str]) -> bool:
+        """Feeds one frame's value; returns True when the stable value changed."""
+        if value == self.stable:
+            self._candidate, self._count = None, 0
+            return False
+        if value != self._candidate:
+            self._candidate, self._count = value, 0
+        self._count += 1
+        if self._count < self.frames:
+            return False
+        self.stable, self._candidate, self._count = value, None, 0
+        return True
+
+
+class RecognitionFeed:
+    """
+    Runs the capture pipeline on a background thread and publishes debounced drafts to `drafts`, a
+    one-slot mailbox holding the latest RecognizedDraft (or the exception that stopped capture).
+    """
+    def __init__(self, dm: DataManager, regions_file: Path = DEFAULT_REGIONS_FILE,
+                 icons_folder: Path = DEFAULT_ICONS_FOLDER, fps: float = 4.0, stable_frames: int = 3,
+                 workers: int = 2, threshold: Optional[float] = None, aliases: Optional[Dict[str, str]] = None):
+        self.dm = dm
+        self.regions_file = regions_file
+        self.icons_folder = icons_folder
+        self.fps = fps
+        self.stable_frames = stable_frames
+        self.workers = workers
+        self.threshold = threshold
+        self.aliases = aliases
+        self.drafts: "queue.Queue[Union[RecognizedDraft, Exception]]" = queue.Queue(maxsize=1)
+        self.alias_table: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="recognition", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _publish(self, item: Union[RecognizedDraft, Exception]) -> None:
+        """Replaces an unconsumed draft rather than waiting for the UI to take it."""
+        while True:
+            try:
+                self.drafts.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.drafts.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _run(self) -> None:
+        try:
+            # The capture modules live in update/, next to cap.py, and need numpy (and pyautogui to grab).
+            if str(UPDATE_DIR) not in sys.path:
+                sys.path.insert(0, str(UPDATE_DIR))
+            from capture import FrameRecognizer, load_regions, run
+            from icon_index import THRESHOLD, IconIndex
+
+            regions_team1, regions_team2 = load_regions(str(self.regions_file), legacy_path="")
+            if not regions_team1 and not regions_team2:
+                raise FileNotFoundError(f"No screen regions in '{self.regions_file}'. Select them with update/cap.py first.")
+            index = IconIndex.load(str(self.icons_folder))
+            self.alias_table = build_alias_table(index.names, self.dm.get_hero_list(),
+                                                 load_aliases() if self.aliases is None else self.aliases)
+            recognizer = FrameRecognizer(index, regions_team1, regions_team2, workers=self.workers,
+                                         threshold=THRESHOLD if self.threshold is None else self.threshold)
+        except Exception as e:
+            self._publish(e)
+            return
+
+        slots = {(team, slot): SlotDebouncer(self.stable_frames) for team, slot, _ in recognizer.slots}
+
+        def on_frame(frame) -> bool:
+            changed = False
+            for result in frame.regions:
+                hero = self.alias_table.get(result.match.name) if result.match is not None else None
+                changed |= slots[(result.team, result.slot)].update(hero)
+            if changed:
+                self._publish(self.draft(slots))
+            return not self._stop.is_set()
+
+        try:
+            run(recognizer, self.fps, on_frame)
+        except Exception as e:
+            self._publish(e)
+        finally:
+            recognizer.close()
+
+    @staticmethod
+    def draft(slots: Dict[tuple, SlotDebouncer]) -> RecognizedDraft:
+        teams: Dict[int, List[str]] = {1: [], 2: []}
+        for (team, _), debouncer in sorted(slots.items()):
+            if debouncer.stable is not None and debouncer.stable not in teams[team]:
+                teams[team].append(debouncer.stable)
+        return RecognizedDraft(teams[1], teams[2])
@@ -0,0 +1,227 @@
+import struct
+import sys
+from array import array
+from collections import abc
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TypedDict
+
+ScoredHero = Tuple[str, float]
+RatedHero = Tuple[str, float, float]
+
+_TABLE_HEADER = struct.Struct("<cI")
+_ANALYSIS_HEADER = struct.Struct("<Iddd")
+_SWAP = sys.byteorder != "little"
+
+
+class TeamAnalysis(TypedDict):
+    """Shape of the dict returned by AnalysisLogic.analyze_teams."""
+    win_probability_team1: float
+    team1_total_score: float
+    team2_total_score: float
+    team1_hero_scores: List[ScoredHero]
+    team2_hero_scores: List[ScoredHero]
+    team1_suggestions: List[ScoredHero]
+    team2_suggestions: List[ScoredHero]
+
+
+def _index_typecode(n_heroes: int) -> str:
+    return "H" if n_heroes <= 0xFFFF else "I"
+
+
+def _little_endian(values: array) -> bytes:
+    if _SWAP:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if _SWAP:
+        values.byteswap()
+    return values
+
+
+class HeroNames(abc.Sequence):
+    """Lazy view of the hero names of a ScoreTable, in rank order."""
+    __slots__ = ("_heroes", "_indices")
+
+    def __init__(self, heroes: Sequence[str], indices: array):
+        self._heroes = heroes
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._heroes[j] for j in self._indices[i]]
+        return self._heroes[self._indices[i]]
+
+    def __iter__(self):
+        return map(self._heroes.__getitem__, self._indices)
+
+
+class ScoreTable(abc.Sequence):
+    """
+    Heroes ranked by score, best first, held as two flat arrays: indices into a shared hero list and
+    their scores. Indexing and iteration yield (name, score) pairs like the lists the engine used to
+    return; names, ratings and top-k are only computed when asked for. A top-k slice keeps the score
+    range of the full ranking (`score_range`), so its ratings are the first k ratings of the full table.
+    """
+    __slots__ = ("heroes", "indices", "scores", "score_range", "_ratings", "_pairs")
+
+    def __init__(self, heroes: Sequence[str], indices: array, scores: array,
+                 score_range: Optional[Tuple[float, float]] = None):
+        self.heroes = heroes
+        self.indices = indices
+        self.scores = scores
+        self.score_range = score_range
+        self._ratings: Optional[array] = None
+        self._pairs: Optional[List[ScoredHero]] = None
+
+    @classmethod
+    def ranked(cls, heroes: Sequence[str], indices: Sequence[int], scores: Sequence[float]) -> "ScoreTable":
+        """Sorts unordered (index, score) columns by descending score; equal scores keep their order."""
+        order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        return cls(heroes, array(_index_typecode(len(heroes)), [indices[i] for i in order]),
+                   array("d", [scores[i] for i in order]))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(zip(self.names[i], self.scores[i]))
+        return self.heroes[self.indices[i]], self.scores[i]
+
+    def __iter__(self):
+        return zip(self.names, self.scores)
+
+    def __repr__(self) -> str:
+        return f"ScoreTable({self[:3]!r}{', ...' if len(self) > 3 else ''}; {len(self)} heroes)"
+
+    @property
+    def names(self) -> HeroNames:
+        return HeroNames(self.heroes, self.indices)
+
+    def ratings(self) -> array:
+        """Scores on a 0-100 scale (AnalysisLogic.normalize_scores) of the full ranking, computed once."""
+        if self._ratings is None:
+            scores = self.scores
+            low, high = self._range()
+            if not scores:
+                self._ratings = array("d")
+            elif high == low:
+                self._ratings = array("d", [100.0]) * len(scores)
+            else:
+                span = high - low
+                self._ratings = array("d", [((s - low) / span) * 100 for s in scores])
+        return self._ratings
+
+    def _range(self) -> Tuple[float, float]:
+        """(lowest, highest) score of the full ranking this table is (a slice of)."""
+        if self.score_range is not None:
+            return self.score_range
+        return (self.scores[-1], self.scores[0]) if self.scores else (0.0, 0.0)
+
+    def top(self, k: int) -> "ScoreTable":
+        """The best k heroes; their ratings stay those of this table."""
+        return ScoreTable(self.heroes, self.indices[:k], self.scores[:k], self._range() if self.scores else None)
+
+    def pairs(self) -> List[ScoredHero]:
+        """The table as a list of (name, score) tuples, built once and shared; treat it as read-only."""
+        if self._pairs is None:
+            self._pairs = list(self)
+        return self._pairs
+
+    def rated(self) -> List[RatedHero]:
+        """(name, score, rating) rows for the results views."""
+        return list(zip(self.names, self.scores, self.ratings()))
+
+    def to_json(self) -> List[list]:
+        """[[name, score], ...], as json.dumps writes the tuple lists."""
+        return [[name, score] for name, score in zip(self.names, self.scores)]
+
+    def to_bytes(self) -> bytes:
+        """Typecode and length header, then the indices and scores as little-endian arrays."""
+        header = _TABLE_HEADER.pack(self.indices.typecode.encode("ascii"), len(self.scores))
+        return header + _little_endian(self.indices) + _little_endian(self.scores)
+
+    @classmethod
+    def from_bytes(cls, heroes: Sequence[str], data: bytes, offset: int = 0) -> Tuple["ScoreTable", int]:
+        """Reads a table written by to_bytes at offset; returns it and the offset just past it."""
+        typecode, length = _TABLE_HEADER.unpack_from(data, offset)
+        typecode = typecode.decode("ascii")
+        offset += _TABLE_HEADER.size
+        end = offset + length * array(typecode).itemsize
+        indices = _from_little_endian(typecode, data[offset:end])
+        offset, end = end, end + length * 8
+        scores = _from_little_endian("d", data[offset:end])
+        if len(scores) != length:
+            raise ValueError("Truncated score table")
+        return cls(heroes, indices, scores), end
+
+
+class DraftAnalysis:
+    """
+    Result of AnalysisLogic.analyze: the win probability, team totals and four ScoreTables over the
+    hero list `heroes`. as_dict() gives the analyze_teams dict for code that wants the old shape.
+    """
+    TABLES = ("team1_hero_scores", "team2_hero_scores", "team1_suggestions", "team2_suggestions")
+    __slots__ = ("heroes", "win_probability_team1", "team1_total_score", "team2_total_score") + TABLES + ("_dict",)
+
+    def __init__(self, heroes: Sequence[str], win_probability_team1: float, team1_total_score: float,
+                 team2_total_score: float, team1_hero_scores: ScoreTable, team2_hero_scores: ScoreTable,
+                 team1_suggestions: ScoreTable, team2_suggestions: ScoreTable):
+        self.heroes = heroes
+        self.win_probability_team1 = win_probability_team1
+        self.team1_total_score = team1_total_score
+        self.team2_total_score = team2_total_score
+        self.team1_hero_scores = team1_hero_scores
+        self.team2_hero_scores = team2_hero_scores
+        self.team1_suggestions = team1_suggestions
+        self.team2_suggestions = team2_suggestions
+        self._dict: Optional[TeamAnalysis] = None
+
+    def as_dict(self) -> TeamAnalysis:
+        """The analyze_teams dict, built once and shared; treat it as read-only."""
+        if self._dict is None:
+            self._dict = {
+                "win_probability_team1": self.win_probability_team1,
+                "team1_total_score": self.team1_total_score,
+                "team2_total_score": self.team2_total_score,
+                **{table: getattr(self, table).pairs() for table in self.TABLES},
+            }
+        return self._dict
+
+    def to_json_dict(self, suggestions: Optional[int] = None) -> Dict[str, Any]:
+        """A new JSON-ready dict in the analyze_teams shape, with at most `suggestions` suggestions per team."""
+        result: Dict[str, Any] = {
+            "win_probability_team1": self.win_probability_team1,
+            "team1_total_score": self.team1_total_score,
+            "team2_total_score": self.team2_total_score,
+        }
+        for table in self.TABLES:
+            scores = getattr(self, table)
+            if suggestions is not None and table.endswith("suggestions"):
+                scores = scores.top(suggestions)
+            result[table] = scores.to_json()
+        return result
+
+    def to_bytes(self) -> bytes:
+        header = _ANALYSIS_HEADER.pack(len(self.heroes), self.win_probability_team1,
+                                       self.team1_total_score, self.team2_total_score)
+        return header + b"".join(getattr(self, table).to_bytes() for table in self.TABLES)
+
+    @classmethod
+    def from_bytes(cls, heroes: Sequence[str], data: bytes) -> "DraftAnalysis":
+        """Reads an analysis written by to_bytes; heroes must be the hero list it was made with."""
+        n_heroes, win_probability, team1_total, team2_total = _ANALYSIS_HEADER.unpack_from(data)
+        if n_heroes != len(heroes):
+            raise ValueError(f"Analysis was made over {n_heroes} heroes, got a list of {len(heroes)}")
+        offset, tables = _ANALYSIS_HEADER.size, []
+        for _ in cls.TABLES:
+            table, offset = ScoreTable.from_bytes(heroes, data, offset)
+            tables.append(table)
+        return cls(heroes, win_probability, team1_total, team2_total, *tables)
@@ -0,0 +1,145 @@
+from tkinter import ttk
+from typing import List, Optional, Sequence, Tuple
+
+Row = Tuple[str, float, float]
+
+
+class VirtualResultsView(ttk.Frame):
+    """
+    Hero/Score/Rating table that keeps every result row in Python and only materializes
+    the rows that fit on screen. Scrolling and sorting rewrite the values of a fixed pool of Treeview
+    items in place, so repainting costs the same for 10 or 2000 heroes.
+    """
+    COLUMNS = ('Hero', 'Score', 'Rating')
+    OVERSCAN = 3
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self._rows: List[Row] = []
+        self._placeholder = "No data"
+        self._offset = 0
+        self._slots: List[str] = []
+        self._slot_values: List[Optional[tuple]] = []
+        self._sort_column: Optional[int] = None
+        self._sort_reverse = False
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show='headings', selectmode='browse')
+        for i, column in enumerate(self.COLUMNS):
+            self.tree.heading(column, text=column, command=lambda c=i: self.sort_by(c))
+        self.tree.column('Hero', width=150, anchor='w')
+        self.tree.column('Score', width=80, anchor='center')
+        self.tree.column('Rating', width=80, anchor='center')
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", lambda e: self._resize_pool())
+        self.tree.bind("<MouseWheel>", lambda e: self._on_wheel(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self._on_wheel(-1))
+        self.tree.bind("<Button-5>", lambda e: self._on_wheel(1))
+
+    def set_rows(self, rows: Sequence[Row], placeholder: str = "No data") -> None:
+        """Replaces the result array. Only the visible rows whose text changed touch Tk."""
+        self._rows = list(rows)
+        self._placeholder = placeholder
+        if self._sort_column is not None:
+            self._apply_sort()
+        self._offset = min(self._offset, self._max_offset())
+        self._render()
+
+    def sort_by(self, column: int) -> None:
+        """Sorts the stored results by a column; clicking the same column again flips the order."""
+        if self._sort_column == column:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_column = column
+            self._sort_reverse = column != 0
+        self._apply_sort()
+        self._offset = 0
+        self._render()
+
+    def _apply_sort(self) -> None:
+        column = self._sort_column
+        key = (lambda r: r[0].lower()) if column == 0 else (lambda r: r[column])
+        self._rows.sort(key=key, reverse=self._sort_reverse)
+
+    def scroll(self, amount: int, what: str = "units") -> None:
+        step = max(1, self._visible_rows() - 1) if what == "pages" else 1
+        self._scroll_to(self._offset + amount * step)
+
+    def _on_wheel(self, amount: int) -> str:
+        """Scrolls the rows; "break" keeps the Treeview's own binding from scrolling the item pool."""
+        self.scroll(amount, "units")
+        return "break"
+
+    def _on_scrollbar(self, action: str, *args) -> None:
+        if action == "moveto":
+            self._scroll_to(round(float(args[0]) * len(self._rows)))
+        elif action == "scroll":
+            self.scroll(int(args[0]), args[1])
+
+    def _scroll_to(self, offset: int) -> None:
+        offset = max(0, min(offset, self._max_offset()))
+        if offset != self._offset:
+            self._offset = offset
+            self.tree.selection_set(())
+            self._render()
+
+    def _visible_rows(self) -> int:
+        style = ttk.Style(self)
+        row_height = style.lookup("Treeview", "rowheight")
+        try:
+            row_height = int(row_height)
+        except (TypeError, ValueError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+        height = self.tree.winfo_height()
+        return max(1, (height - row_height) // max(1, row_height)) if height > 1 else 10
+
+    def _max_offset(self) -> int:
+        return max(0, len(self._rows) - self._visible_rows())
+
+    def _resize_pool(self) -> None:
+        """Keeps exactly enough Treeview items for the visible window plus a small overscan."""
+        wanted = self._visible_rows() + self.OVERSCAN
+        while len(self._slots) < wanted:
+            self._slots.append(self.tree.insert('', 'end', values=("", "", "")))
+            self._slot_values.append(None)
+        while len(self._slots) > wanted:
+            self.tree.delete(self._slots.pop())
+            self._slot_values.pop()
+        self._offset = min(self._offset, self._max_offset())
+        self._render()
+
+    @staticmethod
+    def _format(row: Row) -> tuple:
+        name, raw_score, norm_score = row
+        return (name, f"{raw_score:.3f}", f"{norm_score:.1f}%")
+
+    def _render(self) -> None:
+        if not self._slots:
+            self._resize_pool()
+            return
+
+        window = self._rows[self._offset:self._offset + len(self._slots)]
+        for i, iid in enumerate(self._slots):
+            if i < len(window):
+                values = self._format(window[i])
+            elif i == 0 and not self._rows:
+                values = (self._placeholder, "", "")
+            else:
+                values = ("", "", "")
+            if values != self._slot_values[i]:
+                self.tree.item(iid, values=values)
+                self._slot_values[i] = values
+        # The pool always shows from its first item; scrolling happens by rewriting the values.
+        self.tree.yview_moveto(0)
+
+        total = len(self._rows)
+        if total:
+            first = self._offset / total
+            last = min(1.0, (self._offset + self._visible_rows()) / total)
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0.0, 1.0)
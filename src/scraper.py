@@ -1,20 +1,42 @@
 import json
 import logging
 import time
+from array import array
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 import requests
 from tqdm import tqdm
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from src.instrumentation import ScrapeMetrics
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 STRATZ_URL = "https://api.stratz.com/graphql"
+ADVANTAGE_PREFIX = "data.heroStats.heroVsHeroMatchup.advantage.item"
+MISSING = float("nan")
+
+class _CountingReader:
+    """File-like wrapper that counts the decoded bytes pulled through a streamed response."""
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
 
 class Scraper:
     """Robust scraper for the Stratz API with retry logic."""
-    def __init__(self):
+    def __init__(self, metrics: Optional[ScrapeMetrics] = None):
+        self.metrics = metrics if metrics is not None else ScrapeMetrics()
         self.session = requests.Session()
         retry_strategy = Retry(
             total=3,
@@ -25,8 +47,11 @@ class Scraper:
         adapter = HTTPAdapter(max_retries=retry_strategy)
         self.session.mount("https://", adapter)
 
-    def _make_graphql_request(self, query: str, headers: Dict) -> Dict:
+    def _make_graphql_request(self, query: str, headers: Dict, operation: str = "graphql") -> Dict:
         """Safe GraphQL request with error handling using the configured session."""
+        response = None
+        status = "error"
+        start = time.perf_counter()
         try:
             response = self.session.post(STRATZ_URL, json={'query': query}, headers=headers, timeout=30)
             response.raise_for_status()
@@ -35,12 +60,33 @@ class Scraper:
                 error_message = data["errors"][0]["message"]
                 logging.error(f"GraphQL API error: {error_message}")
                 raise ValueError(f"Stratz API Error: {error_message}")
+            status = "ok"
             return data
         except requests.RequestException as e:
             logging.error(f"GraphQL request failed: {e}")
-            if "response" in locals() and "json" in response.headers.get("Content-Type", ""):
+            if response is not None and "json" in response.headers.get("Content-Type", ""):
                 logging.error(f"API Response: {response.json()}")
             raise ValueError("Failed to communicate with Stratz API. Check your API key and connection.")
+        finally:
+            self._observe_request(operation, time.perf_counter() - start, status, response)
+
+    def _observe_request(self, operation: str, latency: float, status: str, response: Optional[requests.Response],
+                         bytes_received: Optional[int] = None) -> None:
+        """Forwards latency, transfer sizes, retry count and rate-limit headers to the metrics collector."""
+        if response is None:
+            self.metrics.observe_request(operation, latency, status)
+            return
+        request_body = response.request.body if response.request is not None else None
+        retry_state = getattr(response.raw, "retries", None)
+        self.metrics.observe_request(
+            operation,
+            latency,
+            status,
+            bytes_sent=len(request_body) if request_body else 0,
+            bytes_received=len(response.content) if bytes_received is None else bytes_received,
+            retries=len(retry_state.history) if retry_state is not None else 0,
+            headers=response.headers,
+        )
 
     def get_hero_map(self, auth_headers: Dict) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
         """Fetches the hero ID and name map from Stratz."""
@@ -54,7 +100,7 @@ class Scraper:
             }
         }
         """
-        data = self._make_graphql_request(query, auth_headers)
+        data = self._make_graphql_request(query, auth_headers, operation="hero_map")
         heroes_list = data['data']['constants']['heroes']
         heroes = [{'id': h['id'], 'name': h['displayName']} for h in heroes_list]
         id_to_name = {h['id']: h['name'] for h in heroes}
@@ -74,7 +120,7 @@ class Scraper:
             }}
         }}
         """
-        data = self._make_graphql_request(query, auth_headers)
+        data = self._make_graphql_request(query, auth_headers, operation="winrates")
         winrate_stats = data.get('data', {}).get('heroStats', {}).get('winGameVersion', [])
         
         latest_hero_stats = {}
@@ -91,8 +137,12 @@ class Scraper:
                 winrates[hero_name] = winrate
         return winrates
 
-    def _scrape_single_hero_details(self, hero_id: int, id_to_name_map: Dict, auth_headers: Dict) -> Tuple[str, Dict, Dict]:
-        """Scrapes matchup ('vs') and synergy ('with') data for a single hero."""
+    def _scrape_single_hero_details(self, hero_id: int, hero_index: Dict[int, int], vs_row: array, with_row: array,
+                                    id_to_name_map: Dict, auth_headers: Dict) -> int:
+        """
+        Scrapes matchup ('vs') and synergy ('with') data for a single hero
+        straight into its preallocated matrix rows. Returns the number of entries written.
+        """
         query = f"""
         {{
             heroStats {{
@@ -105,74 +155,142 @@ class Scraper:
             }}
         }}
         """
-        hero_name = id_to_name_map.get(hero_id)
         try:
-            data = self._make_graphql_request(query, auth_headers)
+            if ijson is not None:
+                return self._stream_advantage_rows(query, auth_headers, hero_index, vs_row, with_row)
 
+            data = self._make_graphql_request(query, auth_headers, operation="hero_matchups")
             advantage_data = data.get('data', {}).get('heroStats', {}).get('heroVsHeroMatchup', {}).get('advantage', [])
             if not advantage_data:
-                return hero_name, {}, {}
+                return 0
 
-            vs_data, with_data = {}, {}
+            written = 0
             for entry in advantage_data[0].get('vs', []):
-                opponent_name = id_to_name_map.get(entry['heroId2'])
-                if opponent_name:
-                    vs_data[opponent_name] = entry['synergy']
-            
+                written += self._store_entry(vs_row, hero_index, entry.get('heroId2'), entry.get('synergy'))
             for entry in advantage_data[0].get('with', []):
-                ally_name = id_to_name_map.get(entry['heroId2'])
-                if ally_name:
-                    with_data[ally_name] = entry['synergy']
-            
-            return hero_name, vs_data, with_data
+                written += self._store_entry(with_row, hero_index, entry.get('heroId2'), entry.get('synergy'))
+            return written
         except Exception as e:
-            logging.error(f"Error scraping details for {hero_name} (ID {hero_id}): {e}")
-            return hero_name, {}, {}
+            logging.error(f"Error scraping details for {id_to_name_map.get(hero_id)} (ID {hero_id}): {e}")
+            return 0
         finally:
             time.sleep(0.1)
 
-    def scrape_all_data(self, api_key: str) -> Dict[str, Any]:
-        """Orchestrates scraping of all data (heroes, winrates, matchups, synergies) from Stratz."""
+    def _stream_advantage_rows(self, query: str, headers: Dict, hero_index: Dict[int, int],
+                               vs_row: array, with_row: array) -> int:
+        """Parses a heroVsHeroMatchup response incrementally, never materializing the JSON tree."""
+        rows = {f"{ADVANTAGE_PREFIX}.vs.item": vs_row, f"{ADVANTAGE_PREFIX}.with.item": with_row}
+        response = None
+        reader = None
+        status = "error"
+        start = time.perf_counter()
+        try:
+            response = self.session.post(STRATZ_URL, json={'query': query}, headers=headers, timeout=30, stream=True)
+            response.raise_for_status()
+            response.raw.decode_content = True
+            reader = _CountingReader(response.raw)
+
+            written = 0
+            other_hero_id = synergy = None
+            for prefix, event, value in ijson.parse(reader, use_float=True):
+                if event == "number":
+                    entry_prefix, _, field = prefix.rpartition(".")
+                    if entry_prefix in rows:
+                        if field == "heroId2":
+                            other_hero_id = value
+                        elif field == "synergy":
+                            synergy = value
+                elif event == "end_map":
+                    if prefix in rows:
+                        written += self._store_entry(rows[prefix], hero_index, other_hero_id, synergy)
+                        other_hero_id = synergy = None
+                    elif prefix == ADVANTAGE_PREFIX:
+                        break  # Only the first advantage block is used, skip the rest of the body.
+                elif prefix == "errors.item.message":
+                    logging.error(f"GraphQL API error: {value}")
+                    raise ValueError(f"Stratz API Error: {value}")
+            status = "ok"
+            return written
+        except requests.RequestException as e:
+            logging.error(f"GraphQL request failed: {e}")
+            raise ValueError("Failed to communicate with Stratz API. Check your API key and connection.")
+        except ijson.JSONError as e:
+            logging.error(f"Malformed GraphQL response: {e}")
+            raise ValueError("Received a malformed response from Stratz API.")
+        finally:
+            if response is not None:
+                response.close()
+            bytes_received = reader.bytes_read if reader is not None else 0
+            self._observe_request("hero_matchups", time.perf_counter() - start, status, response, bytes_received)
+
+    @staticmethod
+    def _store_entry(row: array, hero_index: Dict[int, int], other_hero_id: Optional[int], synergy: Optional[float]) -> int:
+        column = hero_index.get(other_hero_id)
+        if column is None or synergy is None:
+            return 0
+        row[column] = synergy
+        return 1
+
+    @staticmethod
+    def _rows_to_dict(heroes: List[Dict[str, Any]], rows: List[array]) -> Dict[str, Dict[str, float]]:
+        """Converts index-based matrix rows into the name-keyed layout of hero_matchups.json."""
+        names = [h['name'] for h in heroes]
+        return {
+            names[i]: {names[j]: value for j, value in enumerate(row) if value == value}
+            for i, row in enumerate(rows)
+        }
+
+    def scrape_all_data(self, api_key: str, report_path: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Orchestrates scraping of all data (heroes, winrates, matchups, synergies) from Stratz.
+        If report_path is given, a JSON metrics report of the run is written there at the end.
+        """
         auth_headers = {
             'Authorization': f'Bearer {api_key}',
             'User-Agent': 'STRATZ_API'
         }
         
         print("\nFetching hero map from Stratz...")
-        heroes, id_to_name = self.get_hero_map(auth_headers)
+        with self.metrics.phase("hero_map"):
+            heroes, id_to_name = self.get_hero_map(auth_headers)
         hero_ids = [h['id'] for h in heroes]
         print(f"Found {len(heroes)} heroes.")
 
         print("\nFetching overall hero winrates...")
-        winrate_data = self._scrape_winrates(hero_ids, id_to_name, auth_headers)
+        with self.metrics.phase("winrates"):
+            winrate_data = self._scrape_winrates(hero_ids, id_to_name, auth_headers)
         print(f"Fetched winrates for {len(winrate_data)} heroes.")
 
         print("\nScraping matchup and synergy data sequentially to respect API rate limits...")
-        matchup_data, synergy_data = {}, {}
+        hero_index = {hero_id: i for i, hero_id in enumerate(hero_ids)}
+        matchup_rows = [array('d', [MISSING]) * len(hero_ids) for _ in hero_ids]
+        synergy_rows = [array('d', [MISSING]) * len(hero_ids) for _ in hero_ids]
         
-        for hero_id in tqdm(hero_ids, desc="Scraping Hero Details"):
-            try:
-                hero_name, vs, with_ = self._scrape_single_hero_details(hero_id, id_to_name, auth_headers)
-                if hero_name:
-                    matchup_data[hero_name] = vs
-                    synergy_data[hero_name] = with_
-            except Exception as e:
-                logging.error(f"Scraping for hero ID {hero_id} failed in main loop: {e}")
+        with self.metrics.phase("matchups"):
+            for i, hero_id in enumerate(tqdm(hero_ids, desc="Scraping Hero Details")):
+                try:
+                    self._scrape_single_hero_details(
+                        hero_id, hero_index, matchup_rows[i], synergy_rows[i], id_to_name, auth_headers
+                    )
+                except Exception as e:
+                    logging.error(f"Scraping for hero ID {hero_id} failed in main loop: {e}")
         
         print("Symmetrizing synergy data...")
-        final_synergies = synergy_data.copy()
-        for hero1, allies in synergy_data.items():
-            for hero2, synergy_val in allies.items():
-                if hero2 not in final_synergies:
-                    final_synergies[hero2] = {}
-                if hero1 not in final_synergies[hero2]:
-                    final_synergies[hero2][hero1] = synergy_val
+        with self.metrics.phase("symmetrization"):
+            for i, row in enumerate(synergy_rows):
+                for j, synergy_val in enumerate(row):
+                    if synergy_val == synergy_val and synergy_rows[j][i] != synergy_rows[j][i]:
+                        synergy_rows[j][i] = synergy_val
+
+        if report_path is not None:
+            logging.info(f"Saving scrape metrics report to {report_path}")
+            self.metrics.save_report(report_path)
         
         return {
             "heroes": heroes,
             "winrate_data": winrate_data,
-            "matchup_data": matchup_data,
-            "synergy_data": final_synergies,
+            "matchup_data": self._rows_to_dict(heroes, matchup_rows),
+            "synergy_data": self._rows_to_dict(heroes, synergy_rows),
         }
 
     def save_data_to_json(self, data: Dict[str, Any], file_path: Path):
@@ -0,0 +1,391 @@
+import asyncio
+import json
+import logging
+from itertools import count
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.draft_session import DraftError, DraftSession
+from src.engine import AnalysisLogic, ResultCache, load_engine, load_query_tables
+from src.shared_data import SharedDataManager, SharedSnapshot, SnapshotHandle
+from src.websocket import WebSocket, WebSocketClosed, handshake_response
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+BULK_CHUNK_SIZE = 64
+
+# Process-pool workers read the service's shared snapshot instead of loading the data file themselves.
+# Every task carries the handle of the current snapshot, so a reload only needs a new one published.
+_worker_parameters: Dict[str, Any] = {}
+_worker_logic: Optional[AnalysisLogic] = None
+
+
+def _init_worker(parameters: Dict[str, Any]) -> None:
+    global _worker_parameters
+    _worker_parameters = parameters
+
+
+def _worker_engine(handle: SnapshotHandle) -> AnalysisLogic:
+    global _worker_logic
+    if _worker_logic is None or _worker_logic.dm.generation != handle.generation:
+        if _worker_logic is not None:
+            _worker_logic.dm.close()
+        _worker_logic = AnalysisLogic(SharedDataManager(handle), **_worker_parameters)
+    return _worker_logic
+
+
+def _analyze_chunk(handle: SnapshotHandle, drafts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    logic = _worker_engine(handle)
+    return [_analyze_draft(logic, draft) for draft in drafts]
+
+
+def _counter_chunk(handle: SnapshotHandle, queries: List[Dict[str, Any]]) -> List[List[list]]:
+    logic = _worker_engine(handle)
+    return [_counter_query(logic, query) for query in queries]
+
+
+def _analyze_draft(logic: AnalysisLogic, draft: Dict[str, Any]) -> Dict[str, Any]:
+    use_synergy = draft.get("use_synergy", True) and logic.dm.has_synergy_data()
+    return logic.analyze(draft["team1"], draft["team2"], draft.get("use_winrate", True), use_synergy).to_json_dict()
+
+
+def _counter_query(logic: AnalysisLogic, query: Dict[str, Any]) -> List[list]:
+    top = query.get("top", 0)
+    return logic.counter_table(query["enemies"], query.get("use_winrate", True), top if top > 0 else None).to_json()
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class DraftService:
+    """
+    Minimal asyncio HTTP/JSON front end for AnalysisLogic.
+
+    Identical requests that arrive while one is being computed share that computation, and every
+    result lands in the engine's generation-keyed ResultCache. Single queries run on a small thread
+    pool; bulk endpoints are split into chunks and spread over a process pool when one is configured.
+    Live drafts use the WebSocket endpoint /sessions, where each connection owns one DraftSession.
+    """
+    def __init__(self, data_file: Path, factors: Optional[Dict[str, float]] = None, process_workers: int = 0,
+                 thread_workers: int = 4, cache_entries: int = 8192, max_sessions: int = 1000):
+        self.data_file = Path(data_file)
+        self.logic = load_engine(self.data_file, cache=ResultCache(max_entries=cache_entries), **(factors or {}))
+        self.process_workers = process_workers
+        self._threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="service")
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._snapshot: Optional[SharedSnapshot] = None
+        self._snapshot_users: Dict[str, int] = {}
+        self._retired_snapshots: Dict[str, SharedSnapshot] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"requests": 0, "computed": 0, "coalesced": 0, "errors": 0, "session_events": 0}
+        self.max_sessions = max_sessions
+        self.sessions: Dict[int, DraftSession] = {}
+        self._session_ids = count(1)
+        self._start_process_pool()
+
+        self.routes: Dict[Tuple[str, str], Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+            ("GET", "/health"): self.health,
+            ("GET", "/heroes"): self.heroes,
+            ("POST", "/counter-picks"): self.counter_picks,
+            ("POST", "/analyze"): self.analyze,
+            ("POST", "/suggestions"): self.suggestions,
+            ("POST", "/counter-picks/bulk"): self.counter_picks_bulk,
+            ("POST", "/analyze/bulk"): self.analyze_bulk,
+            ("POST", "/reload"): self.reload,
+        }
+
+    def _start_process_pool(self) -> None:
+        if self.process_workers > 0:
+            self._publish_snapshot()
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                initializer=_init_worker,
+                initargs=(self.logic.parameters(),),
+            )
+
+    def _publish_snapshot(self) -> None:
+        """
+        Shares the currently loaded data with the workers. The previous snapshot is unlinked once no
+        queued task refers to it; workers already attached keep reading it until they switch over.
+        """
+        previous, self._snapshot = self._snapshot, self.logic.dm.publish_shared()
+        if previous is not None:
+            self._retired_snapshots[previous.handle.name] = previous
+            self._release_snapshot(previous.handle.name, 0)
+
+    def _release_snapshot(self, name: str, users: int = 1) -> None:
+        remaining = self._snapshot_users.get(name, 0) - users
+        if remaining > 0:
+            self._snapshot_users[name] = remaining
+            return
+        self._snapshot_users.pop(name, None)
+        retired = self._retired_snapshots.pop(name, None)
+        if retired is not None:
+            retired.unlink()
+
+    def close(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+        for snapshot in [self._snapshot, *self._retired_snapshots.values()]:
+            if snapshot is not None:
+                snapshot.unlink()
+        self._snapshot = None
+        self._retired_snapshots.clear()
+
+    # --- request plumbing -------------------------------------------------
+
+    async def _coalesced(self, key: Hashable, func: Callable, *args) -> Any:
+        """Runs func on the thread pool unless an identical computation is already in flight."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self._threads, func, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None))
+            self.stats["computed"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _parse_top(payload: Dict[str, Any]) -> int:
+        """The optional 'top' limit of a query; 0 (the default) means all heroes."""
+        top = payload.get("top", 0)
+        if isinstance(top, bool) or not isinstance(top, int) or top < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'top' must be a non-negative integer")
+        return top
+
+    def _validate_heroes(self, payload: Dict[str, Any], *fields: str) -> None:
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Every query and draft must be a JSON object")
+        known = set(self.logic.all_heroes)
+        for field in fields:
+            heroes = payload.get(field)
+            if not isinstance(heroes, list) or not all(isinstance(h, str) for h in heroes):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{field}' must be a list of hero names")
+            unknown = [h for h in heroes if h not in known]
+            if unknown:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown hero(es) in '{field}': {', '.join(unknown)}")
+
+    async def _run_bulk(self, items: List[Dict[str, Any]], chunk_func: Callable, local_func: Callable) -> List[Any]:
+        """Splits a bulk request into chunks, on the process pool if available, and keeps the input order."""
+        loop = asyncio.get_running_loop()
+        chunks = [items[i:i + BULK_CHUNK_SIZE] for i in range(0, len(items), BULK_CHUNK_SIZE)]
+        if self._processes is not None:
+            handle = self._snapshot.handle
+            self._snapshot_users[handle.name] = self._snapshot_users.get(handle.name, 0) + 1
+            try:
+                parts = await asyncio.gather(*(loop.run_in_executor(self._processes, chunk_func, handle, c) for c in chunks))
+            finally:
+                self._release_snapshot(handle.name)
+        else:
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(self._threads, lambda c=c: [local_func(self.logic, item) for item in c])
+                for c in chunks
+            ))
+        return [result for part in parts for result in part]
+
+    # --- endpoints --------------------------------------------------------
+
+    async def health(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "generation": self.logic.dm.generation,
+            "heroes": len(self.logic.all_heroes),
+            "process_workers": self.process_workers,
+            "shared_snapshot_bytes": self._snapshot.size if self._snapshot is not None else 0,
+            "sessions": len(self.sessions),
+            "requests": self.stats,
+            "cache": self.logic.cache.stats(),
+        }
+
+    async def heroes(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {"heroes": self.logic.all_heroes}
+
+    async def counter_picks(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._validate_heroes(payload, "enemies")
+        query = {"enemies": payload["enemies"], "use_winrate": bool(payload.get("use_winrate", True)),
+                 "top": self._parse_top(payload)}
+        key = (self.logic.dm.generation, "counter", frozenset(query["enemies"]), query["use_winrate"], query["top"])
+        picks = await self._coalesced(key, _counter_query, self.logic, query)
+        return {"picks": picks}
+
+    async def analyze(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._validate_heroes(payload, "team1", "team2")
+        draft = {"team1": payload["team1"], "team2": payload["team2"],
+                 "use_winrate": bool(payload.get("use_winrate", True)),
+                 "use_synergy": bool(payload.get("use_synergy", True))}
+        key = (self.logic.dm.generation, "analysis", frozenset(draft["team1"]), frozenset(draft["team2"]),
+               draft["use_winrate"], draft["use_synergy"])
+        return await self._coalesced(key, _analyze_draft, self.logic, draft)
+
+    async def suggestions(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self._validate_heroes(payload, "allies", "enemies")
+        allies, enemies = payload["allies"], payload["enemies"]
+        use_winrate = bool(payload.get("use_winrate", True))
+        use_synergy = bool(payload.get("use_synergy", True)) and self.logic.dm.has_synergy_data()
+        top = self._parse_top(payload)
+        key = (self.logic.dm.generation, "suggestions", frozenset(allies), frozenset(enemies), use_winrate, use_synergy, top)
+        picks = await self._coalesced(key, self.logic.suggestion_table, allies, enemies, use_winrate, use_synergy,
+                                      top if top > 0 else None)
+        return {"suggestions": picks.to_json()}
+
+    async def counter_picks_bulk(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        queries = payload.get("queries")
+        if not isinstance(queries, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'queries' must be a list")
+        for query in queries:
+            self._validate_heroes(query, "enemies")
+        queries = [{"enemies": q["enemies"], "use_winrate": bool(q.get("use_winrate", True)), "top": self._parse_top(q)}
+                   for q in queries]
+        return {"results": await self._run_bulk(queries, _counter_chunk, _counter_query)}
+
+    async def analyze_bulk(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        drafts = payload.get("drafts")
+        if not isinstance(drafts, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'drafts' must be a list")
+        for draft in drafts:
+            self._validate_heroes(draft, "team1", "team2")
+        return {"results": await self._run_bulk(drafts, _analyze_chunk, _analyze_draft)}
+
+    async def reload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-reads the data file. The new generation makes every cached result unreachable."""
+        await asyncio.get_running_loop().run_in_executor(self._threads, self.logic.dm.load_data)
+        self.logic.query_tables = load_query_tables(self.data_file)
+        if self._processes is not None:
+            self._publish_snapshot()
+        return {"generation": self.logic.dm.generation}
+
+    # --- HTTP -------------------------------------------------------------
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Any]:
+        self.stats["requests"] += 1
+        handler = self.routes.get((method, path.split("?", 1)[0]))
+        try:
+            if handler is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+            if not isinstance(payload, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            return HTTPStatus.OK, await handler(payload)
+        except HTTPError as e:
+            self.stats["errors"] += 1
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.error(f"Request {method} {path} failed: {e}", exc_info=True)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serves HTTP/1.1 requests on one connection, keeping it open between requests when allowed."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                if method.upper() == "GET" and path.split("?", 1)[0] == "/sessions":
+                    await self.draft_session(reader, writer, headers)
+                    break
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write_response(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                status, payload = await self.dispatch(method.upper(), path, body)
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def draft_session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: Dict[str, str]) -> None:
+        """
+        Runs one live draft over a WebSocket. The client sends pick/ban/remove/options events
+        (a single JSON object or a list of them) and receives a delta with only what changed.
+        Events are O(heroes), so they are handled inline on the event loop.
+        """
+        upgrade = handshake_response(headers)
+        if upgrade is None:
+            await self._write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "Expected a WebSocket upgrade"}, False)
+            return
+        if len(self.sessions) >= self.max_sessions:
+            await self._write_response(writer, HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many sessions"}, False)
+            return
+        writer.write(upgrade)
+        await writer.drain()
+
+        ws = WebSocket(reader, writer)
+        session_id = next(self._session_ids)
+        session = DraftSession(self.logic)
+        self.sessions[session_id] = session
+        try:
+            await ws.send(json.dumps({**session.delta(), "session": session_id}))
+            while True:
+                try:
+                    # Inside the handler: a text frame that is not valid UTF-8 raises UnicodeDecodeError.
+                    message = await ws.receive()
+                    events = json.loads(message)
+                    for event in events if isinstance(events, list) else [events]:
+                        if not isinstance(event, dict):
+                            raise DraftError("Events must be JSON objects")
+                        session.apply(event)
+                        self.stats["session_events"] += 1
+                except ValueError as e:
+                    await ws.send(json.dumps({"type": "error", "message": str(e)}))
+                    continue
+                await ws.send(json.dumps(session.delta()))
+        except WebSocketClosed:
+            pass
+        finally:
+            del self.sessions[session_id]
+            await ws.close()
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, payload: Any, keep_alive: bool) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logging.info(f"Draft service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,142 @@
+"""
+Read-only hero data snapshots in shared memory.
+
+A loaded DataManager is published once as a dense block: a small header, the hero names, then the
+matchup and synergy matrices and the winrate vector as float64. Worker processes attach to a block by
+its handle and read straight out of the mapping, so memory grows with the number of published
+snapshots, not with the number of workers. Attach from processes started by multiprocessing; they share
+the publisher's resource tracker, which unlinks leftover blocks if the publisher dies.
+"""
+import json
+import struct
+from multiprocessing import shared_memory
+from typing import List, NamedTuple, Optional, Tuple
+
+from src.data_manager import DataManager
+
+MAGIC = b"D2PK"
+VERSION = 1
+# magic, version, hero count, has synergy, generation, length of the hero-name/ID block
+_HEADER = struct.Struct("<4sIIIQQ")
+_ALIGN = 8
+
+
+class ReadOnlySnapshotError(RuntimeError):
+    """Raised when code tries to reload data through a SharedDataManager."""
+
+
+class SnapshotHandle(NamedTuple):
+    """Picklable reference to a published snapshot; cheap to send with every task."""
+    name: str
+    generation: int
+
+
+def _layout(hero_count: int, names_length: int):
+    names_start = _HEADER.size
+    matrix_start = -(-(names_start + names_length) // _ALIGN) * _ALIGN
+    cells = hero_count * hero_count
+    return names_start, matrix_start, matrix_start + 8 * (2 * cells + hero_count)
+
+
+class SharedSnapshot:
+    """Owner side of a published snapshot. unlink() it once no new task will reference its handle."""
+    def __init__(self, dm: DataManager):
+        heroes = dm.get_hero_list()
+        n = len(heroes)
+        names = json.dumps({"heroes": heroes, "ids": list(dm.get_hero_ids().items())}).encode("utf-8")
+        names_start, matrix_start, size = _layout(n, len(names))
+
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.handle = SnapshotHandle(self._shm.name, dm.generation)
+        buf = self._shm.buf
+        _HEADER.pack_into(buf, 0, MAGIC, VERSION, n, int(dm.has_synergy_data()), dm.generation, len(names))
+        buf[names_start:names_start + len(names)] = names
+
+        values = buf[matrix_start:size].cast("d")
+        try:
+            for i, hero in enumerate(heroes):
+                row = i * n
+                for j, other in enumerate(heroes):
+                    values[row + j] = dm.get_advantage_score(hero, other)
+                    values[n * n + row + j] = dm.get_synergy_score(hero, other)
+                values[2 * n * n + i] = dm.get_hero_winrate(hero)
+        finally:
+            values.release()
+            del buf
+
+    @property
+    def size(self) -> int:
+        return self._shm.size
+
+    def unlink(self) -> None:
+        """Closes the owner's mapping and removes the block; attached workers keep theirs until they detach."""
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedDataManager(DataManager):
+    """
+    DataManager over an attached snapshot. Lookups index the shared matrices directly and nothing is
+    copied except the hero names and IDs. The data is read-only; load_data() raises ReadOnlySnapshotError.
+    """
+    def __init__(self, handle: SnapshotHandle):
+        self.data_path = None
+        self._shm: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(name=handle.name)
+        buf = self._shm.buf
+        magic, version, n, has_synergy, generation, names_length = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self._shm.close()
+            raise ValueError(f"Shared memory block '{handle.name}' is not a hero data snapshot")
+        if generation != handle.generation:
+            self._shm.close()
+            raise ValueError(f"Snapshot '{handle.name}' holds generation {generation}, expected {handle.generation}")
+
+        names_start, matrix_start, size = _layout(n, names_length)
+        names = json.loads(bytes(buf[names_start:names_start + names_length]))
+        self._heroes: List[str] = names["heroes"]
+        self._hero_ids = {hero_id: hero for hero_id, hero in names["ids"]}
+        self._index = {hero: i for i, hero in enumerate(self._heroes)}
+        self._n = n
+        self._has_synergy = bool(has_synergy)
+        self._values = buf[matrix_start:size].cast("d")
+        self.generation = generation
+
+    def load_data(self) -> None:
+        raise ReadOnlySnapshotError("Shared snapshots are read-only; publish a new one instead.")
+
+    def get_advantage_score(self, hero1: str, hero2: str) -> float:
+        try:
+            return self._values[self._index[hero1] * self._n + self._index[hero2]]
+        except KeyError:
+            return 0.0
+
+    def get_synergy_score(self, hero1: str, hero2: str) -> float:
+        try:
+            return self._values[self._n * self._n + self._index[hero1] * self._n + self._index[hero2]]
+        except KeyError:
+            return 0.0
+
+    def has_synergy_data(self) -> bool:
+        return self._has_synergy
+
+    def get_hero_winrate(self, hero: str) -> float:
+        i = self._index.get(hero)
+        return self._values[2 * self._n * self._n + i] if i is not None else 50.0
+
+    def matrix_views(self) -> Tuple[memoryview, memoryview, memoryview]:
+        """
+        Flat float64 views of the matchup and synergy matrices (row-major, n x n) and the winrates.
+        Release them before close().
+        """
+        cells = self._n * self._n
+        return self._values[:cells], self._values[cells:2 * cells], self._values[2 * cells:]
+
+    def close(self) -> None:
+        """Detaches from the block. Must not be called while results still reference the mapping."""
+        if self._shm is not None:
+            self._values.release()
+            self._shm.close()
+            self._shm = None
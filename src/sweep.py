@@ -0,0 +1,145 @@
+"""
+Parameter sweeps: one draft scored under a whole grid of k-factors at once.
+
+The matchup, winrate and synergy parts of every score do not depend on the k-factors, so DraftSweep
+gathers them once per draft (reusing the engine's cached team accumulators) and evaluates a grid of
+(adv_k, synergy_k, winrate_k) rows by broadcasting. At the engine's own factors the results match
+analyze_teams. Results are numpy arrays with one row per grid point.
+"""
+from itertools import combinations, product
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.analysis_logic import AnalysisLogic
+
+# Column order of a factor grid.
+GRID_COLUMNS = ("adv_k_factor", "synergy_k_factor", "winrate_k_factor")
+
+
+def factor_grid(adv_k: Iterable[float], synergy_k: Iterable[float], winrate_k: Iterable[float]) -> np.ndarray:
+    """
+    Cartesian product of the given values as a (G, 3) array in GRID_COLUMNS order. Results over it
+    reshape to (len(adv_k), len(synergy_k), len(winrate_k)) for heatmaps.
+    """
+    return np.array(list(product(adv_k, synergy_k, winrate_k)), dtype=np.float64).reshape(-1, 3)
+
+
+def grid_win_probability(components: np.ndarray, grid: np.ndarray, bias: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Win probabilities for many drafts at once: components is (D, 3) of team 1 minus team 2 matchup,
+    winrate and synergy sums (see evaluation.BatchScorer.components), bias the optional (D,) bias
+    difference. Returns a (D, G) array of team 1 win probabilities as fractions.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    adv_k, synergy_k, winrate_k = grid[:, 0], grid[:, 1], grid[:, 2]
+    advantage = (components[:, 0:1] + components[:, 1:2] * winrate_k + components[:, 2:3] * synergy_k)
+    if bias is not None:
+        advantage += np.asarray(bias)[:, None]
+    return 1.0 / (1.0 + np.exp(-adv_k * advantage))
+
+
+class TeamComponents:
+    """Factor-free parts of one team's scores; arrays over `members` and over `candidates` (heroes still available)."""
+    def __init__(self, members: List[str], candidates: List[str]):
+        self.members = members
+        self.candidates = candidates
+        n = len(members)
+        self.member_matchup = np.zeros(n)
+        self.member_winrate = np.zeros(n)
+        self.member_synergy = np.zeros(n)
+        self.member_bias = np.zeros(n)
+        self.pair_synergy = 0.0
+        m = len(candidates)
+        self.candidate_matchup = np.zeros(m)
+        self.candidate_winrate = np.zeros(m)
+        self.candidate_synergy = np.zeros(m)
+        self.candidate_bias = np.zeros(m)
+
+
+class DraftSweep:
+    """All factor-independent inputs of analyze_teams for one draft, evaluated against factor grids."""
+    def __init__(self, logic: AnalysisLogic, team1: List[str], team2: List[str],
+                 use_winrate: bool = True, use_synergy: bool = True):
+        self.logic = logic
+        self.use_winrate = use_winrate
+        self.use_synergy = use_synergy and logic.dm.has_synergy_data()
+        picked = set(team1) | set(team2)
+        candidates = [h for h in logic.all_heroes if h not in picked]
+        self.teams = (
+            self._team_components(list(team1), list(team2), candidates),
+            self._team_components(list(team2), list(team1), candidates),
+        )
+
+    def _team_components(self, allies: List[str], enemies: List[str], candidates: List[str]) -> TeamComponents:
+        logic, dm = self.logic, self.logic.dm
+        team = TeamComponents(allies, candidates)
+        counter = logic._team_accumulator("matchup", enemies) if enemies else None
+        synergy = logic._team_accumulator("synergy", allies) if allies else None
+
+        for i, hero in enumerate(allies):
+            team.member_matchup[i] = sum(logic._calculate_base_score(hero, enemy) for enemy in enemies)
+            team.member_winrate[i] = dm.get_hero_winrate(hero) - 50.0
+            team.member_synergy[i] = sum(dm.get_synergy_score(hero, ally) for ally in allies if ally != hero)
+            team.member_bias[i] = logic.hero_bias.get(hero, 0.0)
+        team.pair_synergy = sum(dm.get_synergy_score(h1, h2) for h1, h2 in combinations(allies, 2))
+
+        for i, hero in enumerate(candidates):
+            team.candidate_matchup[i] = counter[hero] if counter is not None else 0.0
+            team.candidate_winrate[i] = dm.get_hero_winrate(hero) - 50.0
+            team.candidate_synergy[i] = synergy[hero] if synergy is not None else 0.0
+            team.candidate_bias[i] = logic.hero_bias.get(hero, 0.0)
+        return team
+
+    def _factors(self, grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        grid = np.asarray(grid, dtype=np.float64).reshape(-1, 3)
+        synergy_k = grid[:, 1:2] if self.use_synergy else np.zeros((len(grid), 1))
+        winrate_k = grid[:, 2:3] if self.use_winrate else np.zeros((len(grid), 1))
+        return grid[:, 0], synergy_k, winrate_k
+
+    def team_totals(self, grid: np.ndarray) -> np.ndarray:
+        """(G, 2) array of the team 1 and team 2 total scores."""
+        _, synergy_k, winrate_k = self._factors(grid)
+        totals = [
+            team.member_matchup.sum() + team.member_bias.sum() + winrate_k[:, 0] * team.member_winrate.sum()
+            + synergy_k[:, 0] * team.pair_synergy
+            for team in self.teams
+        ]
+        return np.stack(totals, axis=1)
+
+    def win_probability(self, grid: np.ndarray) -> np.ndarray:
+        """(G,) array of team 1 win probabilities in percent, as analyze_teams reports them."""
+        adv_k = self._factors(grid)[0]
+        totals = self.team_totals(grid)
+        return 100.0 / (1.0 + np.exp(-adv_k * (totals[:, 0] - totals[:, 1])))
+
+    def hero_scores(self, grid: np.ndarray, team: int = 1) -> np.ndarray:
+        """(G, team size) contribution of each member of the team, in the order of teams[team - 1].members."""
+        _, synergy_k, winrate_k = self._factors(grid)
+        components = self.teams[team - 1]
+        scores = components.member_matchup + components.member_bias + winrate_k * components.member_winrate
+        if len(components.members) > 1:
+            scores = scores + synergy_k * components.member_synergy
+        return scores
+
+    def suggestion_scores(self, grid: np.ndarray, team: int = 1) -> np.ndarray:
+        """(G, candidates) suggestion score of every available hero for the team."""
+        _, synergy_k, winrate_k = self._factors(grid)
+        components = self.teams[team - 1]
+        return (components.candidate_matchup + components.candidate_bias
+                + synergy_k * components.candidate_synergy + winrate_k * components.candidate_winrate)
+
+    def rankings(self, grid: np.ndarray, team: int = 1, top: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best suggestions per grid point: (G, top) indices into teams[team - 1].candidates and their
+        scores, best first.
+        """
+        scores = self.suggestion_scores(grid, team)
+        top = min(top, scores.shape[1]) if top > 0 else scores.shape[1]
+        if top < scores.shape[1]:
+            best = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+        else:
+            best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return np.take_along_axis(best, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
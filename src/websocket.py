@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class WebSocketClosed(Exception):
+    pass
+
+
+def accept_key(client_key: str) -> str:
+    return base64.b64encode(hashlib.sha1((client_key + GUID).encode("ascii")).digest()).decode("ascii")
+
+
+def handshake_response(headers: Dict[str, str]) -> Optional[bytes]:
+    """Builds the 101 response for an RFC 6455 upgrade request, or None if the request is not one."""
+    if headers.get("upgrade", "").lower() != "websocket" or "sec-websocket-key" not in headers:
+        return None
+    return (
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n"
+    ).encode("latin-1")
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool = False) -> bytes:
+    """Encodes one unfragmented frame. Servers send unmasked frames, clients must mask theirs."""
+    length = len(payload)
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        head += bytes([mask_bit | length])
+    elif length < 1 << 16:
+        head += bytes([mask_bit | 126]) + struct.pack("!H", length)
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack("!Q", length)
+    if mask:
+        key = os.urandom(4)
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        head += key
+    return head + payload
+
+
+class WebSocket:
+    """Message-level reader/writer over an upgraded asyncio stream (text and binary messages, ping/pong, close)."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client: bool = False):
+        self.reader = reader
+        self.writer = writer
+        self.client = client
+        self.closed = False
+
+    async def _read_frame(self) -> Tuple[bool, int, bytes]:
+        first, second = await self.reader.readexactly(2)
+        fin, opcode = bool(first & 0x80), first & 0x0F
+        masked, length = bool(second & 0x80), second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        if length > MAX_MESSAGE_BYTES:
+            raise WebSocketClosed("Frame too large")
+        key = await self.reader.readexactly(4) if masked else None
+        payload = await self.reader.readexactly(length)
+        if key:
+            payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        return fin, opcode, payload
+
+    async def receive(self) -> str:
+        """Returns the next text message, answering pings on the way. Raises WebSocketClosed on close."""
+        message = bytearray()
+        while True:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                raise WebSocketClosed("Connection lost")
+            if opcode == OP_CLOSE:
+                await self.close()
+                raise WebSocketClosed("Closed by peer")
+            if opcode == OP_PING:
+                await self._send(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            message += payload
+            if len(message) > MAX_MESSAGE_BYTES:
+                raise WebSocketClosed("Message too large")
+            if fin:
+                return message.decode("utf-8")
+
+    async def send(self, text: str) -> None:
+        await self._send(OP_TEXT, text.encode("utf-8"))
+
+    async def _send(self, opcode: int, payload: bytes) -> None:
+        if self.closed:
+            raise WebSocketClosed("Connection closed")
+        self.writer.write(encode_frame(opcode, payload, mask=self.client))
+        await self.writer.drain()
+
+    async def close(self, code: int = 1000) -> None:
+        if not self.closed:
+            try:
+                self.writer.write(encode_frame(OP_CLOSE, struct.pack("!H", code), mask=self.client))
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+            self.closed = True
+
+
+async def connect(host: str, port: int, path: str = "/") -> WebSocket:
+    """Opens a client connection; used by the session load test."""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write((
+        f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode("latin-1"))
+    await writer.drain()
+    status = await reader.readline()
+    if b" 101 " not in status:
+        raise WebSocketClosed(f"Upgrade refused: {status.decode('latin-1').strip()}")
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    return WebSocket(reader, writer, client=True)
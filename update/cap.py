@@ -1,14 +1,26 @@
-import cv2
-import numpy as np
+import argparse
 import os
-import pyautogui
-from PIL import Image
+import time
 import tkinter as tk
-from skimage.feature import match_template
-from skimage import color, transform
+
+from capture import FrameRecognizer, LatencyStats, REGIONS_FILE, load_regions, run, save_regions
+from icon_index import IconIndex, THRESHOLD
 
 icon_folder = 'icons'
-icons = [Image.open(os.path.join(icon_folder, f)).convert('L') for f in os.listdir(icon_folder) if os.path.splitext(f)[1] == '.png']
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recognizes the picked heroes on screen.")
+    parser.add_argument("--regions", default=REGIONS_FILE, help=f"Regions file (default: {REGIONS_FILE}).")
+    parser.add_argument("--select", action="store_true", help="Select the regions again even if the file exists.")
+    parser.add_argument("--fps", type=float, default=5.0, help="Frames captured per second (0 = as fast as possible).")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Threads matching regions in parallel (0 matches in the capture thread).")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Minimum match confidence.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep watching after every region was recognized, reporting changes.")
+    parser.add_argument("--report-every", type=float, default=5.0,
+                        help="Seconds between latency reports (0 disables them).")
+    return parser.parse_args()
 
 def select_screen_area():
     regions_team1 = []
@@ -70,57 +82,45 @@ def select_screen_area():
 
     return regions_team1, regions_team2
 
-def read_regions_from_file():
-    config_file = "config.txt"
-
-    if os.path.exists(config_file):
-        with open(config_file, "r") as file:
-            content = file.read()
-
-        team1_data = content.split("Team 1 regions: [")[1].split("]")[0]
-        team2_data = content.split("Team 2 regions: [")[1].split("]")[0]
-
-        return eval(team1_data), eval(team2_data)
-
-    return [], []
-
-def find_image_on_screen(screenshot_gray):
-    for icon_image_gray in icons:
-        icon_array = np.array(icon_image_gray)
-        screenshot_array = np.array(screenshot_gray)
-
-        if icon_array.shape[0] > screenshot_array.shape[0] or icon_array.shape[1] > screenshot_array.shape[1]:
-            icon_array = transform.resize(icon_array, screenshot_array.shape)
-
-        result = match_template(screenshot_array, icon_array)
-        threshold = 0.6
-        loc = np.where(result >= threshold)
-
-        if len(loc[0]) > 0:
-            return icon_image_gray.filename
-
-    return None
-
 def main():
-    regions_team1, regions_team2 = read_regions_from_file() if os.path.exists('config.txt') else select_screen_area()
+    args = parse_args()
+    regions_team1, regions_team2 = ([], []) if args.select else load_regions(args.regions)
+    if not regions_team1 and not regions_team2:
+        regions_team1, regions_team2 = select_screen_area()
+        save_regions(args.regions, regions_team1, regions_team2)
     print("Team 1 regions:", regions_team1)
     print("Team 2 regions:", regions_team2)
-
-    while regions_team1 or regions_team2:
-        for region in regions_team1 + regions_team2:
-            screenshot = pyautogui.screenshot(region=region)
-            screenshot_gray = color.rgb2gray(np.array(screenshot))
-
-            found_icon = find_image_on_screen(screenshot_gray)
-
-            if found_icon:
-                print(f"{found_icon}")
-                if region in regions_team1:
-                    regions_team1.remove(region)
-                elif region in regions_team2:
-                    regions_team2.remove(region)
-            else:
-                print("Иконка не найдена")
+    if not regions_team1 and not regions_team2:
+        return
+
+    recognizer = FrameRecognizer(IconIndex.load(icon_folder), regions_team1, regions_team2,
+                                 workers=args.workers, threshold=args.threshold)
+    stats = LatencyStats()
+    last_report = stats.started
+
+    def on_frame(frame):
+        nonlocal last_report
+        stats.add(frame)
+        for result in frame.regions:
+            if result.changed:
+                found = result.match
+                label = f"{found.path} ({found.confidence:.2f})" if found else "Иконка не найдена"
+                print(f"Team {result.team} slot {result.slot + 1}: {label}")
+        if args.report_every > 0 and time.perf_counter() - last_report >= args.report_every:
+            summary = stats.summary()
+            print(f"{summary['frames']} frames at {summary['fps']:.1f} fps: capture {summary['capture_p50_ms']:.1f} ms, "
+                  f"match {summary['match_p50_ms']:.1f} ms, total p50 {summary['total_p50_ms']:.1f} / "
+                  f"p95 {summary['total_p95_ms']:.1f} ms")
+            stats.reset()
+            last_report = stats.started
+        return args.watch or not all(result.match for result in frame.regions)
+
+    try:
+        run(recognizer, args.fps, on_frame)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recognizer.close()
 
 if __name__ == "__main__":
     main()
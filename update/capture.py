@@ -0,0 +1,185 @@
+"""
+Frame-paced capture pipeline for cap.py.
+
+Each tick grabs one screenshot covering all regions, crops every region from it as an array view,
+skips regions whose pixels have not changed since the last tick and matches the rest concurrently
+(numpy releases the GIL in the heavy parts of IconIndex.match). Regions are stored as JSON.
+"""
+import ast
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from icon_index import EMBEDDING_SIZE, IconIndex, IconMatch, THRESHOLD, resize, to_gray
+
+Region = Tuple[int, int, int, int]
+
+REGIONS_FILE = 'regions.json'
+LEGACY_CONFIG_FILE = 'config.txt'
+# Mean absolute change of a region's thumbnail (gray levels 0..1) below which it counts as unchanged.
+CHANGE_THRESHOLD = 0.02
+
+
+def save_regions(path: str, regions_team1: List[Region], regions_team2: List[Region]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"team1": [list(r) for r in regions_team1], "team2": [list(r) for r in regions_team2]}, f, indent=4)
+
+
+def _parse_regions(value) -> List[Region]:
+    regions = [tuple(int(v) for v in region) for region in value]
+    if any(len(region) != 4 or region[2] <= 0 or region[3] <= 0 for region in regions):
+        raise ValueError(f"Regions must be (x, y, width, height) with a positive size: {value!r}")
+    return regions
+
+
+def load_regions(path: str = REGIONS_FILE, legacy_path: str = LEGACY_CONFIG_FILE) -> Tuple[List[Region], List[Region]]:
+    """
+    Team 1 and team 2 regions from the JSON regions file, falling back to the old config.txt format
+    (parsed as literals, never evaluated). Returns empty lists if neither exists.
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return _parse_regions(data.get("team1", [])), _parse_regions(data.get("team2", []))
+
+    if os.path.exists(legacy_path):
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        team1 = content.split("Team 1 regions: [")[1].split("]")[0]
+        team2 = content.split("Team 2 regions: [")[1].split("]")[0]
+        return (_parse_regions(ast.literal_eval(f"[{team1}]")), _parse_regions(ast.literal_eval(f"[{team2}]")))
+
+    return [], []
+
+
+def bounding_box(regions: List[Region]) -> Region:
+    left = min(r[0] for r in regions)
+    top = min(r[1] for r in regions)
+    right = max(r[0] + r[2] for r in regions)
+    bottom = max(r[1] + r[3] for r in regions)
+    return left, top, right - left, bottom - top
+
+
+def grab_screen(box: Region) -> np.ndarray:
+    """One screenshot of box as an RGB array."""
+    import pyautogui
+
+    return np.asarray(pyautogui.screenshot(region=box))
+
+
+class RegionResult(NamedTuple):
+    team: int
+    slot: int
+    match: Optional[IconMatch]
+    changed: bool
+
+
+class FrameResult(NamedTuple):
+    regions: List[RegionResult]
+    capture_ms: float
+    match_ms: float
+    matched: int
+
+
+class FrameRecognizer:
+    """
+    Recognizes all regions of one frame. The frame is an array of the screen area bounding_box(regions)
+    starts at; regions whose thumbnail barely changed since the previous frame keep their last match.
+    """
+    def __init__(self, index: IconIndex, regions_team1: List[Region], regions_team2: List[Region],
+                 workers: int = 4, threshold: float = THRESHOLD, change_threshold: float = CHANGE_THRESHOLD):
+        self.index = index
+        self.slots = [(1, i, r) for i, r in enumerate(regions_team1)] + [(2, i, r) for i, r in enumerate(regions_team2)]
+        self.box = bounding_box([r for _, _, r in self.slots])
+        self.threshold = threshold
+        self.change_threshold = change_threshold
+        self._thumbnails: List[Optional[np.ndarray]] = [None] * len(self.slots)
+        self._matches: List[Optional[IconMatch]] = [None] * len(self.slots)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers)) if workers > 0 else None
+
+    def crop(self, frame: np.ndarray, region: Region) -> np.ndarray:
+        x, y, width, height = region
+        left, top = x - self.box[0], y - self.box[1]
+        return frame[top:top + height, left:left + width]
+
+    def _changed(self, slot: int, view: np.ndarray) -> bool:
+        thumbnail = resize(to_gray(view), EMBEDDING_SIZE)
+        previous = self._thumbnails[slot]
+        if previous is not None and float(np.abs(thumbnail - previous).mean()) < self.change_threshold:
+            return False
+        self._thumbnails[slot] = thumbnail
+        return True
+
+    def recognize(self, frame: np.ndarray) -> Tuple[List[RegionResult], int]:
+        """Results for every region in slot order, plus how many regions were matched this frame."""
+        views = [self.crop(frame, region) for _, _, region in self.slots]
+        changed = [i for i, view in enumerate(views) if self._changed(i, view)]
+        match = lambda i: self.index.match(views[i], self.threshold)
+        if self._executor is not None and len(changed) > 1:
+            matches = list(self._executor.map(match, changed))
+        else:
+            matches = [match(i) for i in changed]
+        for i, found in zip(changed, matches):
+            self._matches[i] = found
+
+        changed_set = set(changed)
+        results = [
+            RegionResult(team, slot, self._matches[i], i in changed_set)
+            for i, (team, slot, _) in enumerate(self.slots)
+        ]
+        return results, len(changed)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+class LatencyStats:
+    """Per-frame capture and matching latencies, summarized as percentiles."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.capture_ms: List[float] = []
+        self.match_ms: List[float] = []
+        self.started = time.perf_counter()
+
+    def add(self, frame: FrameResult) -> None:
+        self.capture_ms.append(frame.capture_ms)
+        self.match_ms.append(frame.match_ms)
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = time.perf_counter() - self.started
+        total = np.add(self.capture_ms, self.match_ms)
+        return {
+            "frames": len(total),
+            "fps": len(total) / elapsed if elapsed > 0 else 0.0,
+            "capture_p50_ms": float(np.percentile(self.capture_ms, 50)) if len(total) else 0.0,
+            "match_p50_ms": float(np.percentile(self.match_ms, 50)) if len(total) else 0.0,
+            "total_p50_ms": float(np.percentile(total, 50)) if len(total) else 0.0,
+            "total_p95_ms": float(np.percentile(total, 95)) if len(total) else 0.0,
+        }
+
+
+def run(recognizer: FrameRecognizer, fps: float, on_frame: Callable[[FrameResult], bool],
+        grab: Callable[[Region], np.ndarray] = grab_screen) -> None:
+    """
+    Captures and recognizes frames at up to fps frames per second until on_frame returns False. A frame
+    that takes longer than the interval is followed immediately by the next one, never by a backlog.
+    """
+    interval = 1.0 / fps if fps > 0 else 0.0
+    next_tick = time.perf_counter()
+    while True:
+        started = time.perf_counter()
+        frame = grab(recognizer.box)
+        captured = time.perf_counter()
+        regions, matched = recognizer.recognize(frame)
+        finished = time.perf_counter()
+        if not on_frame(FrameResult(regions, (captured - started) * 1000, (finished - captured) * 1000, matched)):
+            return
+        next_tick = max(next_tick + interval, time.perf_counter())
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
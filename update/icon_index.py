@@ -0,0 +1,214 @@
+"""
+Hero icon index for screen recognition, used by cap.py.
+
+Every icon is converted once to a grayscale array of a fixed size plus two cheap descriptors: a 64-bit
+difference hash and a small zero-mean embedding. The index is cached in a .npz file next to the
+icons and rebuilt only when the icon files change. A captured region is reduced the same way,
+candidates are shortlisted by hash distance and embedding similarity, and only the shortlist is
+compared exactly: normalized cross-correlation over small shifts (one FFT per template) and a few
+crop scales, since hand-drawn regions rarely frame an icon exactly. The best match comes back with its
+confidence.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 1
+CACHE_FILE = '.icon_index.npz'
+# Dota hero icons are 16:9; (width, height) of the arrays that are compared exactly.
+NORMALIZED_SIZE = (64, 36)
+EMBEDDING_SIZE = (16, 9)
+HASH_SIZE = 8
+MAX_SHIFT = 4
+# Center crops tried on both the region and the templates, for regions drawn larger or smaller than the icon.
+SCALES = (1.0, 0.92, 0.85)
+FFT_SHAPE = (NORMALIZED_SIZE[1] + MAX_SHIFT, NORMALIZED_SIZE[0] + MAX_SHIFT)
+_SHIFTS = np.r_[0:MAX_SHIFT + 1, -MAX_SHIFT:0]
+SHORTLIST = 5
+THRESHOLD = 0.6
+# Luma weights of PIL's convert('L'), so icons and screenshots are reduced identically.
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114])
+
+
+class IconMatch(NamedTuple):
+    name: str
+    path: str
+    confidence: float
+    margin: float
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """Grayscale float32 array in 0..1 from a gray, RGB or RGBA array (uint8 or float)."""
+    image = np.asarray(image)
+    scale = 255.0 if image.dtype == np.uint8 else 1.0
+    if image.ndim == 3:
+        image = image[..., :3] @ GRAY_WEIGHTS
+    return (image / scale).astype(np.float32)
+
+
+def _resample_matrix(size_in: int, size_out: int) -> np.ndarray:
+    """(size_out, size_in) matrix averaging the input cells that each output cell covers."""
+    edges = np.arange(size_out + 1) * (size_in / size_out)
+    lo, hi = edges[:-1, None], edges[1:, None]
+    cells = np.arange(size_in)[None, :]
+    overlap = np.clip(np.minimum(hi, cells + 1) - np.maximum(lo, cells), 0.0, None)
+    return (overlap / overlap.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+@lru_cache(maxsize=64)
+def _cached_resample_matrix(size_in: int, size_out: int) -> np.ndarray:
+    return _resample_matrix(size_in, size_out)
+
+
+def resize(gray: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """Area-average resize of a 2D array to size (width, height)."""
+    width, height = size
+    return _cached_resample_matrix(gray.shape[0], height) @ gray @ _cached_resample_matrix(gray.shape[1], width).T
+
+
+def _normalize(array: np.ndarray) -> np.ndarray:
+    """Zero mean and unit norm over the last two axes; flat arrays become all zeros."""
+    centered = array - array.mean(axis=(-2, -1), keepdims=True)
+    norm = np.sqrt((centered * centered).sum(axis=(-2, -1), keepdims=True))
+    return centered / np.maximum(norm, 1e-6)
+
+
+def _center_crop(gray: np.ndarray, scale: float) -> np.ndarray:
+    if scale == 1.0:
+        return gray
+    height, width = gray.shape
+    dy, dx = round(height * (1 - scale) / 2), round(width * (1 - scale) / 2)
+    return gray[dy:height - dy, dx:width - dx]
+
+
+def _spectrum(normalized: np.ndarray) -> np.ndarray:
+    """Spectrum of the zero-mean, unit-norm array(s), zero-padded so products give shifts up to MAX_SHIFT without wrap-around."""
+    return np.fft.rfft2(_normalize(normalized), FFT_SHAPE)
+
+
+def describe(gray: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Normalized-size array, packed difference hash (8 bytes) and embedding vector of a grayscale image."""
+    normalized = resize(gray, NORMALIZED_SIZE)
+    small = resize(normalized, (HASH_SIZE + 1, HASH_SIZE))
+    dhash = np.packbits(small[:, 1:] > small[:, :-1])
+    embedding = _normalize(resize(normalized, EMBEDDING_SIZE)).ravel()
+    return normalized, dhash, embedding
+
+
+def _signature(folder: str, files: List[str]) -> str:
+    entries = []
+    for f in files:
+        stat = os.stat(os.path.join(folder, f))
+        entries.append([f, stat.st_size, stat.st_mtime_ns])
+    return json.dumps({"version": INDEX_VERSION, "size": NORMALIZED_SIZE, "files": entries})
+
+
+class IconIndex:
+    def __init__(self, folder: str, files: List[str], templates: np.ndarray, hashes: np.ndarray,
+                 embeddings: np.ndarray):
+        self.folder = folder
+        self.files = files
+        self.names = [os.path.splitext(f)[0] for f in files]
+        self.templates = templates
+        self.hashes = hashes
+        self.embeddings = embeddings
+        # Template spectra per crop scale, so matching only transforms the region.
+        self._spectra = {
+            scale: _spectrum(np.array([resize(_center_crop(t, scale), NORMALIZED_SIZE) for t in templates],
+                                      dtype=np.float32).reshape(templates.shape))
+            for scale in SCALES
+        }
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    @staticmethod
+    def icon_files(folder: str) -> List[str]:
+        return sorted(f for f in os.listdir(folder) if os.path.splitext(f)[1] == '.png')
+
+    @classmethod
+    def build(cls, folder: str) -> "IconIndex":
+        from PIL import Image
+
+        files = cls.icon_files(folder)
+        templates, hashes, embeddings = [], [], []
+        for f in files:
+            with Image.open(os.path.join(folder, f)) as image:
+                normalized, dhash, embedding = describe(to_gray(np.array(image.convert('RGB'))))
+            templates.append(normalized)
+            hashes.append(dhash)
+            embeddings.append(embedding)
+        width, height = NORMALIZED_SIZE
+        return cls(
+            folder, files,
+            np.array(templates, dtype=np.float32).reshape(-1, height, width),
+            np.array(hashes, dtype=np.uint8).reshape(-1, HASH_SIZE * HASH_SIZE // 8),
+            np.array(embeddings, dtype=np.float32).reshape(-1, EMBEDDING_SIZE[0] * EMBEDDING_SIZE[1]),
+        )
+
+    @classmethod
+    def load(cls, folder: str = 'icons', cache_file: Optional[str] = None) -> "IconIndex":
+        """Loads the cached index, rebuilding (and re-saving) it if the icons changed since it was written."""
+        cache_file = cache_file or os.path.join(folder, CACHE_FILE)
+        files = cls.icon_files(folder)
+        signature = _signature(folder, files)
+        if os.path.exists(cache_file):
+            try:
+                with np.load(cache_file, allow_pickle=False) as cached:
+                    if str(cached['signature']) == signature:
+                        return cls(folder, files, cached['templates'], cached['hashes'], cached['embeddings'])
+            except (OSError, KeyError, ValueError):
+                pass
+
+        index = cls.build(folder)
+        temp_file = cache_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            np.savez(f, signature=np.array(signature), templates=index.templates, hashes=index.hashes,
+                     embeddings=index.embeddings)
+        os.replace(temp_file, cache_file)
+        return index
+
+    def shortlist(self, dhash: np.ndarray, embedding: np.ndarray, size: int = SHORTLIST) -> np.ndarray:
+        """Indices of the closest icons by hash distance plus the closest by embedding similarity."""
+        size = min(size, len(self.files))
+        distance = np.unpackbits(self.hashes ^ dhash, axis=1).sum(axis=1)
+        similarity = self.embeddings @ embedding
+        by_hash = np.argpartition(distance, size - 1)[:size]
+        by_embedding = np.argpartition(-similarity, size - 1)[:size]
+        return np.union1d(by_hash, by_embedding)
+
+    def correlate(self, gray: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """
+        Best zero-normalized cross-correlation of the region with each candidate template over shifts of
+        up to MAX_SHIFT pixels and the SCALES crops of either side.
+        """
+        full = _spectrum(resize(gray, NORMALIZED_SIZE))
+        regions, templates = [full], [self._spectra[1.0][candidates]]
+        for scale in SCALES[1:]:
+            regions += [_spectrum(resize(_center_crop(gray, scale), NORMALIZED_SIZE)), full]
+            templates += [self._spectra[1.0][candidates], self._spectra[scale][candidates]]
+        # All region/template pairings go through one inverse FFT: (pairings, candidates, rows, columns).
+        correlation = np.fft.irfft2(np.array(templates).conj() * np.array(regions)[:, None], FFT_SHAPE)
+        return np.minimum(correlation[:, :, _SHIFTS][:, :, :, _SHIFTS].max(axis=(0, 2, 3)), 1.0)
+
+    def match(self, image: np.ndarray, threshold: float = THRESHOLD) -> Optional[IconMatch]:
+        """
+        Best matching icon for a captured region (gray or RGB array), or None if its confidence is
+        below threshold. margin is the lead over the runner-up among the shortlisted icons.
+        """
+        if not self.files:
+            return None
+        gray = to_gray(image)
+        _, dhash, embedding = describe(gray)
+        candidates = self.shortlist(dhash, embedding)
+        scores = self.correlate(gray, candidates)
+        order = np.argsort(-scores)
+        best = float(scores[order[0]])
+        if best < threshold:
+            return None
+        runner_up = float(scores[order[1]]) if len(order) > 1 else -1.0
+        i = int(candidates[order[0]])
+        return IconMatch(self.names[i], os.path.join(self.folder, self.files[i]), best, best - runner_up)
@@ -4,22 +4,22 @@ from tkinter import ttk
 import tools
 
 #At 05.06.2023 the code is not finished now only show team points, here is planned a full-fledged window with a table and heroes icons
-def calculate_synergy(team_heroes):
+def calculate_synergy(team_heroes, pairs):
     synergy_team = []
     for i in range(len(team_heroes)):
         for j in range(i + 1, len(team_heroes)):
             hero1 = team_heroes[i]
             hero2 = team_heroes[j]
-            synergy = tools.get_synergy(hero1, hero2)
+            synergy = pairs.get((hero1, hero2), (None, None))[1]
             if synergy is not None:
                 synergy_team.append((hero1, hero2, synergy))
     return synergy_team
 
-def calculate_counter(team1_heroes, team2_heroes):
+def calculate_counter(team1_heroes, team2_heroes, pairs):
     counter_team = []
     for hero1 in team1_heroes:
         for hero2 in team2_heroes:
-            counter = tools.get_counter(hero1, hero2)
+            counter = pairs.get((hero1, hero2), (None, None))[0]
             if counter is not None:
                 counter_team.append((hero1, hero2, counter))
     return counter_team
@@ -31,10 +31,14 @@ def calculating():
     except:
         pass
     
-    synergy_team1_sum = sum(item[2] for item in calculate_synergy(team1_heroes))
-    counter_team1_sum = sum(item[2] for item in calculate_counter(team1_heroes, team2_heroes))
-    synergy_team2_sum = sum(item[2] for item in calculate_synergy(team2_heroes))
-    counter_team2_sum = sum(item[2] for item in calculate_counter(team2_heroes, team1_heroes))
+    # Every pair the comparison needs, in one query.
+    draft_heroes = team1_heroes + team2_heroes
+    pairs = tools.get_pairs(draft_heroes, draft_heroes)
+
+    synergy_team1_sum = sum(item[2] for item in calculate_synergy(team1_heroes, pairs))
+    counter_team1_sum = sum(item[2] for item in calculate_counter(team1_heroes, team2_heroes, pairs))
+    synergy_team2_sum = sum(item[2] for item in calculate_synergy(team2_heroes, pairs))
+    counter_team2_sum = sum(item[2] for item in calculate_counter(team2_heroes, team1_heroes, pairs))
 
     if len(team1_heroes) == 0:
         print(f'Team1: 0')
@@ -57,6 +61,7 @@ def main():
     root.title("Dota2Picker")
     root.geometry("650x300")
 
+    tools.configure(read_only=True)
     heroes = sorted(tools.get_heroes_names())
 
     style = ttk.Style()
@@ -0,0 +1,186 @@
+"""
+Synthetic draft screens for testing recognition without the game.
+
+A screen is a dark top bar with five hero slots per team, filled from the icons in icons/ and then
+scaled, blurred, dimmed and made noisy. The regions handed to the recognizer are the slots with a
+few pixels of random error, like regions drawn by hand. Used by benchmarks/recognition.py; run it
+directly to write sample screens plus truth.json for inspection.
+"""
+import argparse
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from capture import Region
+from icon_index import IconIndex, resize
+
+TEAM_SIZE = 5
+# Size of the icon files; Distortion.scale is relative to it.
+ICON_SIZE = (256, 144)
+TRUTH_FILE = 'truth.json'
+
+
+class Distortion(NamedTuple):
+    scale: float = 0.3
+    blur: float = 0.0
+    brightness: float = 1.0
+    noise: float = 0.0
+
+
+class DraftLayout(NamedTuple):
+    width: int
+    height: int
+    slots_team1: List[Region]
+    slots_team2: List[Region]
+    regions_team1: List[Region]
+    regions_team2: List[Region]
+
+
+class SyntheticScreen(NamedTuple):
+    frame: np.ndarray
+    truth_team1: List[Optional[str]]
+    truth_team2: List[Optional[str]]
+
+
+def load_icons(folder: str) -> Tuple[List[str], List[np.ndarray]]:
+    """Hero names (file names without extension) and RGB arrays of all icons in folder."""
+    from PIL import Image
+
+    names, icons = [], []
+    for f in IconIndex.icon_files(folder):
+        with Image.open(os.path.join(folder, f)) as image:
+            icons.append(np.array(image.convert('RGB')))
+        names.append(os.path.splitext(f)[0])
+    return names, icons
+
+
+def gaussian_blur(image: np.ndarray, sigma: float) -> np.ndarray:
+    """Separable Gaussian blur of an (H, W, C) float array with edge padding."""
+    if sigma <= 0:
+        return image
+    radius = max(1, int(round(3 * sigma)))
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    kernel /= kernel.sum()
+    for axis in (0, 1):
+        padding = [(0, 0)] * image.ndim
+        padding[axis] = (radius, radius)
+        padded = np.pad(image, padding, mode='edge')
+        length = image.shape[axis]
+        image = sum(weight * np.take(padded, range(i, i + length), axis=axis) for i, weight in enumerate(kernel))
+    return image
+
+
+def draft_layout(scale: float, jitter: int, rng: np.random.Generator) -> DraftLayout:
+    """Slot positions of a top bar at the given icon scale and regions that miss them by up to jitter pixels."""
+    slot_width, slot_height = max(8, round(ICON_SIZE[0] * scale)), max(8, round(ICON_SIZE[1] * scale))
+    margin, gap, center = slot_height // 2, slot_width // 8, slot_width * 2
+    width = 2 * margin + 10 * slot_width + 8 * gap + center
+    height = slot_height + 2 * margin
+
+    def slots(left: int) -> List[Region]:
+        return [(left + i * (slot_width + gap), margin, slot_width, slot_height) for i in range(TEAM_SIZE)]
+
+    def drawn(slot: Region) -> Region:
+        x, y, w, h = slot
+        left, top, right, bottom = (np.array([x, y, x + w, y + h]) + rng.integers(-jitter, jitter + 1, 4)).tolist()
+        left, top = max(0, left), max(0, top)
+        right, bottom = min(width, max(right, left + 4)), min(height, max(bottom, top + 4))
+        return left, top, right - left, bottom - top
+
+    team1 = slots(margin)
+    team2 = slots(margin + 5 * slot_width + 4 * gap + center)
+    return DraftLayout(width, height, team1, team2, [drawn(s) for s in team1], [drawn(s) for s in team2])
+
+
+class ScreenGenerator:
+    """Random draft screens over one layout; empty is the chance that a slot has no hero yet."""
+    def __init__(self, names: Sequence[str], icons: Sequence[np.ndarray], distortion: Distortion = Distortion(),
+                 jitter: int = 2, empty: float = 0.0, seed: int = 0):
+        if len(names) < 2 * TEAM_SIZE:
+            raise ValueError(f"Need at least {2 * TEAM_SIZE} icons, got {len(names)}")
+        self.names = list(names)
+        self.distortion = distortion
+        self.empty = empty
+        self.rng = np.random.default_rng(seed)
+        self.layout = draft_layout(distortion.scale, jitter, self.rng)
+        _, _, slot_width, slot_height = self.layout.slots_team1[0]
+        # Icons are resized to the slot once; distortions apply to the whole screen.
+        self._icons = [self._resize(icon, slot_width, slot_height) for icon in icons]
+
+    @staticmethod
+    def _resize(icon: np.ndarray, width: int, height: int) -> np.ndarray:
+        icon = icon.astype(np.float32) / 255.0
+        return np.stack([resize(icon[..., c], (width, height)) for c in range(icon.shape[2])], axis=-1)
+
+    def _background(self) -> np.ndarray:
+        layout = self.layout
+        gradient = np.linspace(0.08, 0.16, layout.height, dtype=np.float32)[:, None, None]
+        frame = np.broadcast_to(gradient, (layout.height, layout.width, 3)).copy()
+        frame += self.rng.normal(0.0, 0.01, frame.shape).astype(np.float32)
+        return frame
+
+    def screen(self) -> SyntheticScreen:
+        layout, distortion = self.layout, self.distortion
+        frame = self._background()
+        picks = self.rng.choice(len(self.names), 2 * TEAM_SIZE, replace=False)
+        truth: List[Optional[str]] = []
+        for hero, (x, y, w, h) in zip(picks, layout.slots_team1 + layout.slots_team2):
+            if self.rng.random() < self.empty:
+                truth.append(None)
+                continue
+            frame[y:y + h, x:x + w] = self._icons[hero]
+            truth.append(self.names[hero])
+
+        frame = gaussian_blur(frame, distortion.blur) * distortion.brightness
+        if distortion.noise > 0:
+            frame += self.rng.normal(0.0, distortion.noise, frame.shape).astype(np.float32)
+        frame = (np.clip(frame, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+        return SyntheticScreen(frame, truth[:TEAM_SIZE], truth[TEAM_SIZE:])
+
+
+def write_screens(generator: ScreenGenerator, count: int, folder: str) -> None:
+    """Writes count screens as PNG files plus truth.json with the regions and the hero in every slot."""
+    from PIL import Image
+
+    os.makedirs(folder, exist_ok=True)
+    layout = generator.layout
+    screens: List[Dict] = []
+    for i in range(count):
+        screen = generator.screen()
+        name = f'screen_{i:04d}.png'
+        Image.fromarray(screen.frame).save(os.path.join(folder, name))
+        screens.append({"file": name, "team1": screen.truth_team1, "team2": screen.truth_team2})
+    with open(os.path.join(folder, TRUTH_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            "distortion": generator.distortion._asdict(),
+            "regions": {"team1": layout.regions_team1, "team2": layout.regions_team2},
+            "screens": screens,
+        }, f, indent=4)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Writes synthetic draft screens built from the hero icons.")
+    parser.add_argument("--icons", default='icons', help="Icon folder.")
+    parser.add_argument("--out", default='synthetic', help="Output folder for the PNG screens and truth.json.")
+    parser.add_argument("--count", type=int, default=20, help="Number of screens.")
+    parser.add_argument("--scale", type=float, default=0.3, help="Slot size relative to the icon files.")
+    parser.add_argument("--blur", type=float, default=0.0, help="Gaussian blur sigma in pixels.")
+    parser.add_argument("--brightness", type=float, default=1.0, help="Brightness multiplier.")
+    parser.add_argument("--noise", type=float, default=0.0, help="Standard deviation of pixel noise (0..1 scale).")
+    parser.add_argument("--jitter", type=int, default=2, help="Maximum error of the regions' edges in pixels.")
+    parser.add_argument("--empty", type=float, default=0.0, help="Chance that a slot is empty.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    names, icons = load_icons(args.icons)
+    generator = ScreenGenerator(names, icons, Distortion(args.scale, args.blur, args.brightness, args.noise),
+                                jitter=args.jitter, empty=args.empty, seed=args.seed)
+    write_screens(generator, args.count, args.out)
+    print(f"Wrote {args.count} screens to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,73 @@
 import sqlite3
+import threading
+
+DB_PATH = 'heroes.db'
+# Memory-mapped I/O for read-only connections; the file is small enough to map whole.
+MMAP_SIZE = 256 * 1024 * 1024
+
+_settings = {'path': DB_PATH, 'read_only': False}
+_local = threading.local()
+
+def configure(path=DB_PATH, read_only=False):
+    """Sets the database used by this module's functions. read_only opens it read-only with mmap enabled."""
+    _settings.update(path=path, read_only=read_only)
+    close()
+
+def get_connection():
+    """
+    This thread's connection, opened on first use and kept for later queries. sqlite3 caches the
+    prepared statements of each connection, so repeated queries are not parsed again.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        if _settings['read_only']:
+            conn = sqlite3.connect(f"file:{_settings['path']}?mode=ro", uri=True)
+            conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+            conn.execute('PRAGMA query_only=ON')
+        else:
+            conn = sqlite3.connect(_settings['path'])
+        _local.conn = conn
+    return conn
+
+def close():
+    """Closes this thread's connection, if any."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
 
 def print_all():
-    with sqlite3.connect('heroes.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT FROM heroes')
-        rows = cursor.fetchall()
-    for row in rows:
+    for row in get_connection().execute('SELECT * FROM heroes'):
         print(row)
 
 def get_heroes_names():
-    with sqlite3.connect('heroes.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT DISTINCT heroName1 FROM heroes')
-        rows = cursor.fetchall()
+    rows = get_connection().execute('SELECT DISTINCT heroName1 FROM heroes').fetchall()
     heroes_names = [row[0] for row in rows]
     return heroes_names
 
 def get_counter(heroName1, heroName2):
-    with sqlite3.connect('heroes.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT counter FROM heroes WHERE heroName1 = ? AND heroName2 = ?", (heroName1, heroName2))
-        result = cursor.fetchone()
+    result = get_connection().execute(
+        "SELECT counter FROM heroes WHERE heroName1 = ? AND heroName2 = ?", (heroName1, heroName2)).fetchone()
     return result[0] if result else None
 
 def get_synergy(heroName1, heroName2):
-    with sqlite3.connect('heroes.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT synergy FROM heroes WHERE heroName1 = ? AND heroName2 = ?", (heroName1, heroName2))
-        result = cursor.fetchone()
+    result = get_connection().execute(
+        "SELECT synergy FROM heroes WHERE heroName1 = ? AND heroName2 = ?", (heroName1, heroName2)).fetchone()
     return result[0] if result else None
+
+def get_pairs(heroes1, heroes2):
+    """
+    {(heroName1, heroName2): (counter, synergy)} for every stored pair of a hero in heroes1 with one in
+    heroes2, in a single query.
+    """
+    heroes1, heroes2 = list(dict.fromkeys(heroes1)), list(dict.fromkeys(heroes2))
+    if not heroes1 or not heroes2:
+        return {}
+    query = (f"SELECT heroName1, heroName2, counter, synergy FROM heroes "
+             f"WHERE heroName1 IN ({', '.join('?' * len(heroes1))}) AND heroName2 IN ({', '.join('?' * len(heroes2))})")
+    return {(h1, h2): (counter, synergy) for h1, h2, counter, synergy in get_connection().execute(query, heroes1 + heroes2)}
+
+def load_pairs():
+    """All pairs in memory, in the format of get_pairs, for callers that look up many drafts."""
+    rows = get_connection().execute('SELECT heroName1, heroName2, counter, synergy FROM heroes')
+    return {(h1, h2): (counter, synergy) for h1, h2, counter, synergy in rows}
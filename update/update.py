@@ -66,9 +66,31 @@ def fetch_advantage_data(url, headers, hero_id):
 
     return None
 
+HEROES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS heroes (
+        heroId1 INTEGER NOT NULL,
+        heroId2 INTEGER NOT NULL,
+        heroName1 TEXT,
+        heroName2 TEXT,
+        counter REAL,
+        synergy REAL,
+        PRIMARY KEY (heroId1, heroId2)
+    ) WITHOUT ROWID
+'''
+
+UPSERT_HEROES = '''
+    INSERT INTO heroes (heroId1, heroId2, heroName1, heroName2, counter, synergy) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (heroId1, heroId2) DO UPDATE SET
+        heroName1 = excluded.heroName1,
+        heroName2 = excluded.heroName2,
+        counter = excluded.counter,
+        synergy = excluded.synergy
+'''
+
 def collect_heroes_data(hero_names, advantage_data):
     vs_entries = advantage_data.get('vs', [])
     with_entries = advantage_data.get('with', [])
+    synergy_by_hero = {with_data['heroId2']: with_data['synergy'] for with_data in with_entries}
     heroes_data = []
 
     for vs_data in vs_entries:
@@ -77,54 +99,60 @@ def collect_heroes_data(hero_names, advantage_data):
         heroName1 = hero_names.get(heroId1, 'Unknown')
         heroName2 = hero_names.get(heroId2, 'Unknown')
         counter = vs_data['synergy']
-        synergy = None
-
-        for with_data in with_entries:
-            if with_data['heroId2'] == heroId2:
-                synergy = with_data['synergy']
-                break
-
+        synergy = synergy_by_hero.get(heroId2)
         heroes_data.append((heroId1, heroId2, heroName1, heroName2, counter, synergy))
 
     return heroes_data
 
-def insert_heroes_data(conn, cursor, heroes_data):
-    cursor.executemany('INSERT INTO heroes (heroId1, heroId2, heroName1, heroName2, counter, synergy) VALUES (?, ?, ?, ?, ?, ?)', heroes_data)
+def open_database(path='heroes.db'):
+    """Opens the database in WAL mode with the keyed schema, migrating a table from before the primary key."""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+    columns = conn.execute('PRAGMA table_info(heroes)').fetchall()
+    if columns and not any(column[5] for column in columns):
+        # Old table without a key: keep the latest row of every pair.
+        with conn:
+            conn.execute('ALTER TABLE heroes RENAME TO heroes_old')
+            conn.execute(HEROES_SCHEMA)
+            conn.execute('''
+                INSERT OR REPLACE INTO heroes (heroId1, heroId2, heroName1, heroName2, counter, synergy)
+                SELECT heroId1, heroId2, heroName1, heroName2, counter, synergy FROM heroes_old
+                WHERE heroId1 IS NOT NULL AND heroId2 IS NOT NULL ORDER BY rowid
+            ''')
+            conn.execute('DROP TABLE heroes_old')
+    else:
+        conn.execute(HEROES_SCHEMA)
+    # tools.py looks pairs up by name.
+    conn.execute('CREATE INDEX IF NOT EXISTS heroes_by_name ON heroes (heroName1, heroName2)')
+    conn.commit()
+    return conn
+
+def insert_heroes_data(conn, heroes_data):
+    """Upserts one batch in its own transaction."""
+    with conn:
+        conn.executemany(UPSERT_HEROES, heroes_data)
 
 def update():
-    conn = sqlite3.connect('heroes.db')
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS heroes (
-            heroId1 INTEGER,
-            heroId2 INTEGER,
-            heroName1 TEXT,
-            heroName2 TEXT,
-            counter REAL,
-            synergy REAL
-        )
-    ''')
+    conn = open_database()
 
     hero_names, npc_hero_names, count = get_hero_names()
     #download_hero_icons(npc_hero_names, hero_names)
 
     headers = {'Authorization': f'Bearer {STARTZ_API}'}
-    heroes_data = []
 
-    with tqdm(total=count) as pbar:
-        for hero_id in range(1, count + 1):
-            advantage_data = fetch_advantage_data(STRATZ_URL, headers, hero_id)
+    try:
+        with tqdm(total=count) as pbar:
+            for hero_id in range(1, count + 1):
+                advantage_data = fetch_advantage_data(STRATZ_URL, headers, hero_id)
 
-            if advantage_data:
-                heroes_data += collect_heroes_data(hero_names, advantage_data)
+                if advantage_data:
+                    insert_heroes_data(conn, collect_heroes_data(hero_names, advantage_data))
 
-            pbar.update(1)
-
-    if heroes_data:
-        insert_heroes_data(conn, cursor, heroes_data)
-
-    conn.commit()
-    conn.close()
+                pbar.update(1)
+    finally:
+        conn.close()
 
-update()
+if __name__ == "__main__":
+    update()
@@ -1,36 +1,70 @@
+import argparse
 import time
 from pathlib import Path
 import json
 import logging
 from src.scraper import Scraper
+from src.instrumentation import ScrapeMetrics, PrometheusTextSink
+from src.query_tables import DEFAULT_TOP_K
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dota 2 hero data updater (Stratz API).")
+    parser.add_argument("--prometheus-file", type=Path, default=None,
+                        help="Stream scrape metrics to this Prometheus text-format file while running.")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K,
+                        help="Heroes stored per entry of the precomputed query tables.")
+    parser.add_argument("--tables-only", action="store_true",
+                        help="Only rebuild the query tables of the existing data file (e.g. after calibrate.py).")
+    return parser.parse_args()
+
+def build_query_tables(data_file: Path, top_k: int) -> None:
+    """Precomputes the one- and two-enemy counters and synergy partners the engine reads instead of scoring live."""
+    from src.engine import load_engine
+    from src.query_tables import write_query_tables
+
+    started = time.time()
+    logic = load_engine(data_file, query_tables=False)
+    path = write_query_tables(logic, data_file, top_k)
+    print(f"Query tables written to: {path} ({path.stat().st_size / 1e6:.1f} MB, {time.time() - started:.1f} seconds)")
 
 def main():
     """Data updater using the Stratz API."""
+    args = parse_args()
+    data_dir = Path("data")
+    data_file = data_dir / "hero_matchups.json"
+    if args.tables_only:
+        build_query_tables(data_file, args.top_k)
+        return
+
     print("--- Dota 2 Hero Data Updater (Stratz API) ---")
     api_key = input("Enter your Stratz API Bearer Token: ")
     if not api_key:
         print("No API key provided. Aborting.")
         return
 
-    data_dir = Path("data")
-    data_file = data_dir / "hero_matchups.json"
+    report_file = data_dir / "scrape_report.json"
     data_dir.mkdir(exist_ok=True)
     
     print(f"Data will be saved to: {data_file}")
     start_time = time.time()
     
     try:
-        scraper = Scraper()
+        metrics = ScrapeMetrics()
+        if args.prometheus_file:
+            metrics.add_sink(PrometheusTextSink(args.prometheus_file))
+        scraper = Scraper(metrics)
         
-        all_data = scraper.scrape_all_data(api_key)
+        all_data = scraper.scrape_all_data(api_key, report_path=report_file)
         
         print("\nSaving data...")
         scraper.save_data_to_json(all_data, data_file)
+        build_query_tables(data_file, args.top_k)
         
         duration = time.time() - start_time
         print("\n--- Success! ---")
         print(f"Updated data for {len(all_data.get('heroes', []))} heroes.")
         print(f"Time taken: {duration:.2f} seconds")
+        print(f"Request metrics written to: {report_file}")
         
     except Exception as e:
         logging.error(f"An error occurred during the update process: {e}", exc_info=True)